@@ -154,7 +154,8 @@ class Classifier(object):
     self._scanner.ScanBuffer(scan_state, data, data_size)
     self._scanner.StopScan(scan_state)
 
-    return self._GetClassifications(scan_state.GetResults())
+    return self._GetClassifications(
+        self._scanner.GetScanResults(scan_state))
 
   def ClassifyFileObject(self, file_object):
     """Classifies the data in a file-like object.
@@ -35,6 +35,21 @@ class ClassifierTest(unittest.TestCase):
     self._test_file1 = os.path.join('test_data', 'NTUSER.DAT')
     self._test_file2 = os.path.join('test_data', 'syslog.zip')
 
+  def testClassifyBuffer(self):
+    """Function to test the classify buffer function."""
+    test_scanner = scanner.Scanner(self._store)
+
+    test_classifier = classifier.Classifier(test_scanner)
+    with open(self._test_file1, 'rb') as file_object:
+      data = file_object.read(512)
+
+    classifications = test_classifier.ClassifyBuffer(data, len(data))
+    self.assertEqual(len(classifications), 1)
+    self.assertEqual(classifications[0].identifier, 'regf')
+
+    classifications = test_classifier.ClassifyBuffer(data[4:], len(data) - 4)
+    self.assertEqual(len(classifications), 0)
+
   def testClassifyFileWithScanner(self):
     """Function to test the classify file function."""
     test_scanner = scanner.Scanner(self._store)
@@ -20,13 +20,17 @@
 import hashlib
 import logging
 import os
+import Queue
+import threading
 
 from dfvfs.helpers import file_system_searcher
 from dfvfs.lib import definitions as dfvfs_definitions
 from dfvfs.lib import errors as dfvfs_errors
 from dfvfs.path import factory as path_spec_factory
+from dfvfs.resolver import context
 from dfvfs.resolver import resolver as path_spec_resolver
 
+from plaso.engine import scheduler
 from plaso.lib import errors
 from plaso.lib import queue
 from plaso.lib import utils
@@ -61,9 +65,55 @@ def _SendContainerToStorage(file_entry, storage_queue_producer):
     storage_queue_producer.ProduceEventObject(event_object)
 
 
+class _CollectionThreadQueue(queue.Queue):
+  """Class that implements the queue of a collection thread.
+
+     The items pushed by a collection thread are forwarded onto a thread-safe
+     queue that is shared by all the collection threads and is consumed by
+     the collector, which pushes the items onto the process or storage queue.
+     The queues used by the workers and the storage are not thread-safe.
+  """
+
+  def __init__(self, thread_queue, is_storage_queue):
+    """Initializes the collection thread queue.
+
+    Args:
+      thread_queue: the queue shared by the collection threads (instance of
+                    Queue.Queue).
+      is_storage_queue: boolean value to indicate the items are event objects
+                        that should be pushed onto the storage queue.
+    """
+    super(_CollectionThreadQueue, self).__init__()
+    self._is_storage_queue = is_storage_queue
+    self._thread_queue = thread_queue
+
+  def __len__(self):
+    """Return the estimated number of items inside the queue."""
+    return self._thread_queue.qsize()
+
+  def IsEmpty(self):
+    """Determines if the queue is empty."""
+    return self._thread_queue.empty()
+
+  def PushItem(self, item):
+    """Pushes an item onto the queue."""
+    self._thread_queue.put((self._is_storage_queue, item))
+
+  def PopItem(self):
+    """Pops an item off the queue."""
+    raise RuntimeError(u'The collection thread queue is write only.')
+
+
 class Collector(queue.PathSpecQueueProducer):
   """Class that implements a collector object."""
 
+  # The maximum number of file systems, e.g. the volume and its VSS stores,
+  # that are collected from concurrently.
+  MAXIMUM_NUMBER_OF_THREADS = 4
+
+  # The maximum number of items buffered by the collection threads.
+  _MAXIMUM_THREAD_QUEUE_SIZE = 10000
+
   def __init__(
       self, process_queue, storage_queue_producer, source_path,
       source_path_spec, resolver_context=None):
@@ -93,6 +143,7 @@ class Collector(queue.PathSpecQueueProducer):
     # TODO: remove the need to pass source_path
     self._source_path = os.path.abspath(source_path)
     self._source_path_spec = source_path_spec
+    self._storage_queue_producer = storage_queue_producer
     self._vss_stores = None
 
   def __enter__(self):
@@ -103,65 +154,156 @@ class Collector(queue.PathSpecQueueProducer):
     """Exits a with statement."""
     return
 
-  def _ProcessImage(self, volume_path_spec, find_specs=None):
-    """Processes a volume within a storage media image.
+  def _CollectFileSystem(
+      self, fs_collector, description, path_spec, find_specs=None,
+      resolver_context=None):
+    """Collects files from a file system.
 
     Args:
-      volume_path_spec: The path specification of the volume containing
-                        the file system.
+      fs_collector: the file system collector (instance of
+                    FileSystemCollector).
+      description: string that describes the file system in log messages,
+                   e.g. "image" or "VSS store: 1".
+      path_spec: The path specification of the root of the file system.
       find_specs: Optional list of find specifications (instances of
                   dfvfs.FindSpec). The default is None.
+      resolver_context: Optional resolver context (instance of dfvfs.Context).
+                        The default is None.
     """
     if find_specs:
-      logging.debug(u'Collecting from image file: {0:s} with filter'.format(
-          self._source_path))
+      status_string = u'with filter '
     else:
-      logging.debug(u'Collecting from image file: {0:s}'.format(
-          self._source_path))
-
-    path_spec = path_spec_factory.Factory.NewPathSpec(
-        dfvfs_definitions.TYPE_INDICATOR_TSK, location=u'/',
-        parent=volume_path_spec)
+      status_string = u''
 
     try:
       file_system = path_spec_resolver.Resolver.OpenFileSystem(
-          path_spec, resolver_context=self._resolver_context)
+          path_spec, resolver_context=resolver_context)
     except IOError as exception:
       logging.error(
-          u'Unable to open file system with error: {0:s}'.format(exception))
+          u'Unable to open file system of {0:s} with error: {1:s}'.format(
+              description, exception))
       return
 
     try:
-      self._fs_collector.Collect(
-          file_system, path_spec, find_specs=find_specs)
+      fs_collector.Collect(file_system, path_spec, find_specs=find_specs)
     except (dfvfs_errors.AccessError, dfvfs_errors.BackEndError) as exception:
       logging.warning(u'{0:s}'.format(exception))
+      logging.debug(u'Collection from {0:s} {1:s}FAILED.'.format(
+          description, status_string))
+      return
 
-      if find_specs:
-        logging.debug(u'Collection from image with filter FAILED.')
+    logging.debug(u'Collection from {0:s} {1:s}COMPLETED.'.format(
+        description, status_string))
+
+  def _CollectFileSystems(self, file_systems, find_specs=None):
+    """Collects files from multiple file systems concurrently.
+
+    Every file system is collected from in a separate thread, with its own
+    resolver context, so that the path specifications of the file systems are
+    interleaved on the process queue.
+
+    Args:
+      file_systems: a list of tuples of a description and the path
+                    specification of the root of a file system.
+      find_specs: Optional list of find specifications (instances of
+                  dfvfs.FindSpec). The default is None.
+
+    Raises:
+      CollectorError: if a collection thread failed.
+    """
+    file_systems_queue = Queue.Queue()
+    for file_system in file_systems:
+      file_systems_queue.put(file_system)
+
+    thread_queue = Queue.Queue(maxsize=self._MAXIMUM_THREAD_QUEUE_SIZE)
+    thread_exceptions = []
+
+    threads = []
+    number_of_threads = min(len(file_systems), self.MAXIMUM_NUMBER_OF_THREADS)
+    for _ in range(number_of_threads):
+      thread = threading.Thread(
+          target=self._CollectFileSystemsThread,
+          args=(file_systems_queue, thread_queue, thread_exceptions),
+          kwargs={'find_specs': find_specs})
+      thread.daemon = True
+      thread.start()
+      threads.append(thread)
+
+    # The collection threads push a None item when they are done.
+    number_of_active_threads = number_of_threads
+    while number_of_active_threads:
+      is_storage_queue, item = thread_queue.get()
+      if item is None:
+        number_of_active_threads -= 1
+      elif is_storage_queue:
+        self._storage_queue_producer.ProduceEventObject(item)
       else:
-        logging.debug(u'Collection from image FAILED.')
-      return
+        self._queue.PushItem(item)
 
-    if self._vss_stores:
-      self._ProcessVSS(volume_path_spec, find_specs=find_specs)
+    for thread in threads:
+      thread.join()
 
-    if find_specs:
-      logging.debug(u'Collection from image with filter COMPLETED.')
-    else:
-      logging.debug(u'Collection from image COMPLETED.')
+    self._storage_queue_producer.Flush()
+
+    if thread_exceptions:
+      raise errors.CollectorError(
+          u'Collection thread failed with error: {0:s}'.format(
+              thread_exceptions[0]))
 
-  def _ProcessVSS(self, volume_path_spec, find_specs=None):
-    """Processes a VSS volume within a storage media image.
+  def _CollectFileSystemsThread(
+      self, file_systems_queue, thread_queue, thread_exceptions,
+      find_specs=None):
+    """Collects files from file systems until no file systems are left.
 
     Args:
-      volume_path_spec: The path specification of the volume containing
-                        the file system.
+      file_systems_queue: the queue of file systems to collect from (instance
+                          of Queue.Queue), which contains tuples of
+                          a description and a path specification.
+      thread_queue: the queue shared by the collection threads (instance of
+                    Queue.Queue).
+      thread_exceptions: a list to which exceptions raised in the thread are
+                         appended.
       find_specs: Optional list of find specifications (instances of
                   dfvfs.FindSpec). The default is None.
     """
-    logging.info(u'Processing VSS.')
+    # Every thread must have its own resolver context.
+    resolver_context = context.Context()
+
+    storage_queue_producer = queue.EventObjectQueueProducer(
+        _CollectionThreadQueue(thread_queue, True))
+    fs_collector = self._fs_collector.CreateCopy(
+        _CollectionThreadQueue(thread_queue, False), storage_queue_producer)
+
+    try:
+      while True:
+        try:
+          description, path_spec = file_systems_queue.get_nowait()
+        except Queue.Empty:
+          break
+
+        self._CollectFileSystem(
+            fs_collector, description, path_spec, find_specs=find_specs,
+            resolver_context=resolver_context)
+
+    except Exception as exception:  # pylint: disable=broad-except
+      logging.error(u'Collection thread failed with error: {0:s}'.format(
+          exception))
+      thread_exceptions.append(exception)
 
+    finally:
+      thread_queue.put((False, None))
+
+  def _GetVSSFileSystems(self, volume_path_spec):
+    """Retrieves the VSS store file systems to collect from.
+
+    Args:
+      volume_path_spec: The path specification of the volume containing
+                        the VSS stores.
+
+    Returns:
+      A list of tuples of a description and the path specification of the
+      root of the file system in the VSS store.
+    """
     vss_path_spec = path_spec_factory.Factory.NewPathSpec(
         dfvfs_definitions.TYPE_INDICATOR_VSHADOW, location=u'/',
         parent=volume_path_spec)
@@ -171,19 +313,13 @@ class Collector(queue.PathSpecQueueProducer):
 
     number_of_vss = vss_file_entry.number_of_sub_file_entries
 
+    file_systems = []
+
     # In plaso 1 represents the first store index in dfvfs and pyvshadow 0
     # represents the first store index so 1 is subtracted.
     vss_store_range = [store_nr - 1 for store_nr in self._vss_stores]
 
     for store_index in vss_store_range:
-      if find_specs:
-        logging.info((
-            u'Collecting from VSS volume: {0:d} out of: {1:d} '
-            u'with filter').format(store_index + 1, number_of_vss))
-      else:
-        logging.info(u'Collecting from VSS volume: {0:d} out of: {1:d}'.format(
-            store_index + 1, number_of_vss))
-
       vss_path_spec = path_spec_factory.Factory.NewPathSpec(
           dfvfs_definitions.TYPE_INDICATOR_VSHADOW, store_index=store_index,
           parent=volume_path_spec)
@@ -191,31 +327,48 @@ class Collector(queue.PathSpecQueueProducer):
           dfvfs_definitions.TYPE_INDICATOR_TSK, location=u'/',
           parent=vss_path_spec)
 
-      file_system = path_spec_resolver.Resolver.OpenFileSystem(
-          path_spec, resolver_context=self._resolver_context)
+      description = u'VSS store: {0:d} out of: {1:d}'.format(
+          store_index + 1, number_of_vss)
+      file_systems.append((description, path_spec))
 
-      try:
-        self._fs_collector.Collect(
-            file_system, path_spec, find_specs=find_specs)
-      except (dfvfs_errors.AccessError, dfvfs_errors.BackEndError) as exception:
-        logging.warning(u'{0:s}'.format(exception))
+    return file_systems
 
-        if find_specs:
-          logging.debug(
-              u'Collection from VSS store: {0:d} with filter FAILED.'.format(
-                  store_index + 1))
-        else:
-          logging.debug(u'Collection from VSS store: {0:d} FAILED.'.format(
-              store_index + 1))
-        return
+  def _ProcessImage(self, volume_path_spec, find_specs=None):
+    """Processes a volume within a storage media image.
 
-      if find_specs:
-        logging.debug(
-            u'Collection from VSS store: {0:d} with filter COMPLETED.'.format(
-                store_index + 1))
-      else:
-        logging.debug(u'Collection from VSS store: {0:d} COMPLETED.'.format(
-            store_index + 1))
+    The volume and its VSS stores are collected from concurrently.
+
+    Args:
+      volume_path_spec: The path specification of the volume containing
+                        the file system.
+      find_specs: Optional list of find specifications (instances of
+                  dfvfs.FindSpec). The default is None.
+    """
+    if find_specs:
+      logging.debug(u'Collecting from image file: {0:s} with filter'.format(
+          self._source_path))
+    else:
+      logging.debug(u'Collecting from image file: {0:s}'.format(
+          self._source_path))
+
+    path_spec = path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_TSK, location=u'/',
+        parent=volume_path_spec)
+
+    file_systems = [(u'image', path_spec)]
+
+    if self._vss_stores:
+      logging.info(u'Processing VSS.')
+      file_systems.extend(self._GetVSSFileSystems(volume_path_spec))
+
+    if len(file_systems) > 1 and self.MAXIMUM_NUMBER_OF_THREADS > 1:
+      self._CollectFileSystems(file_systems, find_specs=find_specs)
+      return
+
+    for description, path_spec in file_systems:
+      self._CollectFileSystem(
+          self._fs_collector, description, path_spec, find_specs=find_specs,
+          resolver_context=self._resolver_context)
 
   def Collect(self):
     """Collects files from the source."""
@@ -276,6 +429,17 @@ class Collector(queue.PathSpecQueueProducer):
     """
     self._filter_find_specs = filter_find_specs
 
+  def SetIncludeFileSizes(self, include_file_sizes):
+    """Sets the include file sizes mode.
+
+    Args:
+      include_file_sizes: boolean value to indicate if the collector should
+                          include the file sizes for scheduling, in which
+                          case scheduled path specifications are pushed onto
+                          the process queue.
+    """
+    self._fs_collector.SetIncludeFileSizes(include_file_sizes)
+
   def SetProxy(self, rpc_proxy):
     """Sets the RPC proxy the collector should use.
 
@@ -314,6 +478,7 @@ class FileSystemCollector(queue.PathSpecQueueProducer):
     super(FileSystemCollector, self).__init__(process_queue)
     self._duplicate_file_check = False
     self._hashlist = {}
+    self._include_file_sizes = False
     self._storage_queue_producer = storage_queue_producer
     self.collect_directory_metadata = True
 
@@ -403,7 +568,13 @@ class FileSystemCollector(queue.PathSpecQueueProducer):
 
           self._hashlist.setdefault(inode, []).append(hash_value)
 
-        self.ProducePathSpec(sub_file_entry.path_spec)
+        if self._include_file_sizes:
+          # The stat object is cached by the file entry.
+          stat_object = sub_file_entry.GetStat()
+          self._queue.PushItem(scheduler.ScheduledPathSpec(
+              sub_file_entry.path_spec, getattr(stat_object, 'size', None)))
+        else:
+          self.ProducePathSpec(sub_file_entry.path_spec)
 
     for sub_file_entry in sub_directories:
       try:
@@ -420,13 +591,45 @@ class FileSystemCollector(queue.PathSpecQueueProducer):
       find_specs: Optional list of find specifications (instances of
                   dfvfs.FindSpec). The default is None.
     """
-    if find_specs:
-      searcher = file_system_searcher.FileSystemSearcher(file_system, path_spec)
+    try:
+      if find_specs:
+        searcher = file_system_searcher.FileSystemSearcher(
+            file_system, path_spec)
 
-      for path_spec in searcher.Find(find_specs=find_specs):
-        self.ProducePathSpec(path_spec)
+        for path_spec in searcher.Find(find_specs=find_specs):
+          self.ProducePathSpec(path_spec)
 
-    else:
-      file_entry = file_system.GetFileEntryByPathSpec(path_spec)
+      else:
+        file_entry = file_system.GetFileEntryByPathSpec(path_spec)
+
+        self._ProcessDirectory(file_entry)
+
+    finally:
+      # Make sure the event objects that are buffered by the storage queue
+      # are sent before the collection continues or stops.
+      self._storage_queue_producer.Flush()
+
+  def CreateCopy(self, process_queue, storage_queue_producer):
+    """Creates a file system collector with the same settings.
 
-      self._ProcessDirectory(file_entry)
+    Args:
+      process_queue: The files processing queue (instance of Queue).
+      storage_queue_producer: the storage queue producer (instance of
+                              EventObjectQueueProducer).
+
+    Returns:
+      A file system collector (instance of FileSystemCollector).
+    """
+    fs_collector = FileSystemCollector(process_queue, storage_queue_producer)
+    fs_collector.collect_directory_metadata = self.collect_directory_metadata
+    fs_collector.SetIncludeFileSizes(self._include_file_sizes)
+    return fs_collector
+
+  def SetIncludeFileSizes(self, include_file_sizes):
+    """Sets the include file sizes mode.
+
+    Args:
+      include_file_sizes: boolean value to indicate if the collector should
+                          include the file sizes for scheduling.
+    """
+    self._include_file_sizes = include_file_sizes
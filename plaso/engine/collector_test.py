@@ -303,6 +303,54 @@ class CollectorTest(CollectorTestCase):
     # image_offset: 0
     self.assertEquals(paths[1], u'/passwords.txt')
 
+  def _CollectVSSImage(self, maximum_number_of_threads):
+    """Collects from the volume and VSS stores of the VSS test image.
+
+    Args:
+      maximum_number_of_threads: the maximum number of file systems collected
+                                 from concurrently.
+
+    Returns:
+      A list of the locations of the collected path specifications.
+    """
+    test_file = self._GetTestFilePath(['vsstest.qcow2'])
+
+    os_path_spec = path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_OS, location=test_file)
+    volume_path_spec = path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_QCOW, parent=os_path_spec)
+    path_spec = path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_TSK, location=u'/',
+        parent=volume_path_spec)
+
+    test_collection_queue = queue.SingleThreadedQueue()
+    test_storage_queue = queue.SingleThreadedQueue()
+    test_storage_queue_producer = queue.EventObjectQueueProducer(
+        test_storage_queue)
+    resolver_context = context.Context()
+    test_collector = collector.Collector(
+        test_collection_queue, test_storage_queue_producer, test_file,
+        path_spec, resolver_context=resolver_context)
+    test_collector.MAXIMUM_NUMBER_OF_THREADS = maximum_number_of_threads
+    test_collector.SetVssInformation([1, 2])
+    test_collector.Collect()
+
+    test_collector_queue_consumer = TestCollectorQueueConsumer(
+        test_collection_queue)
+    test_collector_queue_consumer.ConsumePathSpecs()
+
+    return [
+        path_spec.comparable
+        for path_spec in test_collector_queue_consumer.path_specs]
+
+  def testImageWithVSSCollection(self):
+    """Test concurrent collection on a storage media image with VSS stores."""
+    expected_path_specs = self._CollectVSSImage(1)
+    path_specs = self._CollectVSSImage(4)
+
+    self.assertNotEquals(len(path_specs), 0)
+    self.assertEquals(sorted(path_specs), sorted(expected_path_specs))
+
 
 class BuildFindSpecsFromFileTest(unittest.TestCase):
   """Tests for the BuildFindSpecsFromFile function."""
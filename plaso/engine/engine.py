@@ -34,18 +34,29 @@ from plaso.preprocessors import interface as preprocess_interface
 class Engine(object):
   """Class that defines the processing engine."""
 
-  def __init__(self, collection_queue, storage_queue):
+  def __init__(
+      self, collection_queue, storage_queue, serialize_event_objects=False):
     """Initialize the engine object.
 
     Args:
       collection_queue: the collection queue object (instance of Queue).
       storage_queue: the storage queue object (instance of Queue).
+      serialize_event_objects: optional boolean value to indicate the event
+                               objects should be serialized before they are
+                               pushed onto the storage queue. The default
+                               is False.
     """
     self._collection_queue = collection_queue
     self._source = None
     self._source_path_spec = None
     self._source_file_entry = None
-    self._storage_queue_producer = queue.EventObjectQueueProducer(storage_queue)
+
+    if serialize_event_objects:
+      self._storage_queue_producer = queue.SerializedEventObjectQueueProducer(
+          storage_queue)
+    else:
+      self._storage_queue_producer = queue.EventObjectQueueProducer(
+          storage_queue)
 
   def CreateCollector(
       self, include_directory_stat, vss_stores=None, filter_find_specs=None,
@@ -85,7 +96,8 @@ class Engine(object):
     return collector_object
 
   def CreateExtractionWorker(
-      self, worker_number, pre_obj, parsers, rpc_proxy=None):
+      self, worker_number, pre_obj, parsers, rpc_proxy=None,
+      process_queue=None):
     """Creates an extraction worker object.
 
     Args:
@@ -96,12 +108,19 @@ class Engine(object):
                  used to setup RPC functionality for the worker. This is
                  optional and if not provided the worker will not listen to RPC
                  requests.
+      process_queue: Optional process queue (instance of Queue) the worker
+                     should consume, such as the worker queue of a path
+                     specification dispatcher. The default is None, which
+                     represents the collection queue.
 
     Returns:
       An extraction worker (instance of worker.ExtractionWorker).
     """
+    if process_queue is None:
+      process_queue = self._collection_queue
+
     return worker.EventExtractionWorker(
-        worker_number, self._collection_queue, self._storage_queue_producer,
+        worker_number, process_queue, self._storage_queue_producer,
         pre_obj, parsers, rpc_proxy=rpc_proxy)
 
   def GetSourceFileSystemSearcher(self, resolver_context=None):
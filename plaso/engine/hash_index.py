@@ -0,0 +1,263 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""The content hash index.
+
+The content hash index is a SQLite database that maps the SHA-256 of the
+content of the files that were parsed to the events the parsers produced for
+the content. Files with the same content, such as a SOFTWARE hive that is
+unchanged in several VSS stores, the same browser history in the images of
+a fleet or the files of a re-run, then only need to be parsed once. The events
+of a file with content that is in the index are read from the index instead.
+
+The events are stored as produced by the parsers, before the attributes of
+the file they were parsed from, such as the path specification, were added.
+Since the events can also depend on the configuration of the parsers, e.g.
+the time zone, the entries are stored per configuration identifier.
+
+The index is stored in a file and can be shared by multiple processes
+and runs.
+"""
+
+import collections
+import hashlib
+import logging
+import sqlite3
+
+
+# The entry of a file in the content hash index.
+ContentHashIndexEntry = collections.namedtuple(
+    'ContentHashIndexEntry',
+    ['size', 'parse_time', 'path_spec', 'number_of_events'])
+
+
+class ContentHashIndex(object):
+  """Class that implements the content hash index."""
+
+  # The number of bytes read at a time to calculate the content hash.
+  _READ_BUFFER_SIZE = 1024 * 1024
+
+  # The number of seconds to wait for a lock held by another process.
+  _LOCK_TIMEOUT = 60.0
+
+  _CREATE_TABLE_QUERIES = [
+      (u'CREATE TABLE IF NOT EXISTS content_hashes ('
+       u'configuration_identifier TEXT, sha256 TEXT, size INTEGER, '
+       u'parse_time REAL, path_spec TEXT, number_of_events INTEGER, '
+       u'PRIMARY KEY (configuration_identifier, sha256))'),
+      (u'CREATE TABLE IF NOT EXISTS content_hash_events ('
+       u'configuration_identifier TEXT, sha256 TEXT, event_index INTEGER, '
+       u'parser_name TEXT, event_data BLOB, '
+       u'PRIMARY KEY (configuration_identifier, sha256, event_index))')]
+
+  _INSERT_QUERY = (
+      u'INSERT OR IGNORE INTO content_hashes VALUES (?, ?, ?, ?, ?, ?)')
+
+  _INSERT_EVENT_QUERY = (
+      u'INSERT INTO content_hash_events VALUES (?, ?, ?, ?, ?)')
+
+  _SELECT_QUERY = (
+      u'SELECT size, parse_time, path_spec, number_of_events '
+      u'FROM content_hashes '
+      u'WHERE configuration_identifier = ? AND sha256 = ?')
+
+  _SELECT_EVENTS_QUERY = (
+      u'SELECT parser_name, event_data FROM content_hash_events '
+      u'WHERE configuration_identifier = ? AND sha256 = ? '
+      u'ORDER BY event_index')
+
+  def __init__(self, path, configuration_identifier):
+    """Initializes the content hash index.
+
+    Args:
+      path: the path of the index file.
+      configuration_identifier: the identifier of the configuration of
+                                the parsers, where events produced with
+                                another configuration are not used.
+    """
+    super(ContentHashIndex, self).__init__()
+    self._configuration_identifier = configuration_identifier
+    self._connection = None
+    self._path = path
+
+  @classmethod
+  def CalculateHash(cls, file_object):
+    """Calculates the content hash of a file.
+
+    Args:
+      file_object: the file-like object.
+
+    Returns:
+      A tuple of the hexadecimal SHA-256 of the content and the number of
+      bytes read.
+    """
+    file_object.seek(0, 0)
+
+    hasher = hashlib.sha256()
+    size = 0
+
+    data = file_object.read(cls._READ_BUFFER_SIZE)
+    while data:
+      hasher.update(data)
+      size += len(data)
+      data = file_object.read(cls._READ_BUFFER_SIZE)
+
+    return hasher.hexdigest(), size
+
+  def AddEntry(self, content_hash, size, parse_time, path_spec, events):
+    """Adds a parsed file and its events to the index.
+
+    If the content hash is already in the index, the existing entry is kept.
+    If the entry cannot be added, e.g. because the index file is locked
+    or corrupt, a warning is logged.
+
+    Args:
+      content_hash: the hexadecimal SHA-256 of the content.
+      size: the size of the content.
+      parse_time: the number of seconds parsing the file took.
+      path_spec: the comparable of the path specification of the file.
+      events: a list of tuples of the name of the parser and the serialized
+              event, in the order they were produced.
+
+    Raises:
+      IOError: if the index is not open.
+    """
+    if not self._connection:
+      raise IOError(u'Content hash index not open.')
+
+    try:
+      # The entry and its events are added in a single transaction.
+      with self._connection:
+        cursor = self._connection.execute(self._INSERT_QUERY, (
+            self._configuration_identifier, content_hash, size, parse_time,
+            path_spec, len(events)))
+
+        # The events are only added with the entry, which another process
+        # could have added in the meantime.
+        if cursor.rowcount == 1:
+          self._connection.executemany(self._INSERT_EVENT_QUERY, [
+              (self._configuration_identifier, content_hash, event_index,
+               parser_name, sqlite3.Binary(event_data))
+              for event_index, (parser_name, event_data) in enumerate(
+                  events)])
+
+    except sqlite3.Error as exception:
+      logging.warning((
+          u'Unable to add content hash: {0:s} to index: {1:s} with error: '
+          u'{2:s}').format(content_hash, self._path, exception))
+
+  def Close(self):
+    """Closes the index."""
+    if self._connection:
+      self._connection.close()
+      self._connection = None
+
+  def GetEntry(self, content_hash):
+    """Retrieves the entry of a content hash.
+
+    Args:
+      content_hash: the hexadecimal SHA-256 of the content.
+
+    Returns:
+      The entry (instance of ContentHashIndexEntry) or None if the content
+      hash is not in the index or the index cannot be read.
+
+    Raises:
+      IOError: if the index is not open.
+    """
+    if not self._connection:
+      raise IOError(u'Content hash index not open.')
+
+    try:
+      cursor = self._connection.execute(
+          self._SELECT_QUERY, (self._configuration_identifier, content_hash))
+      row = cursor.fetchone()
+
+    except sqlite3.Error as exception:
+      logging.warning((
+          u'Unable to read content hash: {0:s} from index: {1:s} with error: '
+          u'{2:s}').format(content_hash, self._path, exception))
+      return
+
+    if not row:
+      return
+
+    return ContentHashIndexEntry(*row)
+
+  def GetEvents(self, index_entry, content_hash):
+    """Retrieves the events of a content hash.
+
+    Args:
+      index_entry: the entry of the content hash (instance of
+                   ContentHashIndexEntry).
+      content_hash: the hexadecimal SHA-256 of the content.
+
+    Returns:
+      A list of tuples of the name of the parser and the serialized event,
+      in the order they were produced, or None if the events cannot be read.
+
+    Raises:
+      IOError: if the index is not open.
+    """
+    if not self._connection:
+      raise IOError(u'Content hash index not open.')
+
+    try:
+      cursor = self._connection.execute(
+          self._SELECT_EVENTS_QUERY,
+          (self._configuration_identifier, content_hash))
+      events = [
+          (parser_name, str(event_data))
+          for parser_name, event_data in cursor.fetchall()]
+
+    except sqlite3.Error as exception:
+      logging.warning((
+          u'Unable to read events of content hash: {0:s} from index: {1:s} '
+          u'with error: {2:s}').format(content_hash, self._path, exception))
+      return
+
+    if len(events) != index_entry.number_of_events:
+      logging.warning((
+          u'Number of events of content hash: {0:s} in index: {1:s} does not '
+          u'match.').format(content_hash, self._path))
+      return
+
+    return events
+
+  def Open(self):
+    """Opens the index, the index file is created if it does not exist.
+
+    Note that the index should be opened by every process separately.
+
+    Raises:
+      IOError: if the index is already open or cannot be opened.
+    """
+    if self._connection:
+      raise IOError(u'Content hash index already open.')
+
+    try:
+      self._connection = sqlite3.connect(
+          self._path, timeout=self._LOCK_TIMEOUT)
+      with self._connection:
+        for query in self._CREATE_TABLE_QUERIES:
+          self._connection.execute(query)
+
+    except sqlite3.Error as exception:
+      self._connection = None
+      raise IOError(
+          u'Unable to open content hash index: {0:s} with error: {1:s}'.format(
+              self._path, exception))
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the content hash index."""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from plaso.engine import hash_index
+
+
+class ContentHashIndexTest(unittest.TestCase):
+  """Tests for the content hash index."""
+
+  def setUp(self):
+    """Sets up the needed objects used throughout the test."""
+    self._temp_directory = tempfile.mkdtemp()
+    self._index_path = os.path.join(self._temp_directory, u'index.db')
+
+  def tearDown(self):
+    """Cleans up the needed objects used throughout the test."""
+    shutil.rmtree(self._temp_directory, True)
+
+  def testCalculateHash(self):
+    """Tests the CalculateHash function."""
+    file_object = io.BytesIO(b'test data')
+    file_object.read(4)
+
+    content_hash, size = hash_index.ContentHashIndex.CalculateHash(file_object)
+    self.assertEquals(content_hash, (
+        u'916f0027a575074ce72a331777c3478d6513f786a591bd892da1a577bf2335f9'))
+    self.assertEquals(size, 9)
+
+  def testAddAndGetEntry(self):
+    """Tests the AddEntry, GetEntry and GetEvents functions."""
+    index = hash_index.ContentHashIndex(self._index_path, u'config1')
+
+    with self.assertRaises(IOError):
+      index.GetEntry(u'0123')
+
+    index.Open()
+    self.assertEquals(index.GetEntry(u'0123'), None)
+
+    events = [(u'parser1', b'event\x00data1'), (u'parser2', b'event data2')]
+    index.AddEntry(u'0123', 9, 1.5, u'type: OS, location: /first\n', events)
+    index.AddEntry(
+        u'0123', 9, 2.5, u'type: OS, location: /second\n',
+        [(u'parser3', b'event data3')])
+    index.AddEntry(u'4567', 0, 0.5, u'type: OS, location: /empty\n', [])
+    index.Close()
+
+    # The index is persistent and the first entry of a content hash is kept.
+    index = hash_index.ContentHashIndex(self._index_path, u'config1')
+    index.Open()
+
+    index_entry = index.GetEntry(u'0123')
+    self.assertEquals(index_entry.size, 9)
+    self.assertEquals(index_entry.parse_time, 1.5)
+    self.assertEquals(index_entry.path_spec, u'type: OS, location: /first\n')
+    self.assertEquals(index_entry.number_of_events, 2)
+    self.assertEquals(index.GetEvents(index_entry, u'0123'), events)
+
+    index_entry = index.GetEntry(u'4567')
+    self.assertEquals(index_entry.number_of_events, 0)
+    self.assertEquals(index.GetEvents(index_entry, u'4567'), [])
+
+    index.Close()
+
+    # The entries of another configuration are not used.
+    index = hash_index.ContentHashIndex(self._index_path, u'config2')
+    index.Open()
+    self.assertEquals(index.GetEntry(u'0123'), None)
+    index.Close()
+
+  def testCorruptIndex(self):
+    """Tests the AddEntry and GetEntry functions with a corrupt index."""
+    index = hash_index.ContentHashIndex(self._index_path, u'config1')
+    index.Open()
+
+    with open(self._index_path, 'wb') as file_object:
+      file_object.write(b'corrupt' * 1024)
+
+    index.AddEntry(
+        u'0123', 9, 1.5, u'type: OS, location: /first\n',
+        [(u'parser1', b'event data1')])
+    self.assertEquals(index.GetEntry(u'0123'), None)
+
+    index.Close()
+
+
+if __name__ == '__main__':
+  unittest.main()
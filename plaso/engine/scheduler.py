@@ -0,0 +1,258 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""The path specification scheduler.
+
+The scheduler is a central dispatcher: the collector and the extraction
+workers share a single dispatch queue, which is consumed by a dispatcher
+thread in the main process. The pending path specifications are kept in
+a single priority queue and handed out largest file first to the worker
+that requests one, so that big files, such as a pagefile, are started
+early instead of holding up a single worker at the end of the run.
+A worker only receives a path specification when it is ready to process
+it, hence idle workers do not wait for busy ones. The queue of a worker
+holds at most the path specification it requested and nothing is moved
+between workers.
+"""
+
+import heapq
+import logging
+
+from dfvfs.path import path_spec as dfvfs_path_spec
+
+from plaso.lib import errors
+from plaso.lib import queue
+
+
+class ScheduledPathSpec(object):
+  """Class that implements a path specification with a file size."""
+
+  def __init__(self, path_spec, size):
+    """Initializes the scheduled path specification.
+
+    Args:
+      path_spec: the path specification (instance of dfvfs.PathSpec).
+      size: the size of the file or None if not available.
+    """
+    super(ScheduledPathSpec, self).__init__()
+    self.path_spec = path_spec
+    self.size = size
+
+
+class WorkRequest(object):
+  """Class that implements a request of a worker for a path specification."""
+
+  def __init__(self, worker_identifier):
+    """Initializes the work request.
+
+    Args:
+      worker_identifier: the identifier of the requesting worker.
+    """
+    super(WorkRequest, self).__init__()
+    self.worker_identifier = worker_identifier
+
+
+class PathSpecScheduler(object):
+  """Class that implements the path specification scheduler.
+
+  The scheduler is a priority queue of the pending path specifications
+  ordered by file size, largest first.
+  """
+
+  def __init__(self):
+    """Initializes the path specification scheduler."""
+    super(PathSpecScheduler, self).__init__()
+    self._heap = []
+    self._sequence_number = 0
+
+  def __len__(self):
+    """Returns the number of pending path specifications."""
+    return len(self._heap)
+
+  def PopPathSpec(self):
+    """Pops the largest pending path specification.
+
+    Returns:
+      The path specification (instance of dfvfs.PathSpec) or None if no
+      path specifications are pending.
+    """
+    if not self._heap:
+      return
+
+    _, _, path_spec = heapq.heappop(self._heap)
+    return path_spec
+
+  def PushPathSpec(self, path_spec, size=None):
+    """Pushes a path specification.
+
+    Args:
+      path_spec: the path specification (instance of dfvfs.PathSpec).
+      size: optional size of the file. The default is None, which means
+            the size is not available and the path specification is handed
+            out after those of the files with a known size.
+    """
+    if not size or size < 0:
+      size = 0
+
+    # The sequence number keeps files of the same size in collection order.
+    heapq.heappush(self._heap, (-size, self._sequence_number, path_spec))
+    self._sequence_number += 1
+
+
+class WorkerQueue(queue.Queue):
+  """Class that implements the queue of a single extraction worker.
+
+  Before an item is popped off the queue a work request is pushed onto
+  the dispatch queue, hence the worker only receives a path specification
+  when it is ready to process it.
+  """
+
+  def __init__(self, worker_identifier, dispatch_queue):
+    """Initializes the worker queue.
+
+    Args:
+      worker_identifier: the identifier of the worker.
+      dispatch_queue: the dispatch queue (instance of Queue).
+    """
+    super(WorkerQueue, self).__init__()
+    self._dispatch_queue = dispatch_queue
+    self._queue = queue.MultiThreadedQueue()
+    self._worker_identifier = worker_identifier
+
+  def __len__(self):
+    """Return the estimated number of entries inside the queue."""
+    return len(self._queue)
+
+  def IsEmpty(self):
+    """Determines if the queue is empty."""
+    return self._queue.IsEmpty()
+
+  def PushItem(self, item):
+    """Pushes an item onto the queue."""
+    self._queue.PushItem(item)
+
+  def PopItem(self):
+    """Requests and pops an item off the queue."""
+    self._dispatch_queue.PushItem(WorkRequest(self._worker_identifier))
+    return self._queue.PopItem()
+
+
+class PathSpecDispatcher(queue.QueueConsumer):
+  """Class that dispatches path specifications to the extraction workers.
+
+  The dispatcher consumes the dispatch queue, on which the collector pushes
+  the path specifications, optionally as scheduled path specifications, and
+  the workers push their work requests. Every work request is answered with
+  the largest pending path specification.
+  """
+
+  def __init__(self, dispatch_queue, number_of_workers):
+    """Initializes the path specification dispatcher.
+
+    Args:
+      dispatch_queue: the dispatch queue (instance of Queue).
+      number_of_workers: the number of workers.
+    """
+    super(PathSpecDispatcher, self).__init__(dispatch_queue)
+    self._scheduler = PathSpecScheduler()
+    self._worker_queues = [
+        WorkerQueue(worker_identifier, dispatch_queue)
+        for worker_identifier in range(number_of_workers)]
+
+  def _ConsumeItem(self, item):
+    """Consumes an item from the dispatch queue.
+
+    Args:
+      item: the item.
+
+    Returns:
+      The identifier of the requesting worker if the item is a work request
+      or None otherwise.
+
+    Raises:
+      RuntimeError: when there is an unsupported object type on the queue.
+    """
+    if isinstance(item, WorkRequest):
+      return item.worker_identifier
+
+    if isinstance(item, ScheduledPathSpec):
+      self._scheduler.PushPathSpec(item.path_spec, size=item.size)
+    elif isinstance(item, dfvfs_path_spec.PathSpec):
+      self._scheduler.PushPathSpec(item)
+    else:
+      raise RuntimeError(u'Unsupported item type on queue.')
+
+  def GetWorkerQueue(self, worker_identifier):
+    """Retrieves the queue of a worker.
+
+    Args:
+      worker_identifier: the identifier of the worker.
+
+    Returns:
+      The worker queue (instance of WorkerQueue).
+    """
+    return self._worker_queues[worker_identifier]
+
+  def Run(self):
+    """Dispatches the path specifications until all workers are stopped.
+
+    The workers are stopped after the end of input of the collection is
+    consumed and all pending path specifications are dispatched. A second
+    end of input on the dispatch queue stops the dispatcher directly.
+
+    Raises:
+      RuntimeError: when there is an unsupported object type on the queue.
+    """
+    end_of_collection = False
+    number_of_path_specs = 0
+    stopped_workers = set()
+    waiting_workers = []
+
+    while len(stopped_workers) < len(self._worker_queues):
+      try:
+        item = self._queue.PopItem()
+      except errors.QueueEmpty:
+        break
+
+      if isinstance(item, queue.QueueEndOfInput):
+        if end_of_collection:
+          break
+        end_of_collection = True
+
+      else:
+        worker_identifier = self._ConsumeItem(item)
+        if worker_identifier is not None:
+          waiting_workers.append(worker_identifier)
+
+      while waiting_workers:
+        worker_identifier = waiting_workers[0]
+        path_spec = self._scheduler.PopPathSpec()
+        if path_spec is not None:
+          item = path_spec
+          number_of_path_specs += 1
+        elif end_of_collection:
+          item = queue.QueueEndOfInput()
+          stopped_workers.add(worker_identifier)
+        else:
+          break
+
+        waiting_workers.pop(0)
+        self._worker_queues[worker_identifier].PushItem(item)
+
+    logging.info((
+        u'Dispatching is done, {0:d} path specifications were '
+        u'dispatched.').format(number_of_path_specs))
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests the path specification scheduler."""
+
+import unittest
+
+from plaso.engine import scheduler
+from plaso.lib import queue
+
+
+class PathSpecSchedulerTest(unittest.TestCase):
+  """Tests for the path specification scheduler object."""
+
+  def testPushAndPopPathSpec(self):
+    """Tests the PushPathSpec and PopPathSpec functions."""
+    test_scheduler = scheduler.PathSpecScheduler()
+
+    # Strings are used in place of path specifications.
+    test_scheduler.PushPathSpec(u'/small', size=10)
+    test_scheduler.PushPathSpec(u'/pagefile.sys', size=8000)
+    test_scheduler.PushPathSpec(u'/unknown')
+    test_scheduler.PushPathSpec(u'/medium', size=500)
+    test_scheduler.PushPathSpec(u'/other_small', size=10)
+    test_scheduler.PushPathSpec(u'/large', size=2000)
+    self.assertEquals(len(test_scheduler), 6)
+
+    # The largest file comes first and files of the same size are handed
+    # out in collection order.
+    self.assertEquals(test_scheduler.PopPathSpec(), u'/pagefile.sys')
+    self.assertEquals(test_scheduler.PopPathSpec(), u'/large')
+    self.assertEquals(test_scheduler.PopPathSpec(), u'/medium')
+    self.assertEquals(test_scheduler.PopPathSpec(), u'/small')
+    self.assertEquals(test_scheduler.PopPathSpec(), u'/other_small')
+    self.assertEquals(test_scheduler.PopPathSpec(), u'/unknown')
+    self.assertEquals(test_scheduler.PopPathSpec(), None)
+    self.assertEquals(len(test_scheduler), 0)
+
+
+class PathSpecDispatcherTest(unittest.TestCase):
+  """Tests for the path specification dispatcher object."""
+
+  def testRun(self):
+    """Tests the Run function."""
+    dispatch_queue = queue.SingleThreadedQueue()
+    test_dispatcher = scheduler.PathSpecDispatcher(dispatch_queue, 2)
+
+    dispatch_queue.PushItem(scheduler.WorkRequest(0))
+    dispatch_queue.PushItem(scheduler.ScheduledPathSpec(u'/small', 10))
+    dispatch_queue.PushItem(scheduler.ScheduledPathSpec(u'/medium', 500))
+    dispatch_queue.PushItem(scheduler.ScheduledPathSpec(u'/large', 2000))
+    dispatch_queue.PushItem(scheduler.WorkRequest(1))
+    dispatch_queue.PushItem(queue.QueueEndOfInput())
+    dispatch_queue.PushItem(scheduler.WorkRequest(1))
+    dispatch_queue.PushItem(scheduler.WorkRequest(1))
+    dispatch_queue.PushItem(scheduler.WorkRequest(0))
+
+    test_dispatcher.Run()
+    self.assertEquals(len(dispatch_queue), 0)
+
+    worker_queue = test_dispatcher.GetWorkerQueue(0)
+    self.assertEquals(worker_queue._queue.PopItem(), u'/small')
+    self.assertIsInstance(
+        worker_queue._queue.PopItem(), queue.QueueEndOfInput)
+
+    worker_queue = test_dispatcher.GetWorkerQueue(1)
+    self.assertEquals(worker_queue._queue.PopItem(), u'/large')
+    self.assertEquals(worker_queue._queue.PopItem(), u'/medium')
+    self.assertIsInstance(
+        worker_queue._queue.PopItem(), queue.QueueEndOfInput)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""The parser signature registry.
+
+The registry maps the format specifications declared by the parsers to
+the parsers, so that the start of a file only needs to be classified once
+to determine which parsers can parse it.
+"""
+
+import logging
+import os
+
+from plaso.classifier import classifier
+from plaso.classifier import scanner
+from plaso.classifier import specification
+
+
+class ParserSignatureRegistry(object):
+  """Class that implements the parser signature registry."""
+
+  # The minimum number of bytes read from the start of a file to classify it.
+  _MINIMUM_HEAD_SIZE = 512
+
+  def __init__(self, parsers):
+    """Initializes the parser signature registry.
+
+    Args:
+      parsers: a list of parser objects (instances of BaseParser).
+    """
+    super(ParserSignatureRegistry, self).__init__()
+    self._classifier = None
+    self._format_parsers = {}
+    self._head_size = self._MINIMUM_HEAD_SIZE
+
+    # The parsers that parse every file.
+    self.format_independent_parsers = []
+    # The parsers without format specification.
+    self.unclassified_parsers = []
+
+    specification_store = specification.SpecificationStore()
+
+    for parser_object in parsers:
+      if parser_object.FORMAT_INDEPENDENT:
+        self.format_independent_parsers.append(parser_object)
+        continue
+
+      format_specification = parser_object.GetFormatSpecification()
+      if not format_specification:
+        self.unclassified_parsers.append(parser_object)
+        continue
+
+      identifier = format_specification.identifier
+      if identifier not in self._format_parsers:
+        specification_store.AddSpecification(format_specification)
+        self._format_parsers[identifier] = []
+
+        for signature in format_specification.signatures:
+          if not signature.is_bound or signature.offset is None:
+            logging.warning((
+                u'Format specification: {0:s} of parser: {1:s} contains '
+                u'a signature that is not bound to an offset.').format(
+                    identifier, parser_object.parser_name))
+            continue
+
+          self._head_size = max(
+              self._head_size, signature.offset + len(signature.expression))
+
+      self._format_parsers[identifier].append(parser_object)
+
+    if self._format_parsers:
+      self._classifier = classifier.Classifier(
+          scanner.Scanner(specification_store))
+
+  def GetFormatParsers(self, file_object):
+    """Retrieves the parsers of the format specifications a file matches.
+
+    Args:
+      file_object: the file-like object.
+
+    Returns:
+      A list of parser objects (instances of BaseParser) or an empty list
+      if the file does not match any of the format specifications.
+    """
+    if not self._classifier:
+      return []
+
+    file_object.seek(0, os.SEEK_SET)
+    data = file_object.read(self._head_size)
+    if not data:
+      return []
+
+    parsers = []
+    for classification in self._classifier.ClassifyBuffer(data, len(data)):
+      parsers.extend(self._format_parsers[classification.identifier])
+
+    return parsers
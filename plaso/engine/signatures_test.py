@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests the parser signature registry."""
+
+import os
+import StringIO
+import unittest
+
+from plaso.classifier import specification
+from plaso.engine import signatures
+
+
+class TestParser(object):
+  """Class that implements a parser for testing."""
+
+  FORMAT_INDEPENDENT = False
+
+  def __init__(self, parser_name, identifier=None, signature=None, offset=0):
+    """Initializes the parser.
+
+    Args:
+      parser_name: the name of the parser.
+      identifier: optional identifier of the format specification.
+      signature: optional signature of the format specification.
+      offset: optional offset of the signature.
+    """
+    super(TestParser, self).__init__()
+    self._identifier = identifier
+    self._offset = offset
+    self._signature = signature
+    self.parser_name = parser_name
+
+  def GetFormatSpecification(self):
+    """Retrieves the format specification."""
+    if not self._identifier:
+      return
+
+    format_specification = specification.Specification(self._identifier)
+    format_specification.AddNewSignature(
+        self._signature, offset=self._offset, is_bound=True)
+    return format_specification
+
+
+class ParserSignatureRegistryTest(unittest.TestCase):
+  """Tests for the parser signature registry object."""
+
+  _TEST_DATA_PATH = os.path.join(os.getcwd(), u'test_data')
+
+  def setUp(self):
+    """Sets up the needed objects used throughout the test."""
+    filestat_parser = TestParser(u'filestat')
+    filestat_parser.FORMAT_INDEPENDENT = True
+
+    self._parsers = [
+        filestat_parser,
+        TestParser(u'syslog'),
+        TestParser(u'sqlite', u'sqlite', 'SQLite format 3\x00'),
+        TestParser(u'winreg', u'regf', 'regf'),
+        TestParser(u'prefetch', u'prefetch', 'SCCA', offset=4),
+        TestParser(u'winreg_copy', u'regf', 'regf')]
+
+  def testInitialize(self):
+    """Tests the initialization."""
+    registry = signatures.ParserSignatureRegistry(self._parsers)
+
+    self.assertEquals(registry.format_independent_parsers, self._parsers[:1])
+    self.assertEquals(registry.unclassified_parsers, self._parsers[1:2])
+
+  def testGetFormatParsers(self):
+    """Tests the GetFormatParsers function."""
+    registry = signatures.ParserSignatureRegistry(self._parsers)
+
+    test_file = os.path.join(self._TEST_DATA_PATH, u'NTUSER.DAT')
+    with open(test_file, 'rb') as file_object:
+      parsers = registry.GetFormatParsers(file_object)
+
+    parser_names = [parser_object.parser_name for parser_object in parsers]
+    self.assertEquals(parser_names, [u'winreg', u'winreg_copy'])
+
+    test_file = os.path.join(self._TEST_DATA_PATH, u'PING.EXE-B29F6629.pf')
+    with open(test_file, 'rb') as file_object:
+      parsers = registry.GetFormatParsers(file_object)
+
+    self.assertEquals(parsers, self._parsers[4:5])
+
+    test_file = os.path.join(self._TEST_DATA_PATH, u'syslog')
+    with open(test_file, 'rb') as file_object:
+      parsers = registry.GetFormatParsers(file_object)
+
+    self.assertEquals(parsers, [])
+
+    # The signature should only match at the start of the file.
+    file_object = StringIO.StringIO('\x00\x00\x00\x00regf')
+    self.assertEquals(registry.GetFormatParsers(file_object), [])
+
+    file_object = StringIO.StringIO('')
+    self.assertEquals(registry.GetFormatParsers(file_object), [])
+
+
+if __name__ == '__main__':
+  unittest.main()
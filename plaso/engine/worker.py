@@ -17,19 +17,28 @@
 # limitations under the License.
 """The event extraction worker."""
 
+import hashlib
+import heapq
 import logging
 import os
 import pdb
 import threading
+import time
+import uuid
 
 from dfvfs.lib import definitions as dfvfs_definitions
 from dfvfs.resolver import context
 from dfvfs.resolver import resolver as path_spec_resolver
 
+import plaso
+from plaso.engine import hash_index
+from plaso.engine import signatures
 from plaso.lib import classifier
 from plaso.lib import errors
 from plaso.lib import queue
+from plaso.lib import text_parser
 from plaso.lib import utils
+from plaso.serializer import protobuf_serializer
 
 
 class EventExtractionWorker(queue.PathSpecQueueConsumer):
@@ -43,6 +52,14 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
   are pushed on a storage queue for further processing.
   """
 
+  # The number of slowest files of which the elapsed time is reported.
+  _NUMBER_OF_SLOWEST_FILES = 10
+
+  # The names of the preprocessing attributes the parsers use, which are part
+  # of the configuration identifier of the content hash index.
+  _CONTENT_HASH_INDEX_PREPROCESS_ATTRIBUTES = [
+      'codepage', 'current_control_set', 'guessed_os', 'year', 'zone']
+
   def __init__(
       self, identifier, process_queue, storage_queue_producer, pre_obj,
       parsers, rpc_proxy=None):
@@ -62,6 +79,8 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
                  requests. The default value is None.
     """
     super(EventExtractionWorker, self).__init__(process_queue)
+    self._content_hash_index = None
+    self._content_hash_index_path = None
     self._debug_mode = False
     self._filter_object = None
     self._identifier = identifier
@@ -70,6 +89,7 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
     self._parsers = parsers
     self._pre_obj = pre_obj
     self._rpc_proxy = rpc_proxy
+    self._signature_registry = None
 
     # We need a resolver context per process to prevent multi processing
     # issues with file objects stored in images.
@@ -79,9 +99,16 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
     self._text_prepend = None
 
     # Few attributes that contain the current status of the worker.
+    self._content_hash_time = 0.0
+    self._counter_of_duplicate_files = 0
     self._counter_of_extracted_events = 0
+    self._duplicate_bytes = 0
+    self._duplicate_parse_time = 0.0
     self._current_working_file = u''
+    self._event_object_serializer = (
+        protobuf_serializer.ProtobufEventObjectSerializer)
     self._is_running = False
+    self._slowest_files = []
 
     if pre_obj:
       self._user_mapping = pre_obj.GetUserMappings()
@@ -90,6 +117,18 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
 
   def _ConsumePathSpec(self, path_spec):
     """Consumes a path specification callback for ConsumePathSpecs."""
+    start_time = time.time()
+    try:
+      self._ProcessPathSpec(path_spec)
+    finally:
+      self._UpdateElapsedTime(path_spec, time.time() - start_time)
+
+  def _ProcessPathSpec(self, path_spec):
+    """Processes a path specification.
+
+    Args:
+      path_spec: the path specification (instance of dfvfs.PathSpec).
+    """
     file_entry = path_spec_resolver.Resolver.OpenFileEntry(
         path_spec, resolver_context=self._resolver_context)
 
@@ -113,6 +152,54 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
             u'Unable to parse file: {0:s} with error: {1:s}'.format(
                 file_entry.path_spec.comparable, exception))
 
+  def _GetContentHashIndexConfigurationIdentifier(self):
+    """Retrieves the configuration identifier of the content hash index.
+
+    The events parsed from the content of a file also depend on the version,
+    the parsers and the preprocessing values the parsers use.
+
+    Returns:
+      A string containing the hexadecimal SHA-256 of the configuration.
+    """
+    parser_names = sorted([
+        parser_object.parser_name for parser_object in self._parsers['all']])
+
+    values = [plaso.GetVersion(), u','.join(parser_names)]
+    for attribute_name in self._CONTENT_HASH_INDEX_PREPROCESS_ATTRIBUTES:
+      values.append(u'{0!s}'.format(
+          getattr(self._pre_obj, attribute_name, None)))
+
+    return hashlib.sha256(u'|'.join(values).encode('utf-8')).hexdigest()
+
+  def _GetContentHash(self, file_entry):
+    """Calculates the content hash of a file entry.
+
+    Args:
+      file_entry: A file entry object.
+
+    Returns:
+      A tuple of the content hash and the size of the content or (None, None)
+      if the file entry could not be read.
+    """
+    try:
+      file_object = file_entry.GetFileObject()
+    except IOError as exception:
+      logging.debug(u'Unable to open file: {0:s} with error: {1:s}'.format(
+          file_entry.path_spec.comparable, exception))
+      return None, None
+
+    if not file_object:
+      return None, None
+
+    try:
+      return hash_index.ContentHashIndex.CalculateHash(file_object)
+    except IOError as exception:
+      logging.debug(u'Unable to hash file: {0:s} with error: {1:s}'.format(
+          file_entry.path_spec.comparable, exception))
+      return None, None
+    finally:
+      file_object.close()
+
   def _ParseEvent(self, event_object, file_entry, parser_name, stat_obj):
     """Adjust value of an extracted EventObject before storing it."""
     # TODO: Make some more adjustments to the event object.
@@ -161,27 +248,98 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
       self._storage_queue_producer.ProduceEventObject(event_object)
       self._counter_of_extracted_events += 1
 
-  def ParseFile(self, file_entry):
-    """Run through classifier and appropriate parsers.
+  def _UpdateElapsedTime(self, path_spec, elapsed_time):
+    """Updates the slowest files with the elapsed time of a path specification.
+
+    Args:
+      path_spec: the path specification (instance of dfvfs.PathSpec).
+      elapsed_time: the number of seconds the processing took.
+    """
+    logging.debug(u'Processing: {0:s} took: {1:.3f} seconds.'.format(
+        path_spec.comparable, elapsed_time))
+
+    # The slowest files are kept in a heap with the fastest of them on top.
+    slowest_file = (elapsed_time, path_spec.comparable)
+    if len(self._slowest_files) < self._NUMBER_OF_SLOWEST_FILES:
+      heapq.heappush(self._slowest_files, slowest_file)
+    elif elapsed_time > self._slowest_files[0][0]:
+      heapq.heapreplace(self._slowest_files, slowest_file)
+
+  def GetSlowestFiles(self):
+    """Retrieves the files that took the longest to process.
+
+    Returns:
+      A list of tuples of the elapsed time in seconds and the comparable
+      of the path specification, slowest first.
+    """
+    return sorted(self._slowest_files, reverse=True)
+
+  def _ProbeFile(self, file_entry):
+    """Reads the start of a file to determine which parsers to run.
+
+    The file is opened once to classify it and to read the text probe
+    that is shared by the text parsers.
 
     Args:
       file_entry: A file entry object.
+
+    Returns:
+      A tuple containing a list of the parser objects of the format
+      specifications the file matches and the text probe (instance of
+      TextProbe) or None if the file could not be read.
     """
-    logging.debug(u'[ParseFile] Parsing: {0:s}'.format(
-        file_entry.path_spec.comparable))
+    try:
+      file_object = file_entry.GetFileObject()
+    except IOError as exception:
+      logging.debug(u'Unable to open file: {0:s} with error: {1:s}'.format(
+          file_entry.path_spec.comparable, exception))
+      return [], None
 
-    self._current_working_file = getattr(
-        file_entry.path_spec, u'location', file_entry.name)
+    if not file_object:
+      return [], None
+
+    try:
+      format_parsers = self._signature_registry.GetFormatParsers(file_object)
+      text_probe = text_parser.TextProbe(file_object)
+    except IOError as exception:
+      logging.debug(u'Unable to probe file: {0:s} with error: {1:s}'.format(
+          file_entry.path_spec.comparable, exception))
+      return [], None
+    finally:
+      file_object.close()
+
+    return format_parsers, text_probe
+
+  def _ParseFileWithParsers(
+      self, file_entry, parsers, stat_obj, text_probe=None,
+      serialized_events=None):
+    """Parses a file with parsers.
+
+    Args:
+      file_entry: A file entry object.
+      parsers: A list of parser objects.
+      stat_obj: The stat object of the file entry.
+      text_probe: Optional text probe (instance of TextProbe) the text
+                  parsers are verified against before they parse the file.
+                  The default is None.
+      serialized_events: Optional list to which tuples of the name of
+                         the parser and the serialized event objects, as
+                         produced by the parser, are appended. An event
+                         object that cannot be serialized is appended as
+                         None. The default is None.
+
+    Returns:
+      A boolean value to indicate at least one of the parsers was able to
+      parse the file.
+    """
+    parsed = False
+    for parsing_object in parsers:
+      if (text_probe and isinstance(parsing_object, text_parser.TextParser)
+          and not parsing_object.VerifyTextProbe(text_probe)):
+        logging.debug(u'Not a {0:s} file ({1:s}) - text probe mismatch.'.format(
+            parsing_object.parser_name, file_entry.name))
+        continue
 
-    # TODO: Not go through all parsers, just the ones
-    # that the classifier classifies the file as.
-    # Do this when classifier is ready.
-    # The classifier will return a "type" back, which refers
-    # to a key in the self._parsers dict. If the results are
-    # inconclusive the "all" key is used, or the key is not found.
-    # key = self._parsers.get(classification, 'all')
-    stat_obj = file_entry.GetStat()
-    for parsing_object in self._parsers['all']:
       logging.debug(u'Checking [{0:s}] against: {1:s}'.format(
           file_entry.name, parsing_object.parser_name))
       try:
@@ -189,6 +347,19 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
           if not event_object:
             continue
 
+          if serialized_events is not None:
+            try:
+              event_object_data = self._event_object_serializer.WriteSerialized(
+                  event_object)
+            except (RuntimeError, ValueError) as exception:
+              logging.debug(
+                  u'Unable to serialize event object with error: {0:s}'.format(
+                      exception))
+              event_object_data = None
+
+            serialized_events.append(
+                (parsing_object.parser_name, event_object_data))
+
           self._ParseEvent(
               event_object, file_entry, parsing_object.parser_name, stat_obj)
 
@@ -220,6 +391,124 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
         if self._single_process_mode and self._debug_mode:
           pdb.post_mortem()
 
+      else:
+        parsed = True
+
+    return parsed
+
+  def _ParseFileFromContentHashIndex(self, file_entry, stat_obj, content_hash):
+    """Parses a file from the events of its content in the content hash index.
+
+    The events are adjusted for the file entry, e.g. its path specification,
+    as if they were produced by parsing the file.
+
+    Args:
+      file_entry: A file entry object.
+      stat_obj: The stat object of the file entry.
+      content_hash: The content hash of the file entry.
+
+    Returns:
+      A boolean value to indicate the events were read from the index.
+    """
+    index_entry = self._content_hash_index.GetEntry(content_hash)
+    if not index_entry:
+      return False
+
+    serialized_events = self._content_hash_index.GetEvents(
+        index_entry, content_hash)
+    if serialized_events is None:
+      return False
+
+    logging.debug(
+        u'Reading events of: {0:s} from index, same content as: {1:s}'.format(
+            file_entry.path_spec.comparable, index_entry.path_spec))
+
+    for parser_name, event_object_data in serialized_events:
+      event_object = self._event_object_serializer.ReadSerialized(
+          event_object_data)
+      # Every event object has its own identifier.
+      event_object.uuid = uuid.uuid4().get_hex()
+      self._ParseEvent(event_object, file_entry, parser_name, stat_obj)
+
+    self._counter_of_duplicate_files += 1
+    self._duplicate_bytes += index_entry.size
+    self._duplicate_parse_time += index_entry.parse_time
+    return True
+
+  def ParseFile(self, file_entry):
+    """Run through classifier and appropriate parsers.
+
+    The start of the file is classified once to determine the parsers of
+    the matching format specifications. The parsers without format
+    specification are only run if the file does not match any format
+    specification, or none of the matching parsers can parse the file.
+    The text parsers among them first verify the start of the file, which
+    is read only once, before they parse the file.
+
+    Args:
+      file_entry: A file entry object.
+    """
+    logging.debug(u'[ParseFile] Parsing: {0:s}'.format(
+        file_entry.path_spec.comparable))
+
+    self._current_working_file = getattr(
+        file_entry.path_spec, u'location', file_entry.name)
+
+    if not self._signature_registry:
+      self._signature_registry = signatures.ParserSignatureRegistry(
+          self._parsers['all'])
+
+    stat_obj = file_entry.GetStat()
+    self._ParseFileWithParsers(
+        file_entry, self._signature_registry.format_independent_parsers,
+        stat_obj)
+
+    # The content of a file is only parsed if the same content was not
+    # parsed before, otherwise the events are read from the content hash
+    # index. The metadata of the file is parsed regardless.
+    content_hash = None
+    serialized_events = None
+    if self._content_hash_index_path and not self._content_hash_index:
+      self._content_hash_index = hash_index.ContentHashIndex(
+          self._content_hash_index_path,
+          self._GetContentHashIndexConfigurationIdentifier())
+      try:
+        self._content_hash_index.Open()
+      except IOError as exception:
+        logging.error(u'{0:s}, parsing all files.'.format(exception))
+        self._content_hash_index = None
+        self._content_hash_index_path = None
+
+    if self._content_hash_index:
+      start_time = time.time()
+      content_hash, content_size = self._GetContentHash(file_entry)
+      self._content_hash_time += time.time() - start_time
+
+    if content_hash:
+      if self._ParseFileFromContentHashIndex(
+          file_entry, stat_obj, content_hash):
+        return
+
+      serialized_events = []
+
+    start_time = time.time()
+
+    format_parsers, text_probe = self._ProbeFile(file_entry)
+    if not self._ParseFileWithParsers(
+        file_entry, format_parsers, stat_obj,
+        serialized_events=serialized_events):
+      self._ParseFileWithParsers(
+          file_entry, self._signature_registry.unclassified_parsers, stat_obj,
+          text_probe=text_probe, serialized_events=serialized_events)
+
+    # The events are only added to the index if all of them could be
+    # serialized.
+    if content_hash and None not in [
+        event_object_data for _, event_object_data in serialized_events]:
+      self._content_hash_index.AddEntry(
+          content_hash, content_size, time.time() - start_time,
+          file_entry.path_spec.comparable, serialized_events)
+
     logging.debug(u'Done parsing: {0:s}'.format(
         file_entry.path_spec.comparable))
 
@@ -229,7 +518,11 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
         'is_running': self._is_running,
         'identifier': u'Worker_{0:d}'.format(self._identifier),
         'current_file': self._current_working_file,
-        'counter': self._counter_of_extracted_events}
+        'counter': self._counter_of_extracted_events,
+        'duplicate_files': self._counter_of_duplicate_files,
+        'duplicate_bytes': self._duplicate_bytes,
+        'duplicate_parse_time': self._duplicate_parse_time,
+        'content_hash_time': self._content_hash_time}
 
   def Run(self):
     """Start the worker, monitor the queue and parse files."""
@@ -238,8 +531,13 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
         u'Worker {0:d} (PID: {1:d}) started monitoring process queue.'.format(
         self._identifier, self.pid))
 
+    self._content_hash_time = 0.0
+    self._counter_of_duplicate_files = 0
     self._counter_of_extracted_events = 0
+    self._duplicate_bytes = 0
+    self._duplicate_parse_time = 0.0
     self._is_running = True
+    self._slowest_files = []
 
     if self._rpc_proxy:
       try:
@@ -257,10 +555,31 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
 
     self.ConsumePathSpecs()
 
+    # Make sure the event objects that are buffered by the storage queue
+    # are sent before the worker stops.
+    self._storage_queue_producer.Flush()
+
     logging.info(
         u'Worker {0:d} (PID: {1:d}) stopped monitoring process queue.'.format(
         self._identifier, os.getpid()))
 
+    for elapsed_time, comparable in self.GetSlowestFiles():
+      logging.info(u'Worker {0:d} processed in {1:.3f} seconds: {2:s}'.format(
+          self._identifier, elapsed_time, comparable.replace(u'\n', u';')))
+
+    if self._content_hash_index:
+      logging.info((
+          u'Worker {0:d} read the events of {1:d} files with duplicate '
+          u'content from the index, saving {2:d} bytes and {3:.3f} seconds '
+          u'of parsing, and spent {4:.3f} seconds calculating content '
+          u'hashes.').format(
+              self._identifier, self._counter_of_duplicate_files,
+              self._duplicate_bytes, self._duplicate_parse_time,
+              self._content_hash_time))
+
+      self._content_hash_index.Close()
+      self._content_hash_index = None
+
     self._is_running = False
     self._current_working_file = u''
 
@@ -273,6 +592,20 @@ class EventExtractionWorker(queue.PathSpecQueueConsumer):
       if proxy_thread.isAlive():
         proxy_thread.join()
 
+  def SetContentHashIndex(self, content_hash_index_path):
+    """Sets the content hash index.
+
+    The events of files with content that is already in the index are read
+    from the index instead of parsing the file, other than for its metadata.
+    Note that every file is read an additional time to calculate its content
+    hash.
+
+    Args:
+      content_hash_index_path: the path of the content hash index file or
+                               None to parse every file.
+    """
+    self._content_hash_index_path = content_hash_index_path
+
   def SetDebugMode(self, debug_mode):
     """Sets the debug mode.
 
@@ -38,6 +38,7 @@ import plaso
 from plaso import parsers   # pylint: disable=unused-import
 from plaso.engine import engine
 from plaso.engine import scanner
+from plaso.engine import scheduler
 from plaso.engine import utils as engine_utils
 from plaso.frontend import rpc_proxy
 from plaso.lib import errors
@@ -285,6 +286,10 @@ class ExtractionFrontend(Frontend):
   # The maximum number of processes.
   MAXIMUM_WORKERS = 15
 
+  # The maximum number of event objects a worker sends to the storage
+  # process as a single batch.
+  _STORAGE_QUEUE_BATCH_SIZE = 500
+
   _SOURCE_TYPE_DEVICE = 1
   _SOURCE_TYPE_DIRECTORY = 2
   _SOURCE_TYPE_FILE = 3
@@ -304,6 +309,7 @@ class ExtractionFrontend(Frontend):
     super(ExtractionFrontend, self).__init__(input_reader, output_writer)
     self._collection_process = None
     self._collector = None
+    self._compress_storage = True
     self._debug_mode = False
     self._engine = None
     self._file_system_scanner = scanner.FileSystemScanner()
@@ -355,13 +361,17 @@ class ExtractionFrontend(Frontend):
       raise errors.BadConfigOption(
           u'Unable to write to storage file: {0:s}'.format(storage_file_path))
 
-  def _CreateExtractionWorker(self, worker_number, options, pre_obj):
+  def _CreateExtractionWorker(
+      self, worker_number, options, pre_obj, process_queue=None):
     """Creates an extraction worker object.
 
     Args:
       worker_number: number that identifies the worker.
       options: the command line arguments (instance of argparse.Namespace).
       pre_obj: The preprocessing object (instance of PreprocessObject).
+      process_queue: Optional process queue (instance of Queue) the worker
+                     should consume. The default is None, which represents
+                     the collection queue.
 
     Returns:
       An extraction worker (instance of worker.ExtractionWorker).
@@ -371,7 +381,8 @@ class ExtractionFrontend(Frontend):
     # number to zero and then adjust it later.
     proxy_server = rpc_proxy.StandardRpcProxyServer()
     extraction_worker = self._engine.CreateExtractionWorker(
-        worker_number, pre_obj, self._parsers, rpc_proxy=proxy_server)
+        worker_number, pre_obj, self._parsers, rpc_proxy=proxy_server,
+        process_queue=process_queue)
 
     extraction_worker.SetDebugMode(self._debug_mode)
     extraction_worker.SetSingleProcessMode(self._single_process_mode)
@@ -379,13 +390,16 @@ class ExtractionFrontend(Frontend):
     open_files = getattr(options, 'open_files', None)
     extraction_worker.SetOpenFiles(open_files)
 
+    content_hash_index = getattr(options, 'content_hash_index', None)
+    extraction_worker.SetContentHashIndex(content_hash_index)
+
     if getattr(options, 'os', None):
       mount_path = getattr(options, 'filename', None)
       extraction_worker.SetMountPath(mount_path)
 
     filter_query = getattr(options, 'filter', None)
     if filter_query:
-      filter_object = pfilter.GetMatcher(filter_query)
+      filter_object = pfilter.GetMatcher(filter_query, compiled=True)
       extraction_worker.SetFilterObject(filter_object)
 
     text_prepend = getattr(options, 'text_prepend', None)
@@ -703,6 +717,7 @@ class ExtractionFrontend(Frontend):
     collection_information['file_processed'] = self._source_path
     collection_information['output_file'] = self._storage_file_path
     collection_information['protobuf_size'] = self._buffer_size
+    collection_information['compressed_storage'] = self._compress_storage
     collection_information['parser_selection'] = getattr(
         options, 'parsers', '(no list set)')
     collection_information['preferred_encoding'] = self.preferred_encoding
@@ -863,9 +878,18 @@ class ExtractionFrontend(Frontend):
 
     logging.info(u'Starting extraction in multi process mode.')
 
+    output_module = getattr(options, 'output_module', None)
+
     collection_queue = queue.MultiThreadedQueue()
-    storage_queue = queue.MultiThreadedQueue()
-    self._engine = engine.Engine(collection_queue, storage_queue)
+    storage_queue = queue.MultiThreadedQueue(
+        maximum_batch_size=self._STORAGE_QUEUE_BATCH_SIZE)
+
+    # When writing to a storage file the workers serialize the event objects
+    # so that the storage process does not need to. The output modules used
+    # by the bypass storage writer require the event objects.
+    self._engine = engine.Engine(
+        collection_queue, storage_queue,
+        serialize_event_objects=not output_module)
 
     self._engine.SetSource(
         self._source_path_spec, resolver_context=self._resolver_context)
@@ -881,14 +905,14 @@ class ExtractionFrontend(Frontend):
 
     self._PreprocessSetCollectionInformation(options, pre_obj)
 
-    output_module = getattr(options, 'output_module', None)
     if output_module:
       storage_writer = storage.BypassStorageWriter(
           storage_queue, self._storage_file_path,
           output_module_string=output_module, pre_obj=pre_obj)
     else:
       storage_writer = storage.StorageFileWriter(
-          storage_queue, self._storage_file_path, self._buffer_size, pre_obj)
+          storage_queue, self._storage_file_path, self._buffer_size, pre_obj,
+          compress=self._compress_storage)
 
     logging.debug(u'Preprocessing done.')
 
@@ -944,6 +968,12 @@ class ExtractionFrontend(Frontend):
     if rpc_proxy_client:
       self._collector.SetProxy(rpc_proxy_client)
 
+    # The dispatcher hands out the collected path specifications to the
+    # workers largest file first, hence the collector includes the sizes.
+    self._collector.SetIncludeFileSizes(True)
+    dispatcher = scheduler.PathSpecDispatcher(
+        collection_queue, self._number_of_worker_processes)
+
     self._DebugPrintCollector(options)
 
     logging.info(u'Starting storage process.')
@@ -957,15 +987,21 @@ class ExtractionFrontend(Frontend):
           name='Collection', target=self._collector.Collect)
       self._collection_process.start()
 
+    logging.info(u'Starting path specification dispatcher.')
+    dispatcher_thread = threading.Thread(
+        name='Dispatcher', target=dispatcher.Run)
+    dispatcher_thread.daemon = True
+    dispatcher_thread.start()
+
     logging.info(u'Starting worker processes to extract events.')
 
     for worker_nr in range(self._number_of_worker_processes):
       extraction_worker = self._CreateExtractionWorker(
-          worker_nr, options, pre_obj)
+          worker_nr, options, pre_obj,
+          process_queue=dispatcher.GetWorkerQueue(worker_nr))
 
       logging.debug(u'Starting worker: {0:d} process'.format(worker_nr))
       worker_name = u'Worker_{0:d}'.format(worker_nr)
-      # TODO: Test to see if a process pool can be a better choice.
       self._worker_processes[worker_name] = multiprocessing.Process(
           name=worker_name, target=extraction_worker.Run)
 
@@ -1049,6 +1085,11 @@ class ExtractionFrontend(Frontend):
           # Remove it from our list of active workers.
           del self._worker_processes[process_name]
 
+    # A worker that exited abnormally leaves the dispatcher waiting for its
+    # work request, a second end of input stops the dispatcher regardless.
+    collection_queue.SignalEndOfInput()
+    dispatcher_thread.join()
+
     logging.info(u'Processing is done, waiting for storage to complete.')
 
     self._engine.SignalEndOfInputStorageQueue()
@@ -1152,7 +1193,8 @@ class ExtractionFrontend(Frontend):
     else:
       storage_writer = storage.StorageFileWriter(
           storage_queue, self._storage_file_path,
-          buffer_size=self._buffer_size, pre_obj=pre_obj)
+          buffer_size=self._buffer_size, pre_obj=pre_obj,
+          compress=self._compress_storage)
 
     logging.debug(u'Starting storage.')
     storage_writer.WriteEventObjects()
@@ -1290,7 +1332,8 @@ class ExtractionFrontend(Frontend):
 
     self._filter_expression = getattr(options, 'filter', None)
     if self._filter_expression:
-      self._filter_object = pfilter.GetMatcher(self._filter_expression)
+      self._filter_object = pfilter.GetMatcher(
+          self._filter_expression, compiled=True)
       if not self._filter_object:
         raise errors.BadConfigOption(
             u'Invalid filter expression: {0:s}'.format(self._filter_expression))
@@ -1309,6 +1352,8 @@ class ExtractionFrontend(Frontend):
     self._single_process_mode = getattr(
         options, 'single_process', False)
 
+    self._compress_storage = not getattr(options, 'uncompressed_storage', False)
+
   def PreprocessSource(self, options):
     """Preprocesses the source.
 
@@ -237,6 +237,26 @@ def Main():
       action='store', default=0,
       help='The buffer size for the output (defaults to 196MiB).')
 
+  performance_group.add_argument(
+      '--uncompressed_storage', '--uncompressed-storage',
+      dest='uncompressed_storage', action='store_true', default=False, help=(
+          u'Store the events uncompressed. The storage file will be larger '
+          u'but it can be read faster, e.g. by psort, since no decompression '
+          u'is needed and the data is read directly from a memory map.'))
+
+  performance_group.add_argument(
+      '--content_hash_index', '--content-hash-index',
+      dest='content_hash_index', action='store', type=unicode, default=None,
+      metavar='PATH', help=(
+          u'Path of a content hash index file, which is created if it does '
+          u'not exist. The index maps the SHA-256 of the content of a file '
+          u'to the events parsed from it. The events of a file with content '
+          u'that is in the index, e.g. a file that is the same in multiple '
+          u'VSS stores or that was parsed in a previous run with the same '
+          u'parsers, are read from the index instead of parsing the file. '
+          u'Note that every file is read an additional time to calculate '
+          u'its SHA-256, which is slower than parsing small files.'))
+
   performance_group.add_argument(
       '--workers', dest='workers', action='store', type=int, default=0,
       help=('The number of worker threads [defaults to available system '
@@ -110,6 +110,11 @@ class PinfoFrontend(frontend.AnalysisFrontend):
     else:
       for key, value in store_information.iteritems():
         if key not in ['Number']:
+          if isinstance(value, dict) and 'bloom_filters' in value:
+            # The bloom filters are not human readable.
+            value = dict(value)
+            value['bloom_filters'] = sorted(value['bloom_filters'].keys())
+
           lines_of_text.append(
               u'\t{0:s} =\n{1!s}'.format(key, self._printer.pformat(value)))
 
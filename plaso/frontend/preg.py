@@ -58,13 +58,13 @@ from plaso.parsers.winreg_plugins import interface as winreg_interface
 from plaso.preprocessors import interface as preprocess_interface
 from plaso.winreg import cache
 from plaso.winreg import path_expander as winreg_path_expander
-from plaso.winreg import winregistry
 
 
 class RegCache(object):
   """Cache for current hive and Registry key."""
 
   # Attributes that are cached.
+  codepage = 'cp1252'
   cur_key = ''
   hive = None
   hive_type = 'UNKNOWN'
@@ -104,9 +104,10 @@ class RegCache(object):
   @classmethod
   def BuildCache(cls):
     """Build the Registry cache."""
-    # Calculate the Registry cache.
-    cls.reg_cache = cache.WinRegistryCache()
-    cls.reg_cache.BuildCache(cls.hive, cls.hive_type)
+    # The Registry cache is calculated once per hive and shared with
+    # the preprocessors.
+    cls.reg_cache = cache.FILE_CACHE.GetRegistryCache(
+        cls.file_entry, cls.hive_type, codepage=cls.codepage)
     cls.path_expander = winreg_path_expander.WinRegistryKeyPathExpander(
         cls.pre_obj, cls.reg_cache)
 
@@ -814,11 +815,9 @@ def OpenHive(filename_or_path_spec, hive_collector, codepage='cp1252'):
 
   use_codepage = getattr(RegCache.pre_obj, 'code_page', codepage)
 
-  win_registry = winregistry.WinRegistry(
-      winregistry.WinRegistry.BACKEND_PYREGF)
-
   try:
-    RegCache.hive = win_registry.OpenFile(file_entry, codepage=use_codepage)
+    RegCache.hive = cache.FILE_CACHE.OpenFile(
+        file_entry, codepage=use_codepage)
   except IOError:
     if filename is not None:
       filename_string = filename
@@ -829,7 +828,15 @@ def OpenHive(filename_or_path_spec, hive_collector, codepage='cp1252'):
     logging.error(
         u'Unable to open Registry hive: {0:s}'.format(filename_string))
     sys.exit(1)
+
+  # The previously opened hive is released, which allows the cache to close
+  # it.
+  if RegCache.hive:
+    cache.FILE_CACHE.CloseFile(
+        RegCache.file_entry, codepage=RegCache.codepage)
+
   RegCache.SetHiveType()
+  RegCache.codepage = use_codepage
   RegCache.file_entry = file_entry
   RegCache.BuildCache()
   RegCache.cur_key = RegCache.hive.GetKeyByPath('\\')
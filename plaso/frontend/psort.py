@@ -67,6 +67,7 @@ class PsortFrontend(frontend.AnalysisFrontend):
     self._filter_buffer = None
     self._filter_expression = None
     self._filter_object = None
+    self._number_of_worker_processes = 0
     self._output_module_class = None
     self._output_stream = None
     self._slice_size = 5
@@ -207,6 +208,8 @@ class PsortFrontend(frontend.AnalysisFrontend):
     if not self._output_stream:
       self._output_stream = sys.stdout
 
+    self._number_of_worker_processes = getattr(options, 'workers', 0)
+
     self._filter_expression = getattr(options, 'filter', None)
     if self._filter_expression:
       self._filter_object = filters.GetFilter(self._filter_expression)
@@ -261,7 +264,16 @@ class PsortFrontend(frontend.AnalysisFrontend):
               self._storage_file_path, exception))
 
     with storage_file:
-      storage_file.SetStoreLimit(self._filter_object)
+      # The events surrounding the events that match the filter are part of
+      # the output when slicing, hence the stores and events that cannot
+      # match the filter cannot be skipped by the storage.
+      if self._filter_buffer:
+        storage_file.SetStoreLimit()
+      else:
+        storage_file.SetStoreLimit(self._filter_object)
+        storage_file.SetEventFilter(self._filter_object)
+      storage_file.SetNumberOfDeserializationProcesses(
+          self._number_of_worker_processes)
 
       try:
         output_module = self._output_module_class(
@@ -340,12 +352,17 @@ class PsortFrontend(frontend.AnalysisFrontend):
       else:
         analysis_producers = []
 
-      output_buffer = output_lib.EventBuffer(output_module, options.dedup)
+      output_buffer = output_lib.EventBuffer(
+          output_module, options.dedup,
+          number_of_processes=self._number_of_worker_processes)
       with output_buffer:
         counter = ProcessOutput(
             output_buffer, output_module, self._filter_object,
             self._filter_buffer, analysis_producers)
 
+      counter['Events Filtered Out'] += (
+          storage_file.GetNumberOfSkippedEventObjects())
+
       for information in storage_file.GetStorageInformation():
         if hasattr(information, 'counter'):
           counter['Stored Events'] += information.counter['total']
@@ -622,6 +639,14 @@ def Main():
           'the result set. The default value is 5]. See --slice or --slicer '
           'for more details about this option.'))
 
+  tool_group.add_argument(
+      '--workers', dest='workers', action='store', type=int, default=0,
+      help=(
+          'The number of worker processes used to deserialize the events '
+          'read from the storage file and to format the events of output '
+          'modules that support it. The default is 0, which deserializes '
+          'and formats the events in the main process.'))
+
   tool_group.add_argument(
       '-v', '--version', dest='version', action='version',
       version='log2timeline - psort version {0:s}'.format(plaso.GetVersion()),
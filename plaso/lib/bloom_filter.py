@@ -0,0 +1,182 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This file contains a bloom filter implementation.
+
+A bloom filter is a compact probabilistic representation of a set of values.
+It reports every value that was added as possibly contained and a value that
+was not added as not contained, except for a small rate of false positives.
+"""
+
+import base64
+import hashlib
+import math
+import struct
+
+
+class BloomFilter(object):
+  """Class that implements a bloom filter."""
+
+  # The default rate of false positives used to determine the size of
+  # a bloom filter.
+  DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+  _MINIMUM_NUMBER_OF_BITS = 64
+
+  def __init__(self, number_of_bits, number_of_hashes, data=None):
+    """Initializes the bloom filter.
+
+    Args:
+      number_of_bits: the number of bits of the bloom filter.
+      number_of_hashes: the number of hashes (bits) set per value.
+      data: optional byte string containing the bits of the bloom filter.
+            The default is None, which represents an empty bloom filter.
+
+    Raises:
+      ValueError: if the number of bits or hashes or the size of the data
+                  is invalid.
+    """
+    super(BloomFilter, self).__init__()
+    if number_of_bits <= 0:
+      raise ValueError(u'Invalid number of bits value out of bounds.')
+
+    if number_of_hashes <= 0:
+      raise ValueError(u'Invalid number of hashes value out of bounds.')
+
+    number_of_bytes = (number_of_bits + 7) // 8
+    if data is None:
+      self._data = bytearray(number_of_bytes)
+    elif len(data) != number_of_bytes:
+      raise ValueError(
+          u'Invalid data size value does not match number of bits.')
+    else:
+      self._data = bytearray(data)
+
+    self.number_of_bits = number_of_bits
+    self.number_of_hashes = number_of_hashes
+
+  def _GetBitIndexes(self, value):
+    """Retrieves the indexes of the bits that represent a value.
+
+    Args:
+      value: the value.
+
+    Returns:
+      A list of bit indexes.
+    """
+    if isinstance(value, unicode):
+      value = value.encode('utf-8')
+    elif not isinstance(value, str):
+      value = str(value)
+
+    # Use double hashing to derive the hashes from a single digest.
+    first_hash, second_hash = struct.unpack(
+        '<QQ', hashlib.md5(value).digest())
+    return [
+        (first_hash + index * second_hash) % self.number_of_bits
+        for index in range(self.number_of_hashes)]
+
+  def Add(self, value):
+    """Adds a value to the bloom filter.
+
+    Args:
+      value: the value.
+    """
+    for bit_index in self._GetBitIndexes(value):
+      self._data[bit_index >> 3] |= 1 << (bit_index & 0x07)
+
+  def CopyToDict(self):
+    """Copies the bloom filter to a dictionary.
+
+    Returns:
+      A dictionary containing the number of bits, the number of hashes and
+      the base64 encoded bits of the bloom filter.
+    """
+    return {
+        'number_of_bits': self.number_of_bits,
+        'number_of_hashes': self.number_of_hashes,
+        'data': base64.b64encode(str(self._data))}
+
+  def MayContain(self, value):
+    """Determines if the bloom filter possibly contains a value.
+
+    Args:
+      value: the value.
+
+    Returns:
+      False if the value was not added to the bloom filter, True if it was
+      or in case of a false positive.
+    """
+    for bit_index in self._GetBitIndexes(value):
+      if not self._data[bit_index >> 3] & (1 << (bit_index & 0x07)):
+        return False
+    return True
+
+  @classmethod
+  def CopyFromDict(cls, bloom_filter_dict):
+    """Copies a bloom filter from a dictionary.
+
+    Args:
+      bloom_filter_dict: a dictionary as created by CopyToDict.
+
+    Returns:
+      A bloom filter (instance of BloomFilter).
+
+    Raises:
+      ValueError: if the dictionary does not contain a valid bloom filter.
+    """
+    try:
+      return cls(
+          bloom_filter_dict['number_of_bits'],
+          bloom_filter_dict['number_of_hashes'],
+          data=base64.b64decode(bloom_filter_dict['data']))
+    except (KeyError, TypeError) as exception:
+      raise ValueError(u'Invalid bloom filter with error: {0:s}'.format(
+          exception))
+
+  @classmethod
+  def FromValues(cls, values, false_positive_rate=None):
+    """Creates a bloom filter that contains the values.
+
+    The size of the bloom filter is determined by the number of values and
+    the rate of false positives.
+
+    Args:
+      values: a list or set of values.
+      false_positive_rate: optional rate of false positives. The default is
+                           None, which represents DEFAULT_FALSE_POSITIVE_RATE.
+
+    Returns:
+      A bloom filter (instance of BloomFilter).
+    """
+    if false_positive_rate is None:
+      false_positive_rate = cls.DEFAULT_FALSE_POSITIVE_RATE
+
+    number_of_values = max(len(values), 1)
+    number_of_bits = int(math.ceil(
+        -number_of_values * math.log(false_positive_rate) / math.log(2) ** 2))
+    number_of_bits = max(number_of_bits, cls._MINIMUM_NUMBER_OF_BITS)
+
+    number_of_hashes = int(round(
+        float(number_of_bits) / number_of_values * math.log(2)))
+    number_of_hashes = max(number_of_hashes, 1)
+
+    bloom_filter = cls(number_of_bits, number_of_hashes)
+    for value in values:
+      bloom_filter.Add(value)
+
+    return bloom_filter
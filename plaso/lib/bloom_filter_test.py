@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This file contains the tests for the bloom filter."""
+
+import unittest
+
+from plaso.lib import bloom_filter
+
+
+class BloomFilterTest(unittest.TestCase):
+  """Tests for the bloom filter."""
+
+  def testAddAndMayContain(self):
+    """Tests the Add and MayContain functions."""
+    test_filter = bloom_filter.BloomFilter(1024, 4)
+    self.assertFalse(test_filter.MayContain(u'/etc/passwd'))
+
+    test_filter.Add(u'/etc/passwd')
+    test_filter.Add(u'Þessu')
+    test_filter.Add(42)
+
+    self.assertTrue(test_filter.MayContain(u'/etc/passwd'))
+    self.assertTrue(test_filter.MayContain('/etc/passwd'))
+    self.assertTrue(test_filter.MayContain(u'Þessu'))
+    self.assertTrue(test_filter.MayContain(42))
+    self.assertFalse(test_filter.MayContain(u'/etc/shadow'))
+
+    with self.assertRaises(ValueError):
+      bloom_filter.BloomFilter(0, 4)
+
+    with self.assertRaises(ValueError):
+      bloom_filter.BloomFilter(1024, 4, data='\x00')
+
+  def testCopyToAndFromDict(self):
+    """Tests the CopyToDict and CopyFromDict functions."""
+    test_filter = bloom_filter.BloomFilter.FromValues([u'root', u'nobody'])
+    bloom_filter_dict = test_filter.CopyToDict()
+
+    copied_filter = bloom_filter.BloomFilter.CopyFromDict(bloom_filter_dict)
+    self.assertEquals(copied_filter.number_of_bits, test_filter.number_of_bits)
+    self.assertTrue(copied_filter.MayContain(u'root'))
+    self.assertTrue(copied_filter.MayContain(u'nobody'))
+    self.assertFalse(copied_filter.MayContain(u'admin'))
+
+    with self.assertRaises(ValueError):
+      bloom_filter.BloomFilter.CopyFromDict({'number_of_bits': 64})
+
+  def testFromValues(self):
+    """Tests the FromValues function."""
+    values = set([
+        u'/Users/user{0:d}/file'.format(index) for index in range(1000)])
+    test_filter = bloom_filter.BloomFilter.FromValues(values)
+
+    # About 9.6 bits per value for a false positive rate of 1 percent.
+    self.assertEquals(test_filter.number_of_bits, 9586)
+    self.assertEquals(test_filter.number_of_hashes, 7)
+
+    for value in values:
+      self.assertTrue(test_filter.MayContain(value))
+
+    false_positives = 0
+    for index in range(1000):
+      if test_filter.MayContain(u'/Users/other{0:d}/file'.format(index)):
+        false_positives += 1
+
+    self.assertTrue(false_positives < 50)
+
+    test_filter = bloom_filter.BloomFilter.FromValues([])
+    self.assertEquals(test_filter.number_of_bits, 64)
+    self.assertFalse(test_filter.MayContain(u''))
+
+
+if __name__ == '__main__':
+  unittest.main()
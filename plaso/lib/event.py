@@ -183,6 +183,137 @@ class EventObject(object):
 
     return u'|'.join(map(unicode, identity))
 
+  def _GetEqualityAttributeNames(self):
+    """Retrieves the names of the attributes compared for object equality.
+
+    The attribute names match the fields of the EqualityString method.
+
+    Returns:
+      A set of attribute names.
+    """
+    attribute_names = self.GetAttributes().difference(self.COMPARE_EXCLUDE)
+    if getattr(self, 'parser', u'') == u'filestat':
+      attribute_names.discard('timestamp_desc')
+    return attribute_names
+
+  def _GetValueHash(self, value):
+    """Retrieves the hash of an attribute value.
+
+    Args:
+      value: the attribute value.
+
+    Returns:
+      An integer containing the hash of the value, where values that
+      are equal have the same hash.
+    """
+    try:
+      if type(value) is dict:
+        return hash(frozenset(value.iteritems()))
+      elif type(value) in (list, set):
+        return hash(frozenset(value))
+      return hash(value)
+
+    except TypeError:
+      # Values that cannot be hashed, such as dicts that contain lists,
+      # are only compared by IsDuplicate.
+      return 0
+
+  def _IsEqualValue(self, value, other_value):
+    """Determines if two attribute values are equal.
+
+    Unlike the equality operator the types of the values are compared as
+    well, e.g. 1, 1.0 and True are not equal, like their string
+    representations in the EqualityString. Byte and Unicode strings with
+    the same characters are equal.
+
+    Args:
+      value: the attribute value.
+      other_value: the other attribute value.
+
+    Returns:
+      True if the values are equal, otherwise False.
+    """
+    if isinstance(value, basestring) and isinstance(other_value, basestring):
+      return value == other_value
+
+    if type(value) is not type(other_value):
+      return False
+
+    if type(value) is dict:
+      if len(value) != len(other_value):
+        return False
+      for key, item in value.iteritems():
+        if key not in other_value or not self._IsEqualValue(
+            item, other_value[key]):
+          return False
+      return True
+
+    if type(value) in (list, tuple):
+      if len(value) != len(other_value):
+        return False
+      for item, other_item in zip(value, other_value):
+        if not self._IsEqualValue(item, other_item):
+          return False
+      return True
+
+    return value == other_value
+
+  def GetEqualityHash(self):
+    """Return a hash describing the EventObject in terms of object equality.
+
+    The hash is a cheap alternative to the EqualityString. EventObjects that
+    have the same EqualityString have the same hash, but EventObjects that
+    have the same hash are not necessarily equal, which is determined by
+    IsDuplicate.
+
+    Returns:
+      An integer containing the equality hash.
+    """
+    attribute_hashes = []
+    for attribute_name in self._GetEqualityAttributeNames():
+      attribute_hashes.append(
+          (attribute_name, self._GetValueHash(getattr(self, attribute_name))))
+
+    return hash((self.timestamp, self.data_type, frozenset(attribute_hashes)))
+
+  def IsDuplicate(self, event_object):
+    """Return a boolean indicating if two EventObjects are duplicates.
+
+    The details of this function must match the logic of EqualityString,
+    except that the attribute values and their types are compared directly
+    instead of by their string representation. Note that filestat
+    EventObjects without an inode are never duplicates.
+
+    Args:
+      event_object: The EventObject that is being compared to this one.
+
+    Returns:
+      True: if both EventObjects are duplicates, otherwise False.
+    """
+    if self.timestamp != event_object.timestamp:
+      return False
+
+    if self.data_type != event_object.data_type:
+      return False
+
+    attribute_names = self._GetEqualityAttributeNames()
+    # pylint: disable=protected-access
+    if attribute_names != event_object._GetEqualityAttributeNames():
+      return False
+
+    for attribute_name in attribute_names:
+      if not self._IsEqualValue(
+          getattr(self, attribute_name), getattr(event_object, attribute_name)):
+        return False
+
+    if getattr(self, 'parser', u'') == u'filestat':
+      if not hasattr(self, 'inode') or not hasattr(event_object, 'inode'):
+        return False
+      return utils.GetUnicodeString(self.inode) == utils.GetUnicodeString(
+          event_object.inode)
+
+    return True
+
   def __eq__(self, event_object):
     """Return a boolean indicating if two EventObject are considered equal.
 
@@ -214,8 +345,8 @@ class EventObject(object):
       True: if both EventObjects are considered equal, otherwise False.
     """
 
-    # Note: if this method changes, the above EqualityString method MUST be
-    # updated as well
+    # Note: if this method changes, the above EqualityString, GetEqualityHash
+    # and IsDuplicate methods MUST be updated as well
     if not isinstance(event_object, EventObject):
       return False
 
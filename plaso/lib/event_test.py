@@ -288,6 +288,113 @@ class EventObjectTest(unittest.TestCase):
 
     self.assertNotEquals(event_a.EqualityString(), event_b.EqualityString())
 
+  def testEqualityHashAndIsDuplicate(self):
+    """Test the EventObject GetEqualityHash and IsDuplicate."""
+    event_a = event.EventObject()
+    event_b = event.EventObject()
+    event_c = event.EventObject()
+    event_d = event.EventObject()
+
+    event_a.timestamp = 123
+    event_a.timestamp_desc = 'LAST WRITTEN'
+    event_a.data_type = 'mock:nothing'
+    event_a.inode = 124
+    event_a.filename = 'c:/bull/skrytinmappa/skra.txt'
+    event_a.strings = {'user': 'joe', 'groups': set(['users', 'wheel'])}
+    event_a.another_attribute = False
+
+    event_b.timestamp = 123
+    event_b.timestamp_desc = 'LAST WRITTEN'
+    event_b.data_type = 'mock:nothing'
+    event_b.inode = 623423
+    event_b.filename = 'c:/afrit/öñṅûŗ₅ḱŖūα.txt'
+    event_b.strings = {'user': 'joe', 'groups': set(['wheel', 'users'])}
+    event_b.another_attribute = False
+
+    event_c.timestamp = 123
+    event_c.timestamp_desc = 'LAST UPDATED'
+    event_c.data_type = 'mock:nothing'
+    event_c.inode = 124
+    event_c.filename = 'c:/bull/skrytinmappa/skra.txt'
+    event_c.strings = {'user': 'joe', 'groups': set(['users', 'wheel'])}
+    event_c.another_attribute = False
+
+    event_d.timestamp = 123
+    event_d.timestamp_desc = 'LAST WRITTEN'
+    event_d.data_type = 'mock:nothing'
+    event_d.inode = 124
+    event_d.filename = 'c:/bull/skrytinmappa/skra.txt'
+    event_d.strings = {'user': 'joe', 'groups': set(['users', 'wheel'])}
+    event_d.another_attribute = False
+    event_d.weirdness = 'I am a potato'
+
+    self.assertEquals(event_a.GetEqualityHash(), event_b.GetEqualityHash())
+    self.assertTrue(event_a.IsDuplicate(event_b))
+    self.assertFalse(event_a.IsDuplicate(event_c))
+    self.assertFalse(event_a.IsDuplicate(event_d))
+    self.assertFalse(event_d.IsDuplicate(event_a))
+
+  def testIsDuplicateValueTypes(self):
+    """Test that IsDuplicate compares the types of the values."""
+    event_a = event.EventObject()
+    event_a.timestamp = 123
+    event_a.data_type = 'mock:nothing'
+    event_a.value = 1
+    event_a.strings = {'count': 1}
+    event_a.text = 'text'
+
+    for value in [True, 1.0]:
+      event_b = event.EventObject()
+      event_b.timestamp = 123
+      event_b.data_type = 'mock:nothing'
+      event_b.value = value
+      event_b.strings = {'count': 1}
+      event_b.text = 'text'
+
+      self.assertNotEquals(event_a.EqualityString(), event_b.EqualityString())
+      self.assertFalse(event_a.IsDuplicate(event_b))
+
+    event_b.value = u'1'
+    self.assertFalse(event_a.IsDuplicate(event_b))
+
+    event_b.value = 1
+    event_b.strings = {'count': True}
+    self.assertFalse(event_a.IsDuplicate(event_b))
+
+    # Byte and Unicode strings with the same characters are duplicates.
+    event_b.strings = {'count': 1}
+    event_b.text = u'text'
+    self.assertEquals(event_a.EqualityString(), event_b.EqualityString())
+    self.assertTrue(event_a.IsDuplicate(event_b))
+
+  def testIsDuplicateFileStatParser(self):
+    """Test that FileStatParser duplicates depend on the inode."""
+    event_a = event.EventObject()
+    event_b = event.EventObject()
+
+    event_a.timestamp = 123
+    event_a.timestamp_desc = 'LAST WRITTEN'
+    event_a.data_type = 'mock:nothing'
+    event_a.parser = 'filestat'
+    event_a.filename = 'c:/bull/skrytinmappa/skra.txt'
+
+    event_b.timestamp = 123
+    event_b.timestamp_desc = 'LAST ACCESSED'
+    event_b.data_type = 'mock:nothing'
+    event_b.parser = 'filestat'
+    event_b.filename = 'c:/bull/skrytinmappa/skra.txt'
+
+    # The timestamp description is not compared for filestat events.
+    self.assertEquals(event_a.GetEqualityHash(), event_b.GetEqualityHash())
+    self.assertFalse(event_a.IsDuplicate(event_b))
+
+    event_a.inode = 124
+    event_b.inode = u'124'
+    self.assertTrue(event_a.IsDuplicate(event_b))
+
+    event_b.inode = 125
+    self.assertFalse(event_a.IsDuplicate(event_b))
+
   def testNotInEventAndNoParent(self):
     """Call to an attribute that does not exist."""
     event_object = TestEvent1(0, {})
@@ -18,6 +18,7 @@
 
 import logging
 import re
+import string
 
 from plaso.lib import errors
 from plaso.lib import registry
@@ -57,6 +58,130 @@ class EventTimestamp(object):
   LAST_PRINTED = u'Last Printed Time'
 
 
+class FormatStringTemplate(object):
+  """Class that implements a compiled format string.
+
+     The named fields of the format string are replaced by positional fields
+     so that only the values of the attributes used by the format string need
+     to be retrieved from the event object. Format strings that cannot be
+     compiled, e.g. that contain positional or nested fields, are formatted
+     with all the values of the event object.
+  """
+
+  # Regular expression that matches the attribute name of a field name,
+  # e.g. "name" in "name.attribute" or "name[0]".
+  _ATTRIBUTE_NAME_RE = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
+
+  def __init__(self, format_string):
+    """Initializes and compiles the format string template.
+
+    Args:
+      format_string: the format string.
+    """
+    super(FormatStringTemplate, self).__init__()
+    self.attribute_names = []
+    self.format_string = format_string
+    self._template = self._Compile(format_string)
+
+  def _Compile(self, format_string):
+    """Compiles the format string.
+
+    Args:
+      format_string: the format string.
+
+    Returns:
+      The format string with positional fields or None if the format string
+      cannot be compiled.
+    """
+    template_pieces = []
+    try:
+      for literal_text, field_name, format_spec, conversion in (
+          string.Formatter().parse(format_string)):
+        # The pieces are concatenated to keep the type of the format string.
+        template_pieces.append(
+            literal_text.replace('{', '{{').replace('}', '}}'))
+        if field_name is None:
+          continue
+
+        match = self._ATTRIBUTE_NAME_RE.match(field_name)
+        if not match or u'{' in format_spec:
+          return
+
+        attribute_name = match.group(0)
+        field_accessors = field_name[len(attribute_name):]
+        if field_accessors and field_accessors[0] not in u'.[':
+          return
+
+        template_pieces.append(
+            '{' + str(len(self.attribute_names)) + field_accessors)
+        if conversion:
+          template_pieces.append('!' + conversion)
+        if format_spec:
+          template_pieces.append(':' + format_spec)
+        template_pieces.append('}')
+
+        self.attribute_names.append(attribute_name)
+
+    except ValueError:
+      return
+
+    return format_string[:0].join(template_pieces)
+
+  def Format(self, event_object):
+    """Formats the values of an event object.
+
+    Args:
+      event_object: The event object (EventObject) containing the event
+                    specific data.
+
+    Returns:
+      The formatted string.
+
+    Raises:
+      KeyError: if an attribute used by the format string is not defined.
+    """
+    if self._template is None:
+      return self.format_string.format(**event_object.GetValues())
+
+    # The event values are the attributes of the event object, as returned
+    # by GetValues.
+    event_values = event_object.__dict__
+    return self._template.format(*[
+        event_values[attribute_name]
+        for attribute_name in self.attribute_names])
+
+
+# The compiled format string templates, by format string.
+_FORMAT_STRING_TEMPLATES = {}
+
+# The maximum number of cached format string templates.
+_MAXIMUM_NUMBER_OF_FORMAT_STRING_TEMPLATES = 1024
+
+
+def GetFormatStringTemplate(format_string):
+  """Retrieves the compiled template of a format string.
+
+  The format string is compiled the first time it is used. The cache of
+  compiled templates is emptied when it is full, since some output modules
+  change the format strings of the formatters for every event.
+
+  Args:
+    format_string: the format string.
+
+  Returns:
+    The format string template (instance of FormatStringTemplate).
+  """
+  template = _FORMAT_STRING_TEMPLATES.get(format_string, None)
+  if not template:
+    if len(_FORMAT_STRING_TEMPLATES) >= (
+        _MAXIMUM_NUMBER_OF_FORMAT_STRING_TEMPLATES):
+      _FORMAT_STRING_TEMPLATES.clear()
+
+    template = FormatStringTemplate(format_string)
+    _FORMAT_STRING_TEMPLATES[format_string] = template
+  return template
+
+
 class EventFormatterManager(object):
   """Class to manage the event formatters."""
   @classmethod
@@ -203,10 +328,8 @@ class EventFormatter(object):
       raise errors.WrongFormatter(u'Unsupported data type: {:s}.'.format(
           event_object.data_type))
 
-    event_values = event_object.GetValues()
-
     try:
-      msg = self.format_string.format(**event_values)
+      msg = GetFormatStringTemplate(self.format_string).Format(event_object)
     except KeyError as exception:
       msgs = []
       msgs.append(u'Format error: [{0:s}] for: <{1:s}>'.format(
@@ -225,7 +348,8 @@ class EventFormatter(object):
       msg_short = msg
     else:
       try:
-        msg_short = self.format_string_short.format(**event_values)
+        msg_short = GetFormatStringTemplate(self.format_string_short).Format(
+            event_object)
         # Using replace function here because it is faster
         # than re.sub() or string.strip().
         msg_short = msg_short.replace('\r', u'').replace('\n', u'')
@@ -305,6 +429,9 @@ class ConditionalEventFormatter(EventFormatter):
             u'Invalid format string piece: [{:s}] contains more than 1 '
             u'attribute name.').format(format_string_piece))
 
+    # The format strings by the attributes that are set, see GetMessages.
+    self._format_strings = {}
+
     self._format_string_short_pieces_map = []
     for format_string_piece in self.FORMAT_STRING_SHORT_PIECES:
       result = regexp.findall(format_string_piece)
@@ -321,6 +448,61 @@ class ConditionalEventFormatter(EventFormatter):
             u'Invalid short format string piece: [{:s}] contains more '
             u'than 1 attribute name.').format(format_string_piece))
 
+  def _IsAttributeSet(self, event_object, attribute_name):
+    """Determines if the format string piece of an attribute is included.
+
+    Args:
+      event_object: The event object (EventObject) containing the event
+                    specific data.
+      attribute_name: the attribute name of the format string piece or an
+                      empty string for text.
+
+    Returns:
+      A boolean value to indicate the format string piece is included.
+    """
+    if not attribute_name:
+      return True
+
+    # Using getattr here to make sure the attribute is not set to None.
+    # if A.b = None, hasattr(A, b) is True but getattr(A, b, None) is False.
+    if not hasattr(event_object, attribute_name):
+      return False
+
+    attribute = getattr(event_object, attribute_name, None)
+    # If an attribute is an int, yet has zero value we want to include
+    # that in the format string, since that is still potentially valid
+    # information. Otherwise we would like to skip it.
+    return type(attribute) in (bool, int, long, float) or bool(attribute)
+
+  def _JoinFormatStringPieces(self, attributes_set, attributes_set_short):
+    """Joins the format string pieces of the attributes that are set.
+
+    Args:
+      attributes_set: a tuple of boolean values that indicate which format
+                      string pieces are included.
+      attributes_set_short: a tuple of boolean values that indicate which
+                            short format string pieces are included.
+
+    Returns:
+      A tuple of the format string and the short format string.
+    """
+    string_pieces = [
+        format_string_piece
+        for format_string_piece, is_set in zip(
+            self.FORMAT_STRING_PIECES, attributes_set)
+        if is_set]
+    format_string = unicode(self.FORMAT_STRING_SEPARATOR.join(string_pieces))
+
+    string_pieces = [
+        format_string_piece
+        for format_string_piece, is_set in zip(
+            self.FORMAT_STRING_SHORT_PIECES, attributes_set_short)
+        if is_set]
+    format_string_short = unicode(
+        self.FORMAT_STRING_SEPARATOR.join(string_pieces))
+
+    return format_string, format_string_short
+
   def GetMessages(self, event_object):
     """Returns a list of messages extracted from an event object.
 
@@ -336,29 +518,27 @@ class ConditionalEventFormatter(EventFormatter):
       raise errors.WrongFormatter(u'Unsupported data type: {:s}.'.format(
           event_object.data_type))
 
-    # Using getattr here to make sure the attribute is not set to None.
-    # if A.b = None, hasattr(A, b) is True but getattr(A, b, None) is False.
-    string_pieces = []
-    for map_index, attribute_name in enumerate(self._format_string_pieces_map):
-      if not attribute_name or hasattr(event_object, attribute_name):
-        if attribute_name:
-          attribute = getattr(event_object, attribute_name, None)
-          # If an attribute is an int, yet has zero value we want to include
-          # that in the format string, since that is still potentially valid
-          # information. Otherwise we would like to skip it.
-          if type(attribute) not in (bool, int, long, float) and not attribute:
-            continue
-        string_pieces.append(self.FORMAT_STRING_PIECES[map_index])
-    self.format_string = unicode(
-        self.FORMAT_STRING_SEPARATOR.join(string_pieces))
-
-    string_pieces = []
-    for map_index, attribute_name in enumerate(
-        self._format_string_short_pieces_map):
-      if not attribute_name or getattr(event_object, attribute_name, None):
-        string_pieces.append(self.FORMAT_STRING_SHORT_PIECES[map_index])
-    self.format_string_short = unicode(
-        self.FORMAT_STRING_SEPARATOR.join(string_pieces))
+    # The format strings only depend on which of the attributes are set,
+    # hence they are determined once for every combination of set attributes
+    # and the separator, which can be changed by output modules.
+    attributes_set = tuple(
+        self._IsAttributeSet(event_object, attribute_name)
+        for attribute_name in self._format_string_pieces_map)
+    attributes_set_short = tuple(
+        not attribute_name or bool(getattr(event_object, attribute_name, None))
+        for attribute_name in self._format_string_short_pieces_map)
+
+    lookup_key = (
+        attributes_set, attributes_set_short, self.FORMAT_STRING_SEPARATOR)
+    format_strings = self._format_strings.get(lookup_key, None)
+    if not format_strings:
+      format_strings = self._JoinFormatStringPieces(
+          attributes_set, attributes_set_short)
+      self._format_strings[lookup_key] = format_strings
+
+    # The format strings are set on the formatter since output modules
+    # use them to determine which attributes are part of the messages.
+    self.format_string, self.format_string_short = format_strings
 
     return super(ConditionalEventFormatter, self).GetMessages(event_object)
 
@@ -106,6 +106,49 @@ class EventFormatterUnitTest(unittest.TestCase):
             u'And since this l...'))
 
 
+class FormatStringTemplateTest(unittest.TestCase):
+  """The unit test for the format string template."""
+
+  def setUp(self):
+    """Sets up the needed objects used throughout the test."""
+    self.event_object = event_test.TestEvent1(1335791207939596, {
+        'numeric': 12, 'text': u'some text'})
+
+  def testFormat(self):
+    """Test the format function."""
+    template = eventdata.GetFormatStringTemplate(
+        u'{text} 0x{numeric:02x} {text!r:>12}')
+    self.assertEquals(
+        template.attribute_names, [u'text', u'numeric', u'text'])
+    self.assertEquals(
+        template.Format(self.event_object),
+        u'some text 0x0c u\'some text\'')
+
+    # Positional fields cannot be compiled and use the fallback.
+    template = eventdata.GetFormatStringTemplate(u'{text} {{0}}{0}')
+    with self.assertRaises(IndexError):
+      template.Format(self.event_object)
+
+    template = eventdata.GetFormatStringTemplate(u'{missing}')
+    with self.assertRaises(KeyError):
+      template.Format(self.event_object)
+
+  def testGetFormatStringTemplate(self):
+    """Test that templates are cached by format string."""
+    template = eventdata.GetFormatStringTemplate(u'{text}')
+    self.assertIs(eventdata.GetFormatStringTemplate(u'{text}'), template)
+
+    # The number of cached templates is bounded.
+    # pylint: disable=protected-access
+    for index in range(
+        eventdata._MAXIMUM_NUMBER_OF_FORMAT_STRING_TEMPLATES + 1):
+      eventdata.GetFormatStringTemplate(u'{{text}} {0:d}'.format(index))
+
+    self.assertLessEqual(
+        len(eventdata._FORMAT_STRING_TEMPLATES),
+        eventdata._MAXIMUM_NUMBER_OF_FORMAT_STRING_TEMPLATES)
+
+
 class ConditionalTestEvent1(event_test.TestEvent1):
   DATA_TYPE = 'test:conditional_event1'
 
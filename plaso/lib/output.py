@@ -29,7 +29,9 @@ a human readable format for easy human consumption/analysis.
 """
 
 import abc
+import collections
 import logging
+import multiprocessing
 import sys
 
 from plaso.lib import errors
@@ -62,6 +64,12 @@ class LogOutputFormatter(object):
   # into the argparse parser.
   ARGUMENTS = []
 
+  # Value to indicate the output of an event object does not depend on
+  # the other event objects and is only written using the WriteLine method
+  # of the file handle, so that the event objects can be formatted by
+  # the processes of the event buffer.
+  SUPPORTS_PARALLEL_FORMATTING = False
+
   def __init__(self, store, filehandle=sys.stdout, config=None,
                filter_use=None):
     """Constructor for the output module.
@@ -225,31 +233,161 @@ class FileProtoLogOutputFormatter(FileLogOutputFormatter):
       return self.store.GetSortedEntry(True)
 
 
+# The output module used by a formatting process of the event buffer.
+_FORMATTING_OUTPUT_MODULE = None
+
+
+class _OutputLinesBuffer(object):
+  """Class that buffers the lines written by an output module."""
+
+  def __init__(self):
+    """Initializes the output lines buffer."""
+    super(_OutputLinesBuffer, self).__init__()
+    self.lines = []
+
+  def Close(self):
+    """Closes the buffer."""
+    pass
+
+  def WriteLine(self, line):
+    """Buffers a single line."""
+    self.lines.append(line)
+
+
+def _InitializeFormattingProcess(formatter):
+  """Initializes a formatting process of the event buffer.
+
+  The output module is inherited from the parent process and writes its
+  output to a buffer instead of the output file.
+
+  Args:
+    formatter: the output module (instance of LogOutputFormatter).
+  """
+  # pylint: disable=global-statement
+  global _FORMATTING_OUTPUT_MODULE
+
+  formatter.filehandle = _OutputLinesBuffer()
+  _FORMATTING_OUTPUT_MODULE = formatter
+
+
+def _FormatEventObjects(event_objects):
+  """Formats a chunk of event objects.
+
+  This function is used by the process pool of EventBuffer and therefore
+  needs to be defined at module level.
+
+  Args:
+    event_objects: a list of event objects (instances of EventObject).
+
+  Returns:
+    A list of the lines written by the output module.
+  """
+  formatter = _FORMATTING_OUTPUT_MODULE
+  for event_object in event_objects:
+    try:
+      formatter.WriteEvent(event_object)
+    except errors.WrongFormatter as exception:
+      logging.error(u'Unable to write event: {:s}'.format(exception))
+
+  lines = formatter.filehandle.lines
+  formatter.filehandle.lines = []
+  return lines
+
+
 class EventBuffer(object):
   """Buffer class for EventObject output processing."""
 
   MERGE_ATTRIBUTES = ['inode', 'filename', 'display_name']
 
-  def __init__(self, formatter, check_dedups=True):
+  # The minimum number of event objects that are formatted per chunk by
+  # the process pool.
+  _FORMATTING_CHUNK_SIZE = 1000
+
+  def __init__(self, formatter, check_dedups=True, number_of_processes=0):
     """Initalizes the EventBuffer.
 
     This class is used for buffering up events for duplicate removals
     and for other post-processing/analysis of events before being presented
     by the appropriate output module.
 
+    When the output module supports it, the event objects can be formatted
+    in chunks by a pool of processes, while the output is written in
+    the original order by the current process. The chunks only end at
+    timestamp boundaries, so the duplicate removal is not affected.
+
     Args:
       formatter: An OutputFormatter object.
       check_dedups: Boolean value indicating whether or not the buffer should
       check and merge duplicate entries or not.
+      number_of_processes: Optional number of processes used to format
+                           the event objects, where a value of 1 or less
+                           formats the event objects in the current process.
+                           The default is 0.
     """
     self._buffer_dict = {}
+    self._chunk = []
     self._current_timestamp = 0
+    self._maximum_number_of_pending_chunks = 2 * number_of_processes
+    self._pending_chunks = collections.deque()
+    self._process_pool = None
     self.duplicate_counter = 0
     self.check_dedups = check_dedups
 
     self.formatter = formatter
     self.formatter.Start()
 
+    # The processes are forked after the output module was started, since
+    # the output module is inherited by the processes, and after its output
+    # was flushed, which otherwise could be written again by the processes.
+    if (number_of_processes > 1 and
+        self.formatter.SUPPORTS_PARALLEL_FORMATTING and
+        sys.platform != 'win32'):
+      self.formatter.filehandle.Flush()
+      self._process_pool = multiprocessing.Pool(
+          number_of_processes, _InitializeFormattingProcess,
+          (self.formatter, ))
+
+  def _FormatChunk(self):
+    """Formats the current chunk of event objects by the process pool.
+
+    The lines of the formatted chunks are written when the maximum number
+    of pending chunks is reached.
+    """
+    if self._chunk:
+      self._pending_chunks.append(self._process_pool.apply_async(
+          _FormatEventObjects, (self._chunk, )))
+      self._chunk = []
+
+    while len(self._pending_chunks) >= self._maximum_number_of_pending_chunks:
+      self._WriteLines(self._pending_chunks.popleft().get())
+
+  def _WriteEventObjects(self, event_objects):
+    """Writes event objects using the formatter.
+
+    Args:
+      event_objects: a list of event objects (instances of EventObject).
+    """
+    if self._process_pool:
+      self._chunk.extend(event_objects)
+      if len(self._chunk) >= self._FORMATTING_CHUNK_SIZE:
+        self._FormatChunk()
+      return
+
+    for event_object in event_objects:
+      try:
+        self.formatter.WriteEvent(event_object)
+      except errors.WrongFormatter as exception:
+        logging.error(u'Unable to write event: {:s}'.format(exception))
+
+  def _WriteLines(self, lines):
+    """Writes the lines of a formatted chunk of event objects.
+
+    Args:
+      lines: a list of the lines written by the output module.
+    """
+    for line in lines:
+      self.formatter.filehandle.WriteLine(line)
+
   def Append(self, event_object):
     """Append an EventObject into the processing pipeline.
 
@@ -257,29 +395,36 @@ class EventBuffer(object):
       event_object: The EventObject that is being added.
     """
     if not self.check_dedups:
-      self.formatter.WriteEvent(event_object)
+      if self._process_pool:
+        self._WriteEventObjects([event_object])
+      else:
+        self.formatter.WriteEvent(event_object)
       return
 
     if event_object.timestamp != self._current_timestamp:
       self._current_timestamp = event_object.timestamp
       self.Flush()
 
-    key = event_object.EqualityString()
-    if key in self._buffer_dict:
-      self.JoinEvents(event_object, self._buffer_dict.pop(key))
-    self._buffer_dict[key] = event_object
+    # The event objects are buffered by their equality hash and only
+    # the event objects with the same hash are compared.
+    key = event_object.GetEqualityHash()
+    buffered_event_objects = self._buffer_dict.setdefault(key, [])
+    for index, buffered_event_object in enumerate(buffered_event_objects):
+      if event_object.IsDuplicate(buffered_event_object):
+        self.JoinEvents(event_object, buffered_event_objects.pop(index))
+        break
+    buffered_event_objects.append(event_object)
 
   def Flush(self):
     """Flushes the buffer by sending records to a formatter and prints."""
     if not self._buffer_dict:
       return
 
-    for event_object in self._buffer_dict.values():
-      try:
-        self.formatter.WriteEvent(event_object)
-      except errors.WrongFormatter as exception:
-        logging.error(u'Unable to write event: {:s}'.format(exception))
+    event_objects = []
+    for buffered_event_objects in self._buffer_dict.itervalues():
+      event_objects.extend(buffered_event_objects)
 
+    self._WriteEventObjects(event_objects)
     self._buffer_dict = {}
 
   def JoinEvents(self, event_a, event_b):
@@ -310,6 +455,17 @@ class EventBuffer(object):
     """Call the formatter to produce the closing line."""
     self.Flush()
 
+    if self._process_pool:
+      try:
+        self._FormatChunk()
+        while self._pending_chunks:
+          self._WriteLines(self._pending_chunks.popleft().get())
+
+      finally:
+        self._process_pool.terminate()
+        self._process_pool.join()
+        self._process_pool = None
+
     if self.formatter:
       self.formatter.End()
 
@@ -389,6 +545,11 @@ class OutputFilehandle(object):
     if self._filehandle and not self._standard_out:
       self._filehandle.close()
 
+  def Flush(self):
+    """Flush the data written to the filehandle."""
+    if self._filehandle:
+      self._filehandle.flush()
+
   def __exit__(self, unused_type, unused_value, unused_traceback):
     """Make usable with "with" statement."""
     self.Close()
@@ -37,6 +37,12 @@ class DummyEvent(object):
   def EqualityString(self):
     return u';'.join(map(str, [self.timestamp, self.entry]))
 
+  def GetEqualityHash(self):
+    return hash((self.timestamp, self.entry))
+
+  def IsDuplicate(self, event_object):
+    return self.EqualityString() == event_object.EqualityString()
+
 
 class TestOutput(output.LogOutputFormatter):
   """This is a test output module that provides a simple XML."""
@@ -67,6 +73,23 @@ class TestOutput(output.LogOutputFormatter):
     self.filehandle.write(u'</EventFile>\n')
 
 
+class TestFileOutput(output.FileLogOutputFormatter):
+  """This is a test output module that writes a line per event."""
+
+  SUPPORTS_PARALLEL_FORMATTING = True
+
+  def EventBody(self, event_object):
+    self.filehandle.WriteLine(u'{0:d} {1:s}\n'.format(
+        event_object.timestamp, event_object.entry))
+
+  def Start(self):
+    self.filehandle.WriteLine(u'Header\n')
+
+  def End(self):
+    self.filehandle.WriteLine(u'Footer\n')
+    super(TestFileOutput, self).End()
+
+
 class PlasoOutputUnitTest(unittest.TestCase):
   """The unit test for plaso output formatting."""
 
@@ -151,6 +174,49 @@ class EventBufferTest(unittest.TestCase):
       event_buffer.Append(DummyEvent(123457, u'Now is different'))
       CheckBufferLength(event_buffer, 1)
 
+  def _WriteEvents(self, number_of_processes):
+    """Writes events through an event buffer.
+
+    Args:
+      number_of_processes: the number of processes used to format the events.
+
+    Returns:
+      A tuple of the output and the number of duplicates.
+    """
+    with tempfile.NamedTemporaryFile(delete=False) as fh:
+      temp_path = fh.name
+
+    # The output module closes the file at the end of the output.
+    formatter = TestFileOutput(None, open(temp_path, 'wb'))
+    event_buffer = output.EventBuffer(
+        formatter, number_of_processes=number_of_processes)
+    # pylint: disable=protected-access
+    event_buffer._FORMATTING_CHUNK_SIZE = 3
+
+    with event_buffer:
+      for index in range(100):
+        # Every timestamp has a duplicate event.
+        event_buffer.Append(DummyEvent(index // 4, u'Entry {0:d}'.format(
+            index % 3)))
+
+    with open(temp_path, 'rb') as fh:
+      output_data = fh.read()
+
+    os.remove(temp_path)
+    return output_data, event_buffer.duplicate_counter
+
+  def testFormattingProcesses(self):
+    """Test formatting the events by a process pool."""
+    expected_output, expected_duplicate_counter = self._WriteEvents(0)
+    self.assertEquals(expected_duplicate_counter, 25)
+    self.assertTrue(expected_output.startswith('Header\n'))
+    self.assertTrue(expected_output.endswith('Footer\n'))
+    self.assertEquals(len(expected_output.split('\n')), 78)
+
+    output_data, duplicate_counter = self._WriteEvents(2)
+    self.assertEquals(output_data, expected_output)
+    self.assertEquals(duplicate_counter, expected_duplicate_counter)
+
 
 class OutputFilehandleTest(unittest.TestCase):
   """Few unit tests for the OutputFilehandle."""
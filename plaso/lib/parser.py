@@ -39,6 +39,10 @@ class BaseParser(object):
 
   NAME = 'base_parser'
 
+  # Value to indicate the parser does not depend on the format of a file,
+  # such as a file system metadata parser, and should parse every file.
+  FORMAT_INDEPENDENT = False
+
   def __init__(self, pre_obj, config=None):
     """Parser constructor.
 
@@ -58,6 +62,21 @@ class BaseParser(object):
     """Return the name of the parser."""
     return self.NAME
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification.
+
+    The signatures of the format specification are matched against the start
+    of a file to determine which parsers should parse the file. A parser
+    without format specification parses the files that do not match any of
+    the format specifications.
+
+    Returns:
+      The format specification (instance of classifier.Specification) or None
+      if the parser does not define one.
+    """
+    return
+
   @abc.abstractmethod
   def Parse(self, file_entry):
     """Verifies and parses the log file and returns EventObjects.
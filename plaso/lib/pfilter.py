@@ -84,6 +84,11 @@ class DictObject(object):
 class PlasoValueExpander(objectfilter.AttributeValueExpander):
   """An expander that gives values based on object attribute names."""
 
+  # The attributes of which the value is derived from the event object
+  # by its event formatter, when the event object does not define them.
+  DERIVED_ATTRIBUTE_NAMES = frozenset([
+      'message', 'source', 'source_long', 'source_short', 'sourcetype'])
+
   def _GetMessage(self, obj):
     """Return a properly formatted message string."""
     ret = u''
@@ -435,12 +440,426 @@ class TimeRangeCache(object):
       return last, first
 
 
-def GetMatcher(query, quiet=False):
-  """Return a filter match object for a given query."""
+def _GetComparisonAttributeName(matcher):
+  """Retrieves the name of the attribute compared by an operator.
+
+  Args:
+    matcher: the filter matcher (instance of objectfilter.Filter).
+
+  Returns:
+    The name of the attribute or None if the filter matcher is not
+    a comparison of a single attribute of the event object.
+  """
+  if not isinstance(matcher, objectfilter.GenericBinaryOperator):
+    return
+
+  attribute_name = matcher.left_operand
+  if (not isinstance(attribute_name, basestring) or
+      not isinstance(matcher.value_expander, PlasoValueExpander) or
+      matcher.value_expander.FIELD_SEPARATOR in attribute_name):
+    return
+
+  # pylint: disable=protected-access
+  return matcher.value_expander._GetAttributeName([attribute_name])
+
+
+class CompiledMatcher(objectfilter.Filter):
+  """Class that implements a filter matcher compiled into a function.
+
+  The operators of the filter matcher are compiled into nested functions
+  that retrieve the attribute values directly, instead of expanding them
+  through the value expander for every comparison. The values of derived
+  attributes, like the message and the source, are determined only once
+  per event object and the operands of the and and or filters are matched
+  in order of cost, so that the cheap attributes are compared first.
+
+  Because of this order, an error raised while determining the value of
+  a derived attribute, e.g. by the event formatter, is raised only when
+  the cheaper operands do not already decide the result. The filter tree
+  raises the error whenever the operand comes first in the query.
+  """
+
+  # The costs of matching an operator.
+  _COST_ATTRIBUTE = 0
+  _COST_REGEXP = 1
+  _COST_DERIVED_ATTRIBUTE = 2
+  _COST_UNCOMPILED = 4
+
+  def __init__(self, matcher):
+    """Initializes and compiles the filter matcher.
+
+    Args:
+      matcher: the filter matcher (instance of objectfilter.Filter).
+    """
+    super(CompiledMatcher, self).__init__(arguments=[matcher])
+    self.matcher = matcher
+    self._function, _ = self._Compile(matcher)
+
+  def _CompileBinaryOperator(self, matcher):
+    """Compiles a binary operator.
+
+    Args:
+      matcher: the binary operator (instance of
+               objectfilter.GenericBinaryOperator).
+
+    Returns:
+      A tuple of the function and the cost of the operator or None if
+      the operator cannot be compiled.
+    """
+    attribute_name = _GetComparisonAttributeName(matcher)
+    if not attribute_name:
+      return
+
+    # pylint: disable=protected-access
+    get_value = matcher.value_expander._GetValue
+
+    if attribute_name in PlasoValueExpander.DERIVED_ATTRIBUTE_NAMES:
+      cost = self._COST_DERIVED_ATTRIBUTE
+
+      def _GetValue(event_object, event_values):
+        """Retrieves the value of a derived attribute once per event."""
+        if attribute_name not in event_values:
+          event_values[attribute_name] = get_value(event_object, attribute_name)
+        return event_values[attribute_name]
+
+    else:
+      cost = self._COST_ATTRIBUTE
+
+      def _GetValue(event_object, unused_event_values):
+        """Retrieves the value of an attribute."""
+        return get_value(event_object, attribute_name)
+
+    if type(matcher) in (objectfilter.Regexp, objectfilter.RegexpInsensitive):
+      cost += self._COST_REGEXP
+      search = matcher.compiled_re.search
+
+      def _Operation(value, unused_right_operand):
+        """Searches the value for the regular expression."""
+        return search(utils.GetUnicodeString(value))
+
+    else:
+      _Operation = matcher.Operation
+
+    bool_value = matcher.bool_value
+    right_operand = matcher.right_operand
+
+    def _Matches(event_object, event_values):
+      """Matches the value of the attribute against the right operand."""
+      value = _GetValue(event_object, event_values)
+      if value is not None:
+        try:
+          if _Operation(value, right_operand):
+            return bool_value
+        except (TypeError, ValueError):
+          pass
+      return not bool_value
+
+    return _Matches, cost
+
+  def _Compile(self, matcher):
+    """Compiles a filter matcher.
+
+    Args:
+      matcher: the filter matcher (instance of objectfilter.Filter).
+
+    Returns:
+      A tuple of the function and the cost of the filter matcher.
+    """
+    if type(matcher) in (objectfilter.AndFilter, objectfilter.OrFilter):
+      compiled_matchers = [
+          self._Compile(child_matcher) for child_matcher in matcher.args]
+      compiled_matchers.sort(key=lambda compiled_matcher: compiled_matcher[1])
+
+      functions = [function for function, _ in compiled_matchers]
+      cost = sum([cost for _, cost in compiled_matchers])
+
+      if isinstance(matcher, objectfilter.AndFilter):
+        def _MatchesAll(event_object, event_values):
+          """Determines if all the operands match."""
+          for function in functions:
+            if not function(event_object, event_values):
+              return False
+          return True
+
+        return _MatchesAll, cost
+
+      def _MatchesAny(event_object, event_values):
+        """Determines if any of the operands match."""
+        if not functions:
+          return True
+
+        for function in functions:
+          if function(event_object, event_values):
+            return True
+        return False
+
+      return _MatchesAny, cost
+
+    if isinstance(matcher, objectfilter.GenericBinaryOperator):
+      compiled_matcher = self._CompileBinaryOperator(matcher)
+      if compiled_matcher:
+        return compiled_matcher
+
+    matches = matcher.Matches
+
+    def _MatchesUncompiled(event_object, unused_event_values):
+      """Matches the event object with the filter matcher."""
+      return matches(event_object)
+
+    return _MatchesUncompiled, self._COST_UNCOMPILED
+
+  def Matches(self, obj):
+    """Determines if an event object matches the filter.
+
+    Args:
+      obj: the event object (instance of EventObject).
+
+    Returns:
+      A boolean value indicating the event object matches the filter.
+    """
+    return self._function(obj, {})
+
+
+class EventValuesPredicate(object):
+  """Class that determines if an event object can match a filter.
+
+  The predicate evaluates the comparisons of a filter matcher that can be
+  determined from a subset of the attribute values of an event object, such
+  as those read from the serialized form of the event object, without having
+  to deserialize the event object. Comparisons that cannot be determined
+  are considered to possibly match.
+  """
+
+  def __init__(self, matcher, attribute_names):
+    """Initializes the predicate.
+
+    Args:
+      matcher: the filter matcher (instance of objectfilter.Filter) as returned
+               by GetMatcher.
+      attribute_names: a list of the names of the attributes of which
+                       the values are provided to CanMatch.
+    """
+    super(EventValuesPredicate, self).__init__()
+    if isinstance(matcher, CompiledMatcher):
+      matcher = matcher.matcher
+
+    self._attribute_names = frozenset(attribute_names)
+    self._matcher = matcher
+
+    comparison_attribute_names = set()
+    self._GetComparisonAttributeNames(matcher, comparison_attribute_names)
+
+    # The names of the compared attributes of which the values are not
+    # provided, for which only whether they are defined can be determined.
+    self.defined_attribute_names = frozenset(
+        comparison_attribute_names.difference(self._attribute_names))
+    self.has_comparisons = bool(comparison_attribute_names)
+
+  def _Evaluate(self, matcher, attribute_values, defined_attribute_names):
+    """Evaluates a filter matcher.
+
+    Args:
+      matcher: the filter matcher (instance of objectfilter.Filter).
+      attribute_values: a dictionary containing the attribute names and
+                        values.
+      defined_attribute_names: a set of the names of all the attributes
+                               defined by the event object or None if not
+                               available.
+
+    Returns:
+      A boolean value indicating the event object matches the filter matcher
+      or None if it cannot be determined.
+    """
+    if isinstance(matcher, objectfilter.AndFilter):
+      result = True
+      for child_matcher in matcher.args:
+        child_result = self._Evaluate(
+            child_matcher, attribute_values, defined_attribute_names)
+        if child_result is False:
+          return False
+        if child_result is None:
+          result = None
+      return result
+
+    if isinstance(matcher, objectfilter.OrFilter):
+      if not matcher.args:
+        return True
+
+      result = False
+      for child_matcher in matcher.args:
+        child_result = self._Evaluate(
+            child_matcher, attribute_values, defined_attribute_names)
+        if child_result:
+          return True
+        if child_result is None:
+          result = None
+      return result
+
+    attribute_name = _GetComparisonAttributeName(matcher)
+    if (not attribute_name or attribute_name == 'tag' or
+        attribute_name in PlasoValueExpander.DERIVED_ATTRIBUTE_NAMES):
+      return
+
+    if attribute_name in attribute_values:
+      # The value expander does not expand attributes with a false value.
+      value = attribute_values[attribute_name] or None
+
+    elif (defined_attribute_names is not None and
+          attribute_name not in self._attribute_names and
+          attribute_name not in defined_attribute_names):
+      value = None
+
+    else:
+      return
+
+    try:
+      if value is not None and matcher.Operate([value]):
+        return matcher.bool_value
+    except objectfilter.Error:
+      return
+
+    return not matcher.bool_value
+
+  def _GetComparisonAttributeNames(self, matcher, attribute_names):
+    """Retrieves the names of the attributes of the comparisons.
+
+    Args:
+      matcher: the filter matcher (instance of objectfilter.Filter).
+      attribute_names: a set the names of the attributes are added to.
+    """
+    if isinstance(matcher, (objectfilter.AndFilter, objectfilter.OrFilter)):
+      for child_matcher in matcher.args:
+        self._GetComparisonAttributeNames(child_matcher, attribute_names)
+      return
+
+    attribute_name = _GetComparisonAttributeName(matcher)
+    if (attribute_name and attribute_name != 'tag' and
+        attribute_name not in PlasoValueExpander.DERIVED_ATTRIBUTE_NAMES):
+      attribute_names.add(attribute_name)
+
+  def CanMatch(self, attribute_values, defined_attribute_names=None):
+    """Determines if an event object can match the filter.
+
+    Args:
+      attribute_values: a dictionary containing the attribute names and values
+                        of the event object, of the attributes of which
+                        the names were provided at initialization. An
+                        attribute that is not in the dictionary is considered
+                        to have an unknown value.
+      defined_attribute_names: optional set of the names of the attributes
+                               defined by the event object, which should
+                               contain at least those that are in
+                               the defined_attribute_names attribute of
+                               the predicate and are defined. An attribute
+                               that is not in the set is considered to not be
+                               defined. The default is None, which represents
+                               that the defined attributes are not known.
+
+    Returns:
+      False if the event object cannot match the filter, True otherwise,
+      which includes when it cannot be determined.
+    """
+    result = self._Evaluate(
+        self._matcher, attribute_values, defined_attribute_names)
+    return result is not False
+
+
+def CanMatchValues(matcher, attribute_values, attribute_value_filters=None):
+  """Determines if objects with specific attribute values can match a filter.
+
+  This is used to skip sets of objects, like the stores in the storage file,
+  of which the possible attribute values are known, without having to match
+  every object.
+
+  Args:
+    matcher: the filter matcher (instance of objectfilter.Filter) as returned
+             by GetMatcher.
+    attribute_values: a dictionary containing the attribute names and a list
+                      of all the possible values of the attribute.
+    attribute_value_filters: optional dictionary containing attribute names
+                             and an object with a MayContain method, like
+                             a bloom filter, that determines if a value is
+                             possibly one of the values of the attribute.
+                             The default is None.
+
+  Returns:
+    False if none of the objects can match the filter, True otherwise, which
+    includes when it cannot be determined.
+  """
+  if isinstance(matcher, CompiledMatcher):
+    matcher = matcher.matcher
+
+  if isinstance(matcher, objectfilter.AndFilter):
+    for child_matcher in matcher.args:
+      if not CanMatchValues(
+          child_matcher, attribute_values, attribute_value_filters):
+        return False
+    return True
+
+  if isinstance(matcher, objectfilter.OrFilter):
+    if not matcher.args:
+      return True
+
+    for child_matcher in matcher.args:
+      if CanMatchValues(
+          child_matcher, attribute_values, attribute_value_filters):
+        return True
+    return False
+
+  if not isinstance(matcher, objectfilter.GenericBinaryOperator):
+    return True
+
+  attribute_name = matcher.left_operand
+  if not isinstance(attribute_name, basestring):
+    return True
+
+  attribute_name = attribute_name.lower()
+  values = attribute_values.get(attribute_name, None)
+  if values is not None:
+    try:
+      for value in values:
+        # The object matches if the operation result equals the bool value,
+        # which is False for a negated operation.
+        if matcher.Operate([value]) == matcher.bool_value:
+          return True
+    except objectfilter.Error:
+      return True
+    return False
+
+  attribute_value_filter = None
+  if attribute_value_filters:
+    attribute_value_filter = attribute_value_filters.get(attribute_name, None)
+
+  # An attribute value filter can only rule out a value that equals
+  # the right operand.
+  if (attribute_value_filter is not None and
+      isinstance(matcher, objectfilter.Equals) and matcher.bool_value):
+    return attribute_value_filter.MayContain(matcher.right_operand)
+
+  return True
+
+
+def GetMatcher(query, quiet=False, compiled=False):
+  """Return a filter match object for a given query.
+
+  Args:
+    query: the filter query.
+    quiet: optional boolean value to indicate errors should not be logged.
+           The default is False.
+    compiled: optional boolean value to indicate the filter matcher should
+              be compiled into a function (instance of CompiledMatcher).
+              The default is False.
+
+  Returns:
+    The filter matcher (instance of objectfilter.Filter) or None if
+    the query is malformed.
+  """
   matcher = None
   try:
     parser = BaseParser(query).Parse()
     matcher = parser.Compile(PlasoAttributeFilterImplementation)
+    if compiled:
+      matcher = CompiledMatcher(matcher)
   except objectfilter.ParseError as exception:
     if not quiet:
       logging.error(u'Filter <{0:s}> malformed: {1:s}'.format(
@@ -19,6 +19,8 @@
 
 import unittest
 
+from plaso.lib import bloom_filter
+from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
 from plaso.lib import objectfilter
@@ -110,6 +112,16 @@ class PfilterEvilFormatter(PfilterFakeFormatter):
   SOURCE_LONG = 'A Truly Evil'
 
 
+class PfilterFailingFormatter(PfilterFakeFormatter):
+  """Formatter that fails to format the message."""
+
+  DATA_TYPE = 'Weirdo:Failing'
+
+  def GetMessages(self, unused_event_object):
+    """Raises an error instead of formatting the message."""
+    raise errors.WrongFormatter(u'Unable to format message.')
+
+
 class PFilterTest(unittest.TestCase):
   """Simple plaso specific tests to the pfilter implementation."""
 
@@ -225,6 +237,118 @@ class PFilterTest(unittest.TestCase):
         '\'bad, bad thing [\\sa-zA-Z\\.]+ evil\'')
     self.RunPlasoTest(event_object, query, True)
 
+  def testCanMatchValues(self):
+    """Test the CanMatchValues function."""
+    attribute_values = {
+        'data_type': ['chrome:history:page_visited', 'fs:stat'],
+        'parser': ['chrome_history', 'filestat']}
+
+    attribute_value_filters = {
+        'filename': bloom_filter.BloomFilter.FromValues([u'/tmp/History'])}
+
+    queries_and_results = [
+        ('parser is \'filestat\'', True),
+        ('parser is \'winreg\'', False),
+        ('parser is not \'winreg\'', True),
+        ('data_type contains \'chrome\'', True),
+        ('data_type contains \'syslog\'', False),
+        ('data_type regexp \'^fs:\'', True),
+        ('parser is \'winreg\' or data_type contains \'CHROME\'', True),
+        ('parser is \'winreg\' or data_type is \'syslog:line\'', False),
+        ('parser is \'filestat\' and data_type is \'syslog:line\'', False),
+        ('parser is \'filestat\' and text contains \'evil\'', True),
+        ('filename is \'/tmp/History\'', True),
+        ('filename is \'/etc/passwd\'', False),
+        ('filename is not \'/etc/passwd\'', True),
+        ('filename contains \'passwd\'', True),
+        ('hostname is \'myhost\'', True)]
+
+    for query, result in queries_and_results:
+      matcher = pfilter.GetMatcher(query)
+      self.assertEqual(
+          result, pfilter.CanMatchValues(
+              matcher, attribute_values, attribute_value_filters), query)
+
+  def testEventValuesPredicate(self):
+    """Test the event values predicate."""
+    attribute_values = {'data_type': u'fs:stat', 'parser': u'filestat'}
+    defined_attribute_names = set(['filename'])
+
+    queries_and_results = [
+        ('parser is \'filestat\'', True),
+        ('parser is \'winreg\'', False),
+        ('parser is not \'winreg\' and data_type contains \'fs\'', True),
+        ('parser is \'winreg\' or filename contains \'evil\'', True),
+        ('parser is \'winreg\' or text contains \'evil\'', False),
+        ('parser is \'winreg\' or message contains \'evil\'', True),
+        ('parser is \'winreg\' or timestamp > 0', True),
+        ('filename contains \'passwd\'', True),
+        ('hostname is \'myhost\'', False),
+        ('hostname is not \'myhost\'', True),
+        ('parser is \'filestat\' and username is \'root\'', False)]
+
+    for query, result in queries_and_results:
+      matcher = pfilter.GetMatcher(query, compiled=True)
+      predicate = pfilter.EventValuesPredicate(
+          matcher, ['data_type', 'parser', 'timestamp'])
+      self.assertEqual(
+          result, predicate.CanMatch(
+              attribute_values,
+              defined_attribute_names=defined_attribute_names), query)
+
+    matcher = pfilter.GetMatcher('message contains \'evil\'')
+    predicate = pfilter.EventValuesPredicate(matcher, ['parser'])
+    self.assertFalse(predicate.has_comparisons)
+
+  def testCompiledMatcher(self):
+    """Test the compiled matcher."""
+    event_object = event.EventObject()
+    event_object.data_type = 'Weirdo:Made up Source:Last Written'
+    event_object.timestamp = timelib_test.CopyStringToTimestamp(
+        '2015-11-18 01:15:43')
+    event_object.text = u'User did a very bad thing.'
+    event_object.parser = 'Weirdo'
+
+    matcher = pfilter.GetMatcher(
+        'message contains \'bad\' and parser is \'Weirdo\'', compiled=True)
+    self.assertIsInstance(matcher, pfilter.CompiledMatcher)
+    self.assertTrue(matcher.Matches(event_object))
+
+    # The message is only formatted when the parser matches.
+    event_object.parser = 'Normal'
+    self.assertFalse(matcher.Matches(event_object))
+
+    matcher = pfilter.GetMatcher(
+        'message regexp \'^User\' or message iregexp \'THING\\.$\'',
+        compiled=True)
+    self.assertTrue(matcher.Matches(event_object))
+
+    attribute_values = {'parser': ['chrome_history']}
+    matcher = pfilter.GetMatcher('parser is \'filestat\'', compiled=True)
+    self.assertFalse(pfilter.CanMatchValues(matcher, attribute_values))
+
+  def testCompiledMatcherErrorOrder(self):
+    """Test the order in which the compiled matcher raises errors."""
+    event_object = event.EventObject()
+    event_object.data_type = 'Weirdo:Failing'
+    event_object.parser = 'Normal'
+
+    query = 'message contains \'bad\' and parser is \'Weirdo\''
+
+    # The filter tree formats the message first.
+    matcher = pfilter.GetMatcher(query)
+    with self.assertRaises(errors.WrongFormatter):
+      matcher.Matches(event_object)
+
+    # The compiled matcher compares the parser first and does not format
+    # the message when the parser does not match.
+    matcher = pfilter.GetMatcher(query, compiled=True)
+    self.assertFalse(matcher.Matches(event_object))
+
+    event_object.parser = 'Weirdo'
+    with self.assertRaises(errors.WrongFormatter):
+      matcher.Matches(event_object)
+
   def RunPlasoTest(self, obj, query, result):
     """Run a simple test against an event object."""
     my_parser = pfilter.BaseParser(query).Parse()
@@ -233,6 +357,9 @@ class PFilterTest(unittest.TestCase):
 
     self.assertEqual(result, matcher.Matches(obj))
 
+    compiled_matcher = pfilter.CompiledMatcher(matcher)
+    self.assertEqual(result, compiled_matcher.Matches(obj), query)
+
 
 if __name__ == "__main__":
   unittest.main()
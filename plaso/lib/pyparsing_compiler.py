@@ -0,0 +1,823 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This file contains a compiler of pyparsing line structures.
+
+The compiler turns a pyparsing line structure into an equivalent anchored
+regular expression, so that a line can be matched without the overhead
+of pyparsing. The tokens and results names are then rebuilt from the
+groups of the match, the same way pyparsing builds its parse results.
+
+pyparsing matches every element at most one way and never backtracks into
+an element that matched. To preserve these semantics every element is
+compiled into a regular expression that can only match one way: repeated
+characters are followed by a negative lookahead that forces the longest
+match, and alternatives are guarded by negative lookaheads of the preceding
+alternatives.
+
+Only a subset of the pyparsing elements is supported. A line structure that
+contains an unsupported element, or a parse action that is not known to be
+safe, is not compiled and should be matched by pyparsing instead.
+"""
+
+import logging
+import re
+import sys
+
+import pyparsing
+
+
+class CompilationError(Exception):
+  """Class that defines a line structure compilation error."""
+
+
+def _EscapeCharacters(characters):
+  """Escapes characters for use in a regular expression character set.
+
+  Args:
+    characters: a string or set of characters.
+
+  Returns:
+    A string containing the escaped characters.
+
+  Raises:
+    CompilationError: if there are no characters.
+  """
+  if not characters:
+    raise CompilationError(u'Unsupported empty set of characters.')
+  return u''.join(re.escape(character) for character in sorted(characters))
+
+
+def _ToString(value):
+  """Converts a token to a string, the same way pyparsing does."""
+  if isinstance(value, unicode):
+    return value
+  return str(value)
+
+
+class CompiledParseResults(object):
+  """Class that implements lightweight pyparsing parse results.
+
+  The parse results contain the tokens and the results names of a match,
+  and support the part of the pyparsing.ParseResults interface that is used
+  by the parsers and the parse actions.
+  """
+
+  def __init__(self, tokens=None):
+    """Initializes the parse results.
+
+    Args:
+      tokens: optional list of tokens or a single token. The default is None,
+              which represents no tokens.
+    """
+    super(CompiledParseResults, self).__init__()
+    if tokens is None:
+      tokens = []
+    elif not isinstance(tokens, list):
+      tokens = [tokens]
+
+    self._accumulated_names = set()
+    self._names = {}
+    self._tokens = list(tokens)
+
+  def __contains__(self, name):
+    """Determines if a results name is set."""
+    return name in self._names
+
+  def __delitem__(self, key):
+    """Removes tokens or a results name."""
+    if isinstance(key, (int, slice)):
+      del self._tokens[key]
+    else:
+      del self._names[key]
+
+  def __getattr__(self, name):
+    """Retrieves the value of a results name or an empty string if not set."""
+    if name.startswith(u'__'):
+      raise AttributeError(name)
+    try:
+      return self[name]
+    except KeyError:
+      return u''
+
+  def __getitem__(self, key):
+    """Retrieves tokens or the value of a results name."""
+    if isinstance(key, (int, slice)):
+      return self._tokens[key]
+
+    if key in self._accumulated_names:
+      return CompiledParseResults(self._names[key])
+    return self._names[key][-1]
+
+  def __iadd__(self, other):
+    """Appends the tokens and results names of other parse results."""
+    for name, values in other._names.iteritems():
+      self._names[name] = self._names.get(name, []) + values
+    self._accumulated_names.update(other._accumulated_names)
+    self._tokens.extend(other._tokens)
+    return self
+
+  def __iter__(self):
+    """Iterates over the tokens."""
+    return iter(self._tokens)
+
+  def __len__(self):
+    """Retrieves the number of tokens."""
+    return len(self._tokens)
+
+  def __nonzero__(self):
+    """Determines if there are tokens."""
+    return bool(self._tokens)
+
+  def __repr__(self):
+    """Returns a representation of the tokens and results names."""
+    return u'({0!r:s}, {1!r:s})'.format(self._tokens, self._names)
+
+  def __setitem__(self, key, value):
+    """Sets a token or appends a value to a results name."""
+    if isinstance(key, (int, slice)):
+      self._tokens[key] = value
+    else:
+      self._names.setdefault(key, []).append(value)
+
+  def __str__(self):
+    """Returns a string representation of the tokens."""
+    return u'[{0:s}]'.format(u', '.join(
+        _ToString(token) if isinstance(token, CompiledParseResults)
+        else repr(token) for token in self._tokens))
+
+  def _AsStringList(self, separator=u''):
+    """Retrieves the tokens as a flat list of strings.
+
+    Args:
+      separator: optional separator string that is inserted between the
+                 tokens. The default is an empty string.
+
+    Returns:
+      A list of strings.
+    """
+    strings = []
+    for token in self._tokens:
+      if strings and separator:
+        strings.append(separator)
+      if isinstance(token, CompiledParseResults):
+        strings.extend(token._AsStringList())  # pylint: disable=protected-access
+      else:
+        strings.append(_ToString(token))
+    return strings
+
+  def asDict(self):  # pylint: disable=invalid-name
+    """Retrieves the results names as a dictionary."""
+    def _ToItem(value):
+      """Converts nested parse results."""
+      if not isinstance(value, CompiledParseResults):
+        return value
+      if value.haskeys():
+        return value.asDict()
+      return [_ToItem(token) for token in value]
+
+    return dict((name, _ToItem(value)) for name, value in self.items())
+
+  def asList(self):  # pylint: disable=invalid-name
+    """Retrieves the tokens as a nested list."""
+    return [
+        token.asList() if isinstance(token, CompiledParseResults) else token
+        for token in self._tokens]
+
+  def copy(self):
+    """Returns a shallow copy of the parse results."""
+    results = CompiledParseResults(self._tokens)
+    results._accumulated_names = set(self._accumulated_names)
+    results._names = dict(self._names)
+    return results
+
+  def get(self, name, default=None):
+    """Retrieves the value of a results name.
+
+    Args:
+      name: the results name.
+      default: optional default value. The default is None.
+
+    Returns:
+      The value of the results name or the default value if not set.
+    """
+    if name in self._names:
+      return self[name]
+    return default
+
+  def haskeys(self):
+    """Determines if there are results names."""
+    return bool(self._names)
+
+  def items(self):
+    """Retrieves the results names and their values."""
+    return [(name, self[name]) for name in self._names]
+
+  def keys(self):
+    """Retrieves the results names."""
+    return self._names.keys()
+
+  def values(self):
+    """Retrieves the values of the results names."""
+    return [self[name] for name in self._names]
+
+  @classmethod
+  def FromTokens(cls, tokens, name=None, as_list=False, modal=True):
+    """Creates parse results the same way pyparsing wraps the tokens.
+
+    Args:
+      tokens: parse results, a list of tokens or a single token.
+      name: optional results name. The default is None.
+      as_list: optional boolean value to indicate the results name
+               refers to all the tokens. The default is False.
+      modal: optional boolean value to indicate the results name refers
+             to its last value only. The default is True.
+
+    Returns:
+      Parse results (instance of CompiledParseResults).
+    """
+    if isinstance(tokens, CompiledParseResults):
+      results = tokens
+    else:
+      results = cls(tokens)
+
+    if not name:
+      return results
+
+    if not modal:
+      results._accumulated_names.add(name)
+
+    if isinstance(tokens, (basestring, list)) and tokens in (u'', []):
+      return results
+
+    if isinstance(tokens, basestring):
+      tokens = [tokens]
+
+    if as_list:
+      if isinstance(tokens, CompiledParseResults):
+        value = cls(tokens._tokens)
+      else:
+        value = cls.FromTokens(tokens[0])
+    else:
+      try:
+        value = tokens[0]
+      except (KeyError, TypeError, IndexError):
+        value = tokens
+
+    results[name] = value
+    return results
+
+
+class _CompiledElement(object):
+  """Class that rebuilds the parse results of a pyparsing element."""
+
+  def __init__(self, element, kind, children=None):
+    """Initializes the compiled element.
+
+    Args:
+      element: the pyparsing element (instance of pyparsing.ParserElement).
+      kind: string containing the kind of the element.
+      children: optional list of child compiled elements. The default
+                is None.
+    """
+    super(_CompiledElement, self).__init__()
+    self.branch_group = None
+    self.children = children or []
+    self.element = element
+    self.kind = kind
+    self.location_group = None
+    self.parse_actions = []
+    self.token_group = None
+
+  def _BuildTokens(self, match, line):
+    """Rebuilds the tokens of the element before they are named.
+
+    Args:
+      match: the regular expression match object.
+      line: the line that was matched.
+
+    Returns:
+      The tokens as parse results, a list or a single token.
+    """
+    if self.kind == u'token':
+      return match.group(self.token_group)
+
+    if self.kind == u'quoted_string':
+      element = self.element
+      token = match.group(self.token_group)
+      if element.unquoteResults:
+        token = token[element.quoteCharLen:-element.endQuoteCharLen]
+        if u'\\' in token and element.convertWhitespaceEscapes:
+          for escaped, character in (
+              (u'\\t', u'\t'), (u'\\n', u'\n'), (u'\\f', u'\f'),
+              (u'\\r', u'\r')):
+            token = token.replace(escaped, character)
+      return token
+
+    if self.kind == u'empty':
+      return []
+
+    if self.kind == u'skip_to':
+      return CompiledParseResults(match.group(self.token_group))
+
+    if self.kind == u'and':
+      results = self.children[0].Build(match, line)
+      for child in self.children[1:]:
+        child_results = child.Build(match, line)
+        if child_results or child_results.haskeys():
+          results += child_results
+      return results
+
+    if self.kind == u'match_first':
+      for child in self.children:
+        if match.group(child.branch_group) is not None:
+          return child.Build(match, line)
+      raise RuntimeError(u'Missing matched alternative.')
+
+    if self.kind == u'optional':
+      child = self.children[0]
+      if match.group(child.branch_group) is None:
+        return []
+      return child.Build(match, line)
+
+    if self.kind == u'suppress':
+      return []
+
+    results = self.children[0].Build(match, line)
+    if self.kind == u'group':
+      return [results]
+
+    # Combine concatenates the tokens as strings.
+    combined_results = results.copy()
+    del combined_results[:]
+    combined_results += CompiledParseResults([u''.join(
+        results._AsStringList(self.element.joinString))])  # pylint: disable=protected-access
+    if self.element.resultsName and combined_results.haskeys():
+      return [combined_results]
+    return combined_results
+
+  def Build(self, match, line):
+    """Rebuilds the parse results of the element.
+
+    Args:
+      match: the regular expression match object.
+      line: the line that was matched.
+
+    Returns:
+      Parse results (instance of CompiledParseResults).
+    """
+    element = self.element
+    results = CompiledParseResults.FromTokens(
+        self._BuildTokens(match, line), name=element.resultsName,
+        as_list=element.saveAsList, modal=element.modalResults)
+
+    if self.parse_actions:
+      location = match.start(self.location_group)
+      for parse_action in self.parse_actions:
+        tokens = parse_action(line, location, results)
+        if tokens is not None and tokens is not results:
+          results = CompiledParseResults.FromTokens(
+              tokens, name=element.resultsName,
+              as_list=element.saveAsList and isinstance(
+                  tokens, (CompiledParseResults, list)),
+              modal=element.modalResults)
+
+    return results
+
+
+class CompiledLineStructure(object):
+  """Class that implements a compiled pyparsing line structure."""
+
+  def __init__(self, structure, expression, compiled_element):
+    """Initializes the compiled line structure.
+
+    Args:
+      structure: the pyparsing line structure.
+      expression: the compiled regular expression (instance of re).
+      compiled_element: the compiled element of the line structure.
+    """
+    super(CompiledLineStructure, self).__init__()
+    self._compiled_element = compiled_element
+    self._expand_tabs = not structure.keepTabs
+    self._match = expression.match
+    self.pattern = expression.pattern
+
+  def ParseString(self, line):
+    """Parses the start of a line.
+
+    Args:
+      line: the line.
+
+    Returns:
+      Parse results (instance of CompiledParseResults) or None if the line
+      structure does not match the line.
+    """
+    if self._expand_tabs:
+      line = line.expandtabs()
+
+    match = self._match(line)
+    if not match:
+      return
+    return self._compiled_element.Build(match, line)
+
+
+class LineStructureCompiler(object):
+  """Class that implements the pyparsing line structure compiler."""
+
+  # The maximum number of groups supported by the re module.
+  _MAXIMUM_NUMBER_OF_GROUPS = 100
+
+  # Inline flags would apply to the whole compiled regular expression.
+  _INLINE_FLAGS_RE = re.compile(r'\(\?[aiLmsux]')
+
+  def __init__(self, parse_actions=None):
+    """Initializes the line structure compiler.
+
+    Args:
+      parse_actions: optional list of parse action functions that are safe
+                     to call with the compiled parse results. A parse action
+                     is safe if it does not raise an exception to reject
+                     a match. The default is None.
+    """
+    super(LineStructureCompiler, self).__init__()
+    self._number_of_groups = 0
+    self._parse_actions = frozenset(parse_actions or [])
+
+  def _CompileElement(self, element, call_pre_parse=True, capture=True):
+    """Compiles a pyparsing element into a regular expression.
+
+    Args:
+      element: the pyparsing element (instance of pyparsing.ParserElement).
+      call_pre_parse: optional boolean value to indicate the leading white
+                      space is skipped, if the element does so. The default
+                      is True.
+      capture: optional boolean value to indicate the regular expression
+               should contain the groups needed to rebuild the parse results.
+               The default is True.
+
+    Returns:
+      A tuple containing the regular expression pattern and the compiled
+      element (instance of _CompiledElement) or None if not capturing.
+
+    Raises:
+      CompilationError: if the element is not supported.
+    """
+    if (element.ignoreExprs or element.failAction or element.debug or
+        getattr(element, u'asKeyword', False)):
+      raise CompilationError(u'Unsupported element options.')
+
+    parse_actions = []
+    for parse_action in element.parseAction:
+      parse_action = self._GetParseActionFunction(parse_action)
+      if parse_action not in self._parse_actions:
+        raise CompilationError(u'Unsupported parse action.')
+      parse_actions.append(parse_action)
+
+    pattern, compiled_element = self._CompileElementBody(element, capture)
+
+    if capture:
+      compiled_element.parse_actions = parse_actions
+      if parse_actions:
+        compiled_element.location_group = self._GetGroupName(u'l')
+        pattern = u'(?P<{0:s}>){1:s}'.format(
+            compiled_element.location_group, pattern)
+
+    if call_pre_parse and element.callPreparse and element.skipWhitespace:
+      white_characters = _EscapeCharacters(element.whiteChars)
+      pattern = u'[{0:s}]*(?![{0:s}]){1:s}'.format(white_characters, pattern)
+
+    return pattern, compiled_element
+
+  def _CompileElementBody(self, element, capture):
+    """Compiles a pyparsing element without its leading white space.
+
+    Args:
+      element: the pyparsing element (instance of pyparsing.ParserElement).
+      capture: boolean value to indicate the regular expression should
+               contain the groups needed to rebuild the parse results.
+
+    Returns:
+      A tuple containing the regular expression pattern and the compiled
+      element (instance of _CompiledElement) or None if not capturing.
+
+    Raises:
+      CompilationError: if the element is not supported.
+    """
+    element_type = type(element)
+
+    if element_type is pyparsing.And:
+      patterns = []
+      children = []
+      call_pre_parse = False
+      for child_element in element.exprs:
+        pattern, child = self._CompileElement(
+            child_element, call_pre_parse=call_pre_parse, capture=capture)
+        call_pre_parse = True
+        patterns.append(pattern)
+        children.append(child)
+
+      return self._CreateCompiledPattern(
+          element, u'and', u''.join(patterns), capture, children=children)
+
+    if element_type is pyparsing.MatchFirst:
+      patterns = []
+      guards = []
+      children = []
+      for child_element in element.exprs:
+        pattern, child = self._CompileElement(child_element, capture=capture)
+        if capture:
+          child.branch_group = self._GetGroupName(u'b')
+          pattern = u'{0:s}(?P<{1:s}>)'.format(pattern, child.branch_group)
+          guard, _ = self._CompileElement(child_element, capture=False)
+        else:
+          guard = pattern
+
+        patterns.append(u''.join(guards) + pattern)
+        guards.append(u'(?!{0:s})'.format(guard))
+        children.append(child)
+
+      return self._CreateCompiledPattern(
+          element, u'match_first', u'(?:{0:s})'.format(u'|'.join(patterns)),
+          capture, children=children)
+
+    if element_type is pyparsing.Optional:
+      not_matched = getattr(
+          pyparsing.Optional, u'_Optional__optionalNotMatched', None)
+      if not_matched is None or element.defaultValue is not not_matched:
+        raise CompilationError(u'Unsupported optional default value.')
+
+      pattern, child = self._CompileElement(
+          element.expr, call_pre_parse=False, capture=capture)
+      if capture:
+        child.branch_group = self._GetGroupName(u'b')
+        guard, _ = self._CompileElement(
+            element.expr, call_pre_parse=False, capture=False)
+        pattern = u'(?:{0:s}(?P<{1:s}>)|(?!{2:s}))'.format(
+            pattern, child.branch_group, guard)
+      else:
+        pattern = u'(?:{0:s}|(?!{0:s}))'.format(pattern)
+
+      return self._CreateCompiledPattern(
+          element, u'optional', pattern, capture, children=[child])
+
+    if element_type in (pyparsing.Combine, pyparsing.Group, pyparsing.Suppress):
+      if element_type is pyparsing.Suppress:
+        kind = u'suppress'
+        child_capture = False
+      else:
+        kind = element_type.__name__.lower()
+        child_capture = capture
+
+      pattern, child = self._CompileElement(
+          element.expr, call_pre_parse=False, capture=child_capture)
+      return self._CreateCompiledPattern(
+          element, kind, pattern, capture, children=[child])
+
+    if element_type is pyparsing.SkipTo:
+      if (element.ignoreExpr is not None or element.failOn is not None or
+          element.includeMatch):
+        raise CompilationError(u'Unsupported skip to options.')
+
+      pattern = self._CompileSkipTo(element.expr)
+      return self._CreateCompiledPattern(
+          element, u'skip_to', pattern, capture, token=True)
+
+    if element_type is pyparsing.Empty:
+      return self._CreateCompiledPattern(element, u'empty', u'', capture)
+
+    if element_type is pyparsing.Keyword:
+      if element.caseless:
+        raise CompilationError(u'Unsupported caseless keyword.')
+
+      identifier_characters = _EscapeCharacters(element.identChars)
+      pattern = u'(?<![{0:s}]){1:s}(?![{0:s}])'.format(
+          identifier_characters, re.escape(element.match))
+      return self._CreateCompiledPattern(
+          element, u'token', pattern, capture, token=True)
+
+    if isinstance(element, pyparsing.Literal):
+      if isinstance(element, pyparsing.CaselessLiteral) or not element.match:
+        raise CompilationError(u'Unsupported literal.')
+
+      return self._CreateCompiledPattern(
+          element, u'token', re.escape(element.match), capture, token=True)
+
+    if isinstance(element, pyparsing.Word):
+      if element.maxSpecified:
+        # A word fails if it is followed by more characters than allowed.
+        pattern = u'[{0:s}]{{{1:d},{2:d}}}(?![{0:s}])'.format(
+            _EscapeCharacters(element.bodyChars), element.minLen - 1,
+            element.maxLen - 1)
+      else:
+        maximum_length = None
+        if element.maxLen < sys.maxsize:
+          maximum_length = element.maxLen - 1
+        pattern = self._CompileRepeat(
+            element.bodyChars, element.minLen - 1, maximum_length)
+
+      pattern = u'[{0:s}]{1:s}'.format(
+          _EscapeCharacters(element.initChars), pattern)
+      return self._CreateCompiledPattern(
+          element, u'token', pattern, capture, token=True)
+
+    if element_type is pyparsing.CharsNotIn:
+      maximum_length = None
+      if element.maxLen < sys.maxsize:
+        maximum_length = element.maxLen
+      pattern = self._CompileRepeat(
+          element.notChars, element.minLen, maximum_length, negate=True)
+      return self._CreateCompiledPattern(
+          element, u'token', pattern, capture, token=True)
+
+    if element_type is pyparsing.QuotedString:
+      if (element.escChar or element.escQuote or
+          element.endQuoteCharLen != 1):
+        raise CompilationError(u'Unsupported quoted string options.')
+
+      return self._CreateCompiledPattern(
+          element, u'quoted_string', element.pattern, capture, token=True)
+
+    if element_type is pyparsing.Regex:
+      if (element.flags or element.re.groups or
+          getattr(element, u'asGroupList', False) or
+          getattr(element, u'asMatch', False) or
+          self._INLINE_FLAGS_RE.search(element.pattern)):
+        raise CompilationError(u'Unsupported regular expression.')
+
+      # pyparsing matches the regular expression on its own, therefore
+      # backtracking into it is prevented by capturing the match in
+      # a lookahead.
+      atomic_group = self._GetGroupName(u'a')
+      pattern = u'(?=(?P<{0:s}>{1:s}))(?P={0:s})'.format(
+          atomic_group, element.pattern)
+      return self._CreateCompiledPattern(
+          element, u'token', pattern, capture, token=True)
+
+    raise CompilationError(u'Unsupported element type: {0:s}.'.format(
+        element_type.__name__))
+
+  def _CompileRepeat(
+      self, characters, minimum_length, maximum_length, negate=False):
+    """Compiles a repetition of characters that matches the longest run.
+
+    The repetition stops at the maximum length, otherwise at the first
+    character that is not in the set.
+
+    Args:
+      characters: a string or set of characters.
+      minimum_length: the minimum number of characters.
+      maximum_length: the maximum number of characters or None if
+                      there is no maximum.
+      negate: optional boolean value to indicate the repetition is of
+              characters not in the set. The default is False.
+
+    Returns:
+      The regular expression pattern of the repetition.
+
+    Raises:
+      CompilationError: if the set of characters is not supported.
+    """
+    character_set = u'[{0:s}{1:s}]'.format(
+        u'^' if negate else u'', _EscapeCharacters(characters))
+
+    if maximum_length is None:
+      return u'{0:s}{{{1:d},}}(?!{0:s})'.format(character_set, minimum_length)
+
+    if maximum_length <= minimum_length:
+      return u'{0:s}{{{1:d}}}'.format(character_set, maximum_length)
+
+    return u'(?:{0:s}{{{1:d}}}|{0:s}{{{2:d},{3:d}}}(?!{0:s}))'.format(
+        character_set, maximum_length, minimum_length, maximum_length - 1)
+
+  def _CompileSkipTo(self, element):
+    """Compiles the text skipped up to a pyparsing element.
+
+    Args:
+      element: the pyparsing element (instance of pyparsing.ParserElement)
+               that ends the skipped text.
+
+    Returns:
+      The regular expression pattern of the skipped text.
+
+    Raises:
+      CompilationError: if the element is not supported.
+    """
+    element_type = type(element)
+    if element_type is pyparsing.LineEnd:
+      return u'[^\\n]*'
+
+    if element_type is pyparsing.StringEnd:
+      return u'[\\s\\S]*'
+
+    # The end element is matched without skipping the leading white space.
+    pattern, _ = self._CompileElement(
+        element, call_pre_parse=False, capture=False)
+    return u'(?:(?!{0:s})[\\s\\S])*(?={0:s})'.format(pattern)
+
+  def _CreateCompiledPattern(
+      self, element, kind, pattern, capture, children=None, token=False):
+    """Creates the pattern and compiled element of a pyparsing element.
+
+    Args:
+      element: the pyparsing element (instance of pyparsing.ParserElement).
+      kind: string containing the kind of the element.
+      pattern: the regular expression pattern of the element.
+      capture: boolean value to indicate the regular expression should
+               contain the groups needed to rebuild the parse results.
+      children: optional list of child compiled elements. The default
+                is None.
+      token: optional boolean value to indicate the element produces
+             the matched text as token. The default is False.
+
+    Returns:
+      A tuple containing the regular expression pattern and the compiled
+      element (instance of _CompiledElement) or None if not capturing.
+    """
+    if not capture:
+      return pattern, None
+
+    compiled_element = _CompiledElement(element, kind, children=children)
+    if token:
+      compiled_element.token_group = self._GetGroupName(u't')
+      pattern = u'(?P<{0:s}>{1:s})'.format(
+          compiled_element.token_group, pattern)
+
+    return pattern, compiled_element
+
+  def _GetGroupName(self, prefix):
+    """Retrieves a unique group name.
+
+    Args:
+      prefix: string containing the prefix of the group name.
+
+    Returns:
+      A string containing the group name.
+
+    Raises:
+      CompilationError: if the maximum number of groups is exceeded.
+    """
+    self._number_of_groups += 1
+    if self._number_of_groups > self._MAXIMUM_NUMBER_OF_GROUPS:
+      raise CompilationError(u'Too many groups.')
+    return u'{0:s}{1:d}'.format(prefix, self._number_of_groups)
+
+  def _GetParseActionFunction(self, parse_action):
+    """Retrieves the function of a parse action.
+
+    pyparsing wraps the function of a parse action to determine the number
+    of arguments it accepts.
+
+    Args:
+      parse_action: the parse action as stored by pyparsing.
+
+    Returns:
+      The function of the parse action.
+    """
+    for cell in getattr(parse_action, u'__closure__', None) or []:
+      try:
+        function = cell.cell_contents
+      except ValueError:
+        continue
+      if callable(function) and function in self._parse_actions:
+        return function
+    return parse_action
+
+  def Compile(self, structure):
+    """Compiles a pyparsing line structure.
+
+    Args:
+      structure: the pyparsing line structure
+                 (instance of pyparsing.ParserElement).
+
+    Returns:
+      The compiled line structure (instance of CompiledLineStructure) or
+      None if the line structure is not supported.
+    """
+    self._number_of_groups = 0
+    structure.streamline()
+
+    try:
+      pattern, compiled_element = self._CompileElement(structure)
+      expression = re.compile(pattern)
+    except (
+        AssertionError, CompilationError, OverflowError, re.error) as exception:
+      logging.debug(
+          u'Unable to compile line structure: {0!s} with error: {1!s}'.format(
+              structure, exception))
+      return
+
+    return CompiledLineStructure(structure, expression, compiled_element)
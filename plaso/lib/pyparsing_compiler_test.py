@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""This file contains the tests for the pyparsing line structure compiler."""
+
+import unittest
+
+import pyparsing
+
+from plaso.lib import pyparsing_compiler
+from plaso.lib import text_parser
+
+
+class LineStructureCompilerTest(unittest.TestCase):
+  """Tests for the pyparsing line structure compiler."""
+
+  def setUp(self):
+    """Sets up the needed objects used throughout the test."""
+    self._compiler = pyparsing_compiler.LineStructureCompiler([
+        text_parser.PyParseIntCast, text_parser.PyParseJoinList])
+
+  def _CheckLineStructure(self, structure, lines):
+    """Checks if a compiled line structure matches the same as pyparsing.
+
+    Args:
+      structure: the pyparsing line structure.
+      lines: a list of lines to match.
+    """
+    compiled_structure = self._compiler.Compile(structure)
+    self.assertNotEquals(compiled_structure, None)
+
+    for line in lines:
+      try:
+        expected_results = structure.parseString(line)
+      except pyparsing.ParseException:
+        expected_results = None
+
+      results = compiled_structure.ParseString(line)
+      if expected_results is None:
+        self.assertEquals(results, None, msg=line)
+        continue
+
+      self.assertNotEquals(results, None, msg=line)
+      self.assertEquals(results.asList(), expected_results.asList(), msg=line)
+      self.assertEquals(results.asDict(), expected_results.asDict(), msg=line)
+      for name in expected_results.keys():
+        value = getattr(results, name)
+        expected_value = getattr(expected_results, name)
+        if isinstance(expected_value, pyparsing.ParseResults):
+          value = value.asList()
+          expected_value = expected_value.asList()
+        self.assertEquals(value, expected_value, msg=line)
+
+  def testCompileWord(self):
+    """Tests the compilation of words."""
+    structure = (
+        pyparsing.Word(pyparsing.nums, exact=2).setResultsName('day') +
+        pyparsing.Word(pyparsing.alphas, max=3).setResultsName('month') +
+        pyparsing.Word(pyparsing.alphanums).setResultsName('text'))
+
+    self._CheckLineStructure(structure, [
+        u'01 Jan rest', u'01Jan rest', u'001 Jan rest', u'01 Janu rest',
+        u'1 Jan rest', u'01 Jan', u'01   Jan  rest of line'])
+
+  def testCompileCharsNotIn(self):
+    """Tests the compilation of characters not in a set."""
+    structure = (
+        pyparsing.CharsNotIn(u'[').setResultsName('agent') +
+        pyparsing.Literal(u'[').suppress() +
+        pyparsing.Word(pyparsing.nums).setResultsName('pid') +
+        pyparsing.Literal(u']').suppress())
+
+    self._CheckLineStructure(structure, [
+        u'kernel[12]', u'kernel [12]', u' kernel[12]', u'[12]', u'kernel[]'])
+
+  def testCompileAlternatives(self):
+    """Tests the compilation of optional elements and alternatives."""
+    level = pyparsing.Literal(u'INFO') | pyparsing.Literal(u'INFORMATION')
+    structure = (
+        pyparsing.Optional(pyparsing.Literal(u'<') + pyparsing.Word(
+            pyparsing.nums).setResultsName('priority') + pyparsing.Literal(
+                u'>')) +
+        level.setResultsName('level') +
+        pyparsing.restOfLine.setResultsName('text'))
+
+    # pyparsing does not backtrack, hence INFORMATION is never matched by
+    # the second alternative.
+    self._CheckLineStructure(structure, [
+        u'<1> INFO text', u'INFO text', u'INFORMATION text', u'<> INFO',
+        u'<1 INFO text', u'DEBUG text'])
+
+  def testCompileSkipTo(self):
+    """Tests the compilation of skip to elements."""
+    structure = (
+        pyparsing.SkipTo(u':').setResultsName('source') +
+        pyparsing.Literal(u':').suppress() +
+        pyparsing.SkipTo(pyparsing.lineEnd).setResultsName('text'))
+
+    self._CheckLineStructure(structure, [
+        u'source: text', u'source:', u'no separator', u'a:b:c'])
+
+  def testCompileGroupAndCombine(self):
+    """Tests the compilation of groups and combined elements."""
+    two_digits = pyparsing.Word(pyparsing.nums, exact=2)
+    structure = (
+        pyparsing.Group(
+            two_digits.setResultsName('hours') + pyparsing.Suppress(u':') +
+            two_digits.setResultsName('minutes')).setResultsName('time') +
+        pyparsing.Combine(
+            pyparsing.Word(pyparsing.nums) + u'.' +
+            pyparsing.Word(pyparsing.nums)).setResultsName('version'))
+
+    self._CheckLineStructure(structure, [
+        u'12:34 1.2', u'12 : 34 1.2', u'12:34 1 .2', u'12:34'])
+
+  def testCompileParseActions(self):
+    """Tests the compilation of safe parse actions."""
+    structure = (
+        pyparsing.Word(pyparsing.nums).setParseAction(
+            text_parser.PyParseIntCast).setResultsName('year') +
+        pyparsing.OneOrMore(pyparsing.Word(pyparsing.nums)).setResultsName(
+            'numbers'))
+
+    # OneOrMore is not supported by the compiler.
+    self.assertEquals(self._compiler.Compile(structure), None)
+
+    structure = (
+        pyparsing.Word(pyparsing.nums).setParseAction(
+            text_parser.PyParseIntCast).setResultsName('year') +
+        pyparsing.Word(pyparsing.alphas).setResultsName('text'))
+
+    self._CheckLineStructure(structure, [u'2013 text', u'text'])
+
+    results = self._compiler.Compile(structure).ParseString(u'2013 text')
+    self.assertEquals(results.year, 2013)
+
+    # Parse actions that can reject a match are not supported.
+    structure = pyparsing.Word(pyparsing.nums).setParseAction(
+        text_parser.PyParseRangeCheck(0, 255))
+    self.assertEquals(self._compiler.Compile(structure), None)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -29,17 +29,33 @@ import abc
 import collections
 import logging
 import multiprocessing
+import threading
+import time
 
 from dfvfs.path import path_spec as dfvfs_path_spec
 
 from plaso.lib import event
 from plaso.lib import errors
+from plaso.serializer import protobuf_serializer
 
 
 class QueueEndOfInput(object):
   """Class that implements a queue end of input."""
 
 
+class _QueueItemBatch(object):
+  """Class that implements a batch of items that is pushed as a single item."""
+
+  def __init__(self, items):
+    """Initializes the queue item batch.
+
+    Args:
+      items: a list of the queued items.
+    """
+    super(_QueueItemBatch, self).__init__()
+    self.items = items
+
+
 class Queue(object):
   """Class that implements the queue interface."""
 
@@ -59,21 +75,63 @@ class Queue(object):
   def PopItem(self):
     """Pops an item off the queue."""
 
+  def Flush(self):
+    """Flushes items that are buffered by the queue."""
+    return
+
+  def PopItems(self):
+    """Pops the next batch of items off the queue.
+
+    Returns:
+      A list of items. Queues that do not support batching return
+      a list containing a single item.
+    """
+    return [self.PopItem()]
+
   def SignalEndOfInput(self):
     """Signals the queue no input remains."""
     self.PushItem(QueueEndOfInput())
 
 
 class MultiThreadedQueue(Queue):
-  """Multi threaded queue."""
+  """Multi threaded queue.
+
+  The queue can buffer pushed items and send them in batches, which reduces
+  the number of times an item needs to be pickled and written to the
+  underlying pipe. A batch is sent when it contains the maximum number of
+  items or when the first item in the batch has been buffered for longer than
+  the maximum batch time. The batch time is also checked by a timer, started
+  when the first item is buffered, and when items are popped, so that
+  a batch is sent even when the producer stalls. Note that the buffers are
+  local to the process that pushes or pops the items.
+  """
 
-  def __init__(self):
-    """Initializes the multi threaded queue."""
+  def __init__(self, maximum_batch_size=1, maximum_batch_time=1.0):
+    """Initializes the multi threaded queue.
+
+    Args:
+      maximum_batch_size: optional maximum number of items in a batch.
+                          The default is 1, which disables batching.
+      maximum_batch_time: optional maximum number of seconds an item is
+                          buffered before the batch is sent. The default
+                          is 1.0.
+    """
     super(MultiThreadedQueue, self).__init__()
+    self._maximum_batch_size = maximum_batch_size
+    self._maximum_batch_time = maximum_batch_time
+    self._pop_buffer = collections.deque()
+    self._push_buffer = []
+    self._push_buffer_lock = threading.Lock()
+    self._push_buffer_timer = None
+    self._push_buffer_timestamp = 0
     self._queue = multiprocessing.Queue()
 
   def __len__(self):
-    """Return the total number of events stored inside the queue."""
+    """Return the estimated number of entries inside the queue.
+
+    Note that a batch of items on the underlying queue is counted as
+    a single entry.
+    """
     size = 0
     try:
       size = self._queue.qsize()
@@ -83,22 +141,112 @@ class MultiThreadedQueue(Queue):
           u'sem_getvalue()')
       raise
 
-    return size
+    return size + len(self._pop_buffer) + len(self._push_buffer)
+
+  def _FlushExpiredPushBuffer(self):
+    """Flushes the buffered items when the maximum batch time has passed."""
+    with self._push_buffer_lock:
+      if (self._push_buffer and
+          time.time() - self._push_buffer_timestamp >=
+          self._maximum_batch_time):
+        self._FlushPushBuffer()
+
+  def _FlushPushBuffer(self):
+    """Flushes the buffered items, the caller must hold the buffer lock."""
+    if self._push_buffer_timer:
+      self._push_buffer_timer.cancel()
+      self._push_buffer_timer = None
+
+    if not self._push_buffer:
+      return
+
+    self._queue.put(_QueueItemBatch(self._push_buffer))
+    self._push_buffer = []
+
+  def _GetItem(self):
+    """Retrieves the next item or batch of items from the underlying queue.
+
+    Items buffered by this process for longer than the maximum batch time
+    are flushed before waiting for the next item.
+
+    Raises:
+      QueueEmpty: when the queue is interrupted.
+    """
+    self._FlushExpiredPushBuffer()
+
+    try:
+      return self._queue.get()
+    except KeyboardInterrupt:
+      raise errors.QueueEmpty
+
+  def Flush(self):
+    """Flushes items that are buffered by the queue."""
+    with self._push_buffer_lock:
+      self._FlushPushBuffer()
 
   def IsEmpty(self):
     """Determines if the queue is empty."""
-    return self._queue.empty()
+    return (
+        not self._pop_buffer and not self._push_buffer and
+        self._queue.empty())
 
   def PushItem(self, item):
-    """Pushes an item onto the queue."""
-    self._queue.put(item)
+    """Pushes an item onto the queue.
+
+    An end of input item is never batched, any buffered items are flushed
+    before it is pushed onto the queue.
+    """
+    with self._push_buffer_lock:
+      if self._maximum_batch_size <= 1 or isinstance(item, QueueEndOfInput):
+        self._FlushPushBuffer()
+        self._queue.put(item)
+        return
+
+      current_timestamp = time.time()
+      if not self._push_buffer:
+        self._push_buffer_timestamp = current_timestamp
+
+        # The timer flushes the batch when no other item is pushed within
+        # the maximum batch time. It is not a daemon thread, hence a pending
+        # batch is also sent when the process exits.
+        self._push_buffer_timer = threading.Timer(
+            self._maximum_batch_time, self._FlushExpiredPushBuffer)
+        self._push_buffer_timer.start()
+
+      self._push_buffer.append(item)
+
+      if (len(self._push_buffer) >= self._maximum_batch_size or
+          current_timestamp - self._push_buffer_timestamp >=
+          self._maximum_batch_time):
+        self._FlushPushBuffer()
 
   def PopItem(self):
     """Pops an item off the queue."""
-    try:
-      return self._queue.get()
-    except KeyboardInterrupt:
-      raise errors.QueueEmpty
+    if not self._pop_buffer:
+      item = self._GetItem()
+      if not isinstance(item, _QueueItemBatch):
+        return item
+
+      self._pop_buffer.extend(item.items)
+
+    return self._pop_buffer.popleft()
+
+  def PopItems(self):
+    """Pops the next batch of items off the queue.
+
+    Returns:
+      A list of items.
+    """
+    if self._pop_buffer:
+      items = list(self._pop_buffer)
+      self._pop_buffer.clear()
+      return items
+
+    item = self._GetItem()
+    if isinstance(item, _QueueItemBatch):
+      return item.items
+
+    return [item]
 
 
 class SingleThreadedQueue(Queue):
@@ -161,6 +309,10 @@ class QueueProducer(object):
     super(QueueProducer, self).__init__()
     self._queue = queue_object
 
+  def Flush(self):
+    """Flushes items that are buffered by the queue."""
+    self._queue.Flush()
+
   def SignalEndOfInput(self):
     """Signals the queue no input remains."""
     self._queue.SignalEndOfInput()
@@ -226,26 +378,48 @@ class EventObjectQueueConsumer(QueueConsumer):
   def _ConsumeEventObject(self, event_object):
     """Consumes an event object callback for ConsumeEventObjects."""
 
+  def _ConsumeEventObjects(self, event_objects):
+    """Consumes a batch of event objects callback for ConsumeEventObjects.
+
+    Args:
+      event_objects: a list of event objects (instances of EventObject).
+    """
+    for event_object in event_objects:
+      self._ConsumeEventObject(event_object)
+
   def ConsumeEventObjects(self):
     """Consumes the event object that are pushed on the queue.
 
+    The event objects are consumed in batches, as they were pushed onto
+    the queue.
+
     Raises:
       RuntimeError: when there is an unsupported object type on the queue.
     """
     while True:
       try:
-        item = self._queue.PopItem()
+        items = self._queue.PopItems()
       except errors.QueueEmpty:
         break
 
-      if isinstance(item, QueueEndOfInput):
+      end_of_input = None
+      event_objects = []
+      for item in items:
+        if isinstance(item, QueueEndOfInput):
+          end_of_input = item
+          break
+
+        event_objects.append(item)
+
+      if event_objects:
+        self._ConsumeEventObjects(event_objects)
+
+      if end_of_input:
         # Push the item back onto the queue to make sure all
         # queue consumers are stopped.
-        self._queue.PushItem(item)
+        self._queue.PushItem(end_of_input)
         break
 
-      self._ConsumeEventObject(item)
-
 
 class EventObjectQueueProducer(QueueProducer):
   """Class that implements the event object queue producer.
@@ -276,6 +450,53 @@ class EventObjectQueueProducer(QueueProducer):
       self.ProduceEventObject(event_object)
 
 
+class SerializedEventObjectQueueProducer(EventObjectQueueProducer):
+  """Class that implements the serialized event object queue producer.
+
+     The producer serializes the event objects before they are pushed onto
+     the queue. This moves the serialization of the event objects out of
+     the consumer (storage) process into the producer (worker) processes.
+
+     Every event object is pushed onto the queue as a tuple of:
+       (timestamp, serialized event object, data type, parser, plugin,
+        filename, hostname, username)
+  """
+
+  def __init__(self, queue_object):
+    """Initializes the queue producer.
+
+    Args:
+      queue_object: the queue object (instance of Queue).
+    """
+    super(SerializedEventObjectQueueProducer, self).__init__(queue_object)
+    self._event_object_serializer = (
+        protobuf_serializer.ProtobufEventObjectSerializer)
+
+  def ProduceEventObject(self, event_object):
+    """Produces a serialized event object onto the queue.
+
+    Args:
+      event_object: the event object (instance of EventObject).
+    """
+    try:
+      event_object_data = self._event_object_serializer.WriteSerialized(
+          event_object)
+    except ValueError as exception:
+      logging.error(
+          u'Unable to serialize event object with error: {0:s}'.format(
+              exception))
+      return
+
+    self._queue.PushItem((
+        event_object.timestamp, event_object_data,
+        getattr(event_object, 'data_type', None),
+        getattr(event_object, 'parser', None),
+        getattr(event_object, 'plugin', None),
+        getattr(event_object, 'filename', None),
+        getattr(event_object, 'hostname', None),
+        getattr(event_object, 'username', None)))
+
+
 class AnalysisPluginProducer(EventObjectQueueProducer):
   """Producer for Event Objects sent to analysis plugins."""
 
@@ -17,6 +17,7 @@
 # limitations under the License.
 """Tests the queue."""
 
+import time
 import unittest
 
 from plaso.lib import queue
@@ -72,6 +73,95 @@ class MultiThreadedQueueTest(unittest.TestCase):
     self.assertEquals(test_queue_consumer.number_of_items, len(self._ITEMS))
 
 
+class TestEventObjectQueueConsumer(queue.EventObjectQueueConsumer):
+  """Class that implements the test event object queue consumer."""
+
+  def __init__(self, test_queue):
+    """Initializes the queue consumer.
+
+    Args:
+      test_queue: the test queue (instance of Queue).
+    """
+    super(TestEventObjectQueueConsumer, self).__init__(test_queue)
+    self.batch_sizes = []
+    self.event_objects = []
+
+  def _ConsumeEventObject(self, event_object):
+    """Consumes an event object callback for ConsumeEventObjects."""
+    self.event_objects.append(event_object)
+
+  def _ConsumeEventObjects(self, event_objects):
+    """Consumes a batch of event objects callback for ConsumeEventObjects."""
+    self.batch_sizes.append(len(event_objects))
+    super(TestEventObjectQueueConsumer, self)._ConsumeEventObjects(
+        event_objects)
+
+
+class BatchedMultiThreadedQueueTest(unittest.TestCase):
+  """Tests the multi threaded queue with batching enabled."""
+
+  _ITEMS = ['item1', 'item2', 'item3', 'item4', 'item5']
+
+  def testPushPopItem(self):
+    """Tests the PushItem and PopItem functions."""
+    test_queue = queue.MultiThreadedQueue(maximum_batch_size=2)
+
+    for item in self._ITEMS:
+      test_queue.PushItem(item)
+
+    test_queue.SignalEndOfInput()
+    test_queue_consumer = TestQueueConsumer(test_queue)
+    test_queue_consumer.ConsumeItems()
+
+    self.assertEquals(test_queue_consumer.items, self._ITEMS)
+
+  def testConsumeEventObjects(self):
+    """Tests the ConsumeEventObjects function."""
+    test_queue = queue.MultiThreadedQueue(
+        maximum_batch_size=2, maximum_batch_time=60)
+    test_queue_producer = queue.EventObjectQueueProducer(test_queue)
+
+    test_queue_producer.ProduceEventObjects(self._ITEMS)
+    test_queue_producer.SignalEndOfInput()
+
+    test_queue_consumer = TestEventObjectQueueConsumer(test_queue)
+    test_queue_consumer.ConsumeEventObjects()
+
+    self.assertEquals(test_queue_consumer.event_objects, self._ITEMS)
+    # The last item is flushed by the end of input signal.
+    self.assertEquals(test_queue_consumer.batch_sizes, [2, 2, 1])
+
+  def testFlush(self):
+    """Tests the Flush function."""
+    test_queue = queue.MultiThreadedQueue(
+        maximum_batch_size=10, maximum_batch_time=60)
+
+    test_queue.PushItem('item1')
+    test_queue.PushItem('item2')
+    test_queue.Flush()
+
+    self.assertEquals(test_queue.PopItems(), ['item1', 'item2'])
+
+  def testFlushStalledProducer(self):
+    """Tests that the batch of a stalled producer is flushed."""
+    test_queue = queue.MultiThreadedQueue(
+        maximum_batch_size=10, maximum_batch_time=0.1)
+
+    # No other item is pushed, the batch is flushed once the maximum batch
+    # time has passed.
+    test_queue.PushItem('item1')
+    self.assertEquals(test_queue.PopItems(), ['item1'])
+
+    # An expired batch is also flushed when items are popped.
+    test_queue = queue.MultiThreadedQueue(
+        maximum_batch_size=10, maximum_batch_time=0.1)
+
+    test_queue.PushItem('item2')
+    test_queue._push_buffer_timer.cancel()
+    time.sleep(0.2)
+    self.assertEquals(test_queue.PopItems(), ['item2'])
+
+
 class SingleThreadedQueueTest(unittest.TestCase):
   """Tests the single threaded queue."""
 
@@ -47,7 +47,9 @@ definition, example:
   a_list: [value, value, value]
 
 This can be used to filter out which proto files should be included
-in processing.
+in processing. Besides the time range, data types and parsers of the entries
+the metadata contains bloom filters of the filenames, hostnames and usernames
+of the entries.
 
   + plaso_index
 
@@ -86,6 +88,11 @@ The structure of a proto file is:
 | size |  protobuf (plaso_storage_proto) | size | proto...|
 +------+---------------------------------+------+------...+
 
+By default the streams are stored deflate compressed. The streams can also be
+stored uncompressed, in which case the storage file is larger, but when opened
+read-only the streams are read directly from a memory map of the storage file
+without having to decompress them.
+
 For further details about the storage design see:
   http://plaso.kiddaland.net/developer/libraries/storage
 """
@@ -95,18 +102,26 @@ For further details about the storage design see:
 # other tools. This file will then contain the queueing mechanism and other
 # plaso specific mechanism, making it easier to import the storage library.
 
+import array
+import bisect
 import collections
 import construct
 import heapq
 import logging
+import mmap
+import multiprocessing
+import os
 # TODO: replace all instances of struct by construct!
 import struct
 import sys
+import tempfile
 import zipfile
+import zlib
 
 from google.protobuf import message
 import yaml
 
+from plaso.lib import bloom_filter
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import limit
@@ -119,6 +134,14 @@ from plaso.proto import plaso_storage_pb2
 from plaso.serializer import protobuf_serializer
 
 
+# Python 2 arrays do not support the signed 64-bit integer ('q') type code,
+# hence the type code of the timestamps array depends on the platform.
+if array.array('l').itemsize == 8:
+  _TIMESTAMPS_ARRAY_TYPE_CODE = 'l'
+else:
+  _TIMESTAMPS_ARRAY_TYPE_CODE = None
+
+
 class _EventTagIndexValue(object):
   """Class that defines the event tag index value."""
 
@@ -194,11 +217,433 @@ class _EventTagIndexValue(object):
         tag_identifier, store_number=store_number, store_offset=store_offset)
 
 
+class _LeastRecentlyUsedCache(object):
+  """Class that implements a least recently used (LRU) cache."""
+
+  def __init__(self, maximum_number_of_values):
+    """Initializes the cache.
+
+    Args:
+      maximum_number_of_values: the maximum number of cached values.
+    """
+    super(_LeastRecentlyUsedCache, self).__init__()
+    self._maximum_number_of_values = maximum_number_of_values
+    self._values = collections.OrderedDict()
+
+  def __len__(self):
+    """Return the number of cached values."""
+    return len(self._values)
+
+  def Empty(self):
+    """Empties the cache."""
+    self._values = collections.OrderedDict()
+
+  def GetValue(self, key):
+    """Retrieves a cached value.
+
+    Args:
+      key: the key of the value.
+
+    Returns:
+      The cached value or None if not cached.
+    """
+    value = self._values.pop(key, None)
+    if value is not None:
+      # Re-insert the value to mark it as the most recently used.
+      self._values[key] = value
+    return value
+
+  def SetValue(self, key, value):
+    """Caches a value, removing the least recently used value if needed.
+
+    Args:
+      key: the key of the value.
+      value: the value.
+    """
+    self._values.pop(key, None)
+    self._values[key] = value
+    while len(self._values) > self._maximum_number_of_values:
+      self._values.popitem(last=False)
+
+
+class _SeekableZipStream(object):
+  """Class that implements a seekable file-like object of a ZIP stream.
+
+  The zipfile.ZipExtFile is not seekable, which means that to read an entry
+  in the middle of a stream all the preceding data needs to be decompressed.
+  This class reads the stream data directly from the ZIP file. Stored streams
+  are read at the requested offset. Deflate compressed streams are
+  decompressed in blocks, which are cached in a LRU cache that is shared by
+  all the streams of the storage file. To prevent having to decompress a
+  stream from its start every time, the state of the decompressor is saved
+  at regular intervals.
+  """
+
+  # The size of the decompressed blocks.
+  _BLOCK_SIZE = 256 * 1024
+
+  # The number of blocks between decompressor checkpoints.
+  _CHECKPOINT_INTERVAL = 16
+
+  # The size of the compressed data read at once.
+  _COMPRESSED_DATA_SEGMENT_SIZE = 64 * 1024
+
+  # The ZIP local file header, see zipfile.structFileHeader.
+  _LOCAL_FILE_HEADER = struct.Struct('<4s2B4HL2L2H')
+  _LOCAL_FILE_HEADER_SIGNATURE = 'PK\x03\x04'
+
+  def __init__(self, file_object, zip_info, block_cache, memory_map=None):
+    """Initializes the stream.
+
+    Args:
+      file_object: the file-like object of the ZIP file.
+      zip_info: the ZIP information of the stream (instance of
+                zipfile.ZipInfo).
+      block_cache: the cache of decompressed blocks (instance of
+                   _LeastRecentlyUsedCache).
+      memory_map: optional memory map of the ZIP file (instance of mmap.mmap)
+                  used to read stored streams. The default is None.
+
+    Raises:
+      IOError: if the stream is not supported.
+    """
+    super(_SeekableZipStream, self).__init__()
+
+    if zip_info.flag_bits & 0x01:
+      raise IOError(u'Unsupported encrypted stream.')
+
+    if zip_info.compress_type not in [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED]:
+      raise IOError(u'Unsupported compression type: {0:d}'.format(
+          zip_info.compress_type))
+
+    file_object.seek(zip_info.header_offset, 0)
+    header_data = file_object.read(self._LOCAL_FILE_HEADER.size)
+    if len(header_data) != self._LOCAL_FILE_HEADER.size:
+      raise IOError(u'Unable to read local file header.')
+
+    header_values = self._LOCAL_FILE_HEADER.unpack(header_data)
+    if header_values[0] != self._LOCAL_FILE_HEADER_SIGNATURE:
+      raise IOError(u'Unsupported local file header signature.')
+
+    # The local file header is followed by the file name and extra field.
+    self._data_offset = (
+        zip_info.header_offset + self._LOCAL_FILE_HEADER.size +
+        header_values[10] + header_values[11])
+
+    self._block_cache = block_cache
+    self._compressed_size = zip_info.compress_size
+    self._compress_type = zip_info.compress_type
+    self._current_offset = 0
+    self._file_object = file_object
+    self._memory_map = memory_map
+    self._name = zip_info.filename
+
+    # Only streams that are stored uncompressed are read from the memory map.
+    self.is_memory_mapped = bool(
+        memory_map is not None and self._compress_type == zipfile.ZIP_STORED)
+
+    # The decompressor states are lists of the decompressed offset,
+    # the compressed offset, the decompressor and the unconsumed compressed
+    # data. The checkpoints contain a state for every checkpoint interval,
+    # the current state is the state of the last decompressed block.
+    self._checkpoints = [[0, 0, zlib.decompressobj(-zlib.MAX_WBITS), '']]
+    self._decompressor_state = None
+
+    self.size = zip_info.file_size
+
+  def _CopyDecompressorState(self, decompressor_state):
+    """Copies a decompressor state."""
+    decompressed_offset, compressed_offset, decompressor, unconsumed_data = (
+        decompressor_state)
+    return [
+        decompressed_offset, compressed_offset, decompressor.copy(),
+        unconsumed_data]
+
+  def _DecompressBlock(self, decompressor_state):
+    """Decompresses the next block and updates the decompressor state.
+
+    Args:
+      decompressor_state: the decompressor state.
+
+    Returns:
+      A byte string containing the decompressed block.
+    """
+    decompressed_offset, compressed_offset, decompressor, unconsumed_data = (
+        decompressor_state)
+
+    block_size = min(self._BLOCK_SIZE, self.size - decompressed_offset)
+    data_segments = []
+    while block_size > 0:
+      if not unconsumed_data:
+        read_size = min(
+            self._COMPRESSED_DATA_SEGMENT_SIZE,
+            self._compressed_size - compressed_offset)
+        if read_size <= 0:
+          break
+
+        self._file_object.seek(self._data_offset + compressed_offset, 0)
+        unconsumed_data = self._file_object.read(read_size)
+        if not unconsumed_data:
+          break
+        compressed_offset += len(unconsumed_data)
+
+      data = decompressor.decompress(unconsumed_data, block_size)
+      unconsumed_data = decompressor.unconsumed_tail
+      data_segments.append(data)
+      block_size -= len(data)
+
+    data = ''.join(data_segments)
+    decompressor_state[0] = decompressed_offset + len(data)
+    decompressor_state[1] = compressed_offset
+    decompressor_state[3] = unconsumed_data
+    return data
+
+  def _GetBlock(self, block_number):
+    """Retrieves a decompressed block.
+
+    Args:
+      block_number: the number of the block.
+
+    Returns:
+      A byte string containing the decompressed block.
+    """
+    cache_key = (self._name, block_number)
+    block_data = self._block_cache.GetValue(cache_key)
+    if block_data is not None:
+      return block_data
+
+    block_offset = block_number * self._BLOCK_SIZE
+
+    checkpoint_number = min(
+        block_number // self._CHECKPOINT_INTERVAL, len(self._checkpoints) - 1)
+    decompressor_state = self._checkpoints[checkpoint_number]
+
+    # Continue from the current state, which is the common case for sequential
+    # reads, unless a checkpoint is closer to the block.
+    if (self._decompressor_state and
+        decompressor_state[0] <= self._decompressor_state[0] <= block_offset):
+      decompressor_state = self._decompressor_state
+    else:
+      decompressor_state = self._CopyDecompressorState(decompressor_state)
+
+    while True:
+      current_block_number = decompressor_state[0] // self._BLOCK_SIZE
+      block_data = self._DecompressBlock(decompressor_state)
+      if not block_data:
+        break
+
+      self._block_cache.SetValue(
+          (self._name, current_block_number), block_data)
+
+      next_block_number = current_block_number + 1
+      if (not next_block_number % self._CHECKPOINT_INTERVAL and
+          next_block_number // self._CHECKPOINT_INTERVAL == len(
+              self._checkpoints)):
+        self._checkpoints.append(
+            self._CopyDecompressorState(decompressor_state))
+
+      if current_block_number == block_number:
+        break
+
+    self._decompressor_state = decompressor_state
+    return block_data
+
+  def close(self):
+    """Closes the stream."""
+    # The stream is cached and the file-like object of the ZIP file is owned
+    # by the storage file, hence there is nothing to close here.
+    pass
+
+  def read(self, size=None):
+    """Reads a byte string from the stream.
+
+    Args:
+      size: optional number of bytes to read, where None represents all
+            remaining data. The default is None.
+
+    Returns:
+      A byte string containing the data read.
+    """
+    if size is None or self._current_offset + size > self.size:
+      size = self.size - self._current_offset
+
+    if size <= 0:
+      return ''
+
+    if self.is_memory_mapped:
+      data_offset = self._data_offset + self._current_offset
+      data = self._memory_map[data_offset:data_offset + size]
+      self._current_offset += len(data)
+      return data
+
+    if self._compress_type == zipfile.ZIP_STORED:
+      self._file_object.seek(self._data_offset + self._current_offset, 0)
+      data = self._file_object.read(size)
+      self._current_offset += len(data)
+      return data
+
+    data_segments = []
+    while size > 0:
+      block_number, block_offset = divmod(
+          self._current_offset, self._BLOCK_SIZE)
+      block_data = self._GetBlock(block_number)
+      data = block_data[block_offset:block_offset + size]
+      if not data:
+        break
+
+      data_segments.append(data)
+      self._current_offset += len(data)
+      size -= len(data)
+
+    return ''.join(data_segments)
+
+  def seek(self, offset, whence=0):
+    """Seeks an offset within the stream.
+
+    Args:
+      offset: the offset.
+      whence: optional value that indicates whether offset is an absolute
+              or relative position within the stream. The default is 0,
+              which represents an absolute position.
+
+    Raises:
+      IOError: if the offset or whence value is not supported.
+    """
+    if whence == 1:
+      offset += self._current_offset
+    elif whence == 2:
+      offset += self.size
+    elif whence != 0:
+      raise IOError(u'Unsupported whence value: {0!s}'.format(whence))
+
+    if offset < 0:
+      raise IOError(u'Invalid offset value less than zero.')
+
+    self._current_offset = offset
+
+  def tell(self):
+    """Return the current offset within the stream."""
+    return self._current_offset
+
+
+# The names of the attributes of which the values are read from the event
+# object protobuf to determine if the event object can match a filter.
+_EVENT_VALUES_PREDICATE_ATTRIBUTE_NAMES = frozenset([
+    'data_type', 'parser', 'timestamp'])
+
+# The names of the attributes that are defined by every event object read
+# from the storage file, in addition to those stored in the protobuf.
+_EVENT_OBJECT_DEFAULT_ATTRIBUTE_NAMES = frozenset([
+    'data_type', 'store_index', 'store_number', 'tag', 'uuid'])
+
+
+# The names of the non-repeated fields of the event object protobuf.
+_EVENT_OBJECT_FIELD_NAMES = frozenset([
+    field_descriptor.name
+    for field_descriptor in plaso_storage_pb2.EventObject.DESCRIPTOR.fields
+    if field_descriptor.label != field_descriptor.LABEL_REPEATED])
+
+
+def _CanMatchEventObjectProtobuf(event_values_predicate, proto):
+  """Determines if an event object protobuf can match a filter.
+
+  Only the values of the attributes that are stored as fields of the protobuf
+  and the names of the other attributes are read, the attribute values are
+  not deserialized.
+
+  Args:
+    event_values_predicate: the event values predicate (instance of
+                            pfilter.EventValuesPredicate).
+    proto: the event object protobuf (instance of
+           plaso_storage_pb2.EventObject).
+
+  Returns:
+    False if the event object cannot match the filter, True otherwise.
+  """
+  attribute_keys = set([attribute.key for attribute in proto.attributes])
+
+  # The attributes stored as key value pairs override the fields.
+  attribute_values = {}
+  for attribute_name in _EVENT_VALUES_PREDICATE_ATTRIBUTE_NAMES:
+    if attribute_name not in attribute_keys:
+      attribute_values[attribute_name] = getattr(proto, attribute_name)
+
+  defined_attribute_names = None
+  if event_values_predicate.defined_attribute_names:
+    defined_attribute_names = set()
+    for attribute_name in event_values_predicate.defined_attribute_names:
+      if (attribute_name in attribute_keys or
+          attribute_name in _EVENT_OBJECT_DEFAULT_ATTRIBUTE_NAMES or (
+              attribute_name in _EVENT_OBJECT_FIELD_NAMES and
+              proto.HasField(attribute_name))):
+        defined_attribute_names.add(attribute_name)
+
+  return event_values_predicate.CanMatch(
+      attribute_values, defined_attribute_names=defined_attribute_names)
+
+
+def _DeserializeEventObjects(serialized_entries, event_values_predicate=None):
+  """Deserializes a chunk of event objects.
+
+  This function is used by the process pool of StorageFile.GetSortedEntries
+  and therefore needs to be defined at module level.
+
+  Args:
+    serialized_entries: a list of tuples of the store number, store index and
+                        the serialized event object (protobuf) string.
+    event_values_predicate: optional event values predicate (instance of
+                            pfilter.EventValuesPredicate) to skip the event
+                            objects that cannot match a filter without
+                            deserializing them. The default is None.
+
+  Returns:
+    A list of event objects (instances of EventObject).
+  """
+  serializer = protobuf_serializer.ProtobufEventObjectSerializer
+  event_objects = []
+  for store_number, store_index, event_object_data in serialized_entries:
+    proto = plaso_storage_pb2.EventObject()
+    proto.ParseFromString(event_object_data)
+
+    if (event_values_predicate and
+        not _CanMatchEventObjectProtobuf(event_values_predicate, proto)):
+      continue
+
+    event_object = serializer.ReadSerializedObject(proto)
+    event_object.store_number = store_number
+    event_object.store_index = store_index
+    event_objects.append(event_object)
+
+  return event_objects
+
+
 class StorageFile(object):
   """Class that defines the storage file."""
 
   _STREAM_DATA_SEGMENT_SIZE = 1024
 
+  # The size of the data segments read from the timestamps stream, which
+  # should be a multiple of 8 (the size of a timestamp).
+  _TIMESTAMPS_DATA_SEGMENT_SIZE = 64 * 1024
+
+  # The number of event objects that are deserialized per chunk by
+  # the process pool.
+  _DESERIALIZATION_CHUNK_SIZE = 1000
+
+  # The names of the attributes of which the values are stored in bloom
+  # filters in the metadata of a store.
+  _BLOOM_FILTER_ATTRIBUTE_NAMES = frozenset([
+      'filename', 'hostname', 'username'])
+
+  # The maximum number of cached index streams.
+  _MAXIMUM_NUMBER_OF_CACHED_INDEXES = 32
+
+  # The maximum number of cached timestamps streams.
+  _MAXIMUM_NUMBER_OF_CACHED_TIMESTAMPS = 32
+
+  # The maximum number of cached decompressed stream blocks.
+  _MAXIMUM_NUMBER_OF_CACHED_BLOCKS = 128
+
   # Set the maximum buffer size to 196 MiB
   MAX_BUFFER_SIZE = 196 * 1024 * 1024
 
@@ -220,7 +665,8 @@ class StorageFile(object):
     source_short_map[value.name] = value.number
 
   def __init__(
-      self, output_file, buffer_size=0, read_only=False, pre_obj=None):
+      self, output_file, buffer_size=0, read_only=False, pre_obj=None,
+      compress=True):
     """Initializes the storage file.
 
     Args:
@@ -231,6 +677,8 @@ class StorageFile(object):
                  for reading only. The default is false.
       pre_obj: Optional preprocessing object that gets stored inside
                the storage file. The default is None.
+      compress: Optional boolean to indicate the streams written to the storage
+                file should be deflate compressed. The default is True.
 
     Raises:
       IOError: if we open up the file in read only mode and the file does
@@ -243,15 +691,34 @@ class StorageFile(object):
     self._buffer_last_timestamp = 0
     self._buffer_size = 0
     self._event_tag_index = None
+    self._event_values_predicate = None
     self._file_open = False
     self._file_number = 1
     self._first_file_number = None
+    self._index_cache = _LeastRecentlyUsedCache(
+        self._MAXIMUM_NUMBER_OF_CACHED_INDEXES)
     self._max_buffer_size = buffer_size or self.MAX_BUFFER_SIZE
+    self._number_of_deserialization_processes = 0
+    self._number_of_skipped_event_objects = 0
     self._output_file = output_file
     self._pre_obj = pre_obj
     self._proto_streams = {}
     self._read_only = None
+    self._seekable_streams = {}
+    self._sorted_entries = None
+    self._store_entry_ranges = {}
+    self._stream_block_cache = _LeastRecentlyUsedCache(
+        self._MAXIMUM_NUMBER_OF_CACHED_BLOCKS)
+    self._timestamps_cache = _LeastRecentlyUsedCache(
+        self._MAXIMUM_NUMBER_OF_CACHED_TIMESTAMPS)
     self._write_counter = 0
+    self._zip_file_memory_map = None
+    self._zip_file_object = None
+
+    if compress:
+      self._compression_type = zipfile.ZIP_DEFLATED
+    else:
+      self._compression_type = zipfile.ZIP_STORED
 
     self._analysis_report_serializer = (
         protobuf_serializer.ProtobufAnalysisReportSerializer)
@@ -301,7 +768,7 @@ class StorageFile(object):
 
     try:
       self._zipfile = zipfile.ZipFile(
-          self._output_file, access_mode, zipfile.ZIP_DEFLATED)
+          self._output_file, access_mode, self._compression_type)
     except zipfile.BadZipfile as exception:
       raise IOError(u'Unable to read ZIP file with error: {0:s}'.format(
           exception))
@@ -329,6 +796,7 @@ class StorageFile(object):
       # Start up a counter for modules in buffer.
       self._count_data_type = collections.Counter()
       self._count_parser = collections.Counter()
+      self._bloom_filter_values = collections.defaultdict(set)
 
       # Need to get the last number in the list.
       for stream_name in self._GetStreamNames():
@@ -392,50 +860,69 @@ class StorageFile(object):
         'data_type': list(self._count_data_type.viewkeys()),
         'parsers': list(self._count_parser.viewkeys()),
         'count': len(self._buffer),
-        'type_count': self._count_data_type.most_common()}
+        'type_count': self._count_data_type.most_common(),
+        'bloom_filters': self._GetBloomFilters()}
     self._count_data_type = collections.Counter()
     self._count_parser = collections.Counter()
+    self._bloom_filter_values = collections.defaultdict(set)
 
     stream_name = 'plaso_meta.{0:06d}'.format(self._file_number)
     self._WriteStream(stream_name, yaml.safe_dump(yaml_dict))
 
-    ofs = 0
-    proto_str = []
-    index_str = []
-    timestamp_str = []
-    for _ in range(len(self._buffer)):
-      timestamp, entry = heapq.heappop(self._buffer)
-      # TODO: Instead of appending to an array
-      # which is not optimal (loads up the entire max file
-      # size into memory) Zipfile should be extended to
-      # allow appending to files (implement lock).
-      try:
-        # Appending a timestamp to the timestamp index, this is used during
-        # time based filtering. If this is not done we would need to unserialize
-        # all events to get the timestamp value which is really slow.
-        timestamp_str.append(struct.pack('<q', timestamp))
-      except struct.error as exception:
-        # TODO: Instead of just logging the error unserialize the event
-        # and print out information from the event, eg. parser and path spec
-        # location. That way we can find the root cause and fix that instead of
-        # just catching the exception.
-        logging.error((
-            u'Unable to store event, not able to index timestamp value with '
-            u'error: {0:s} [timestamp: {1:d}]').format(exception, timestamp))
-        continue
-      index_str.append(struct.pack('<I', ofs))
-      packed = struct.pack('<I', len(entry)) + entry
-      ofs += len(packed)
-      proto_str.append(packed)
+    # The proto stream is spooled to a temporary file, from which it is
+    # compressed into the ZIP file, and the entries are removed from the buffer
+    # while they are written. This way the buffer is not held in memory twice.
+    if isinstance(self._output_file, basestring):
+      temporary_directory = os.path.dirname(os.path.abspath(self._output_file))
+    else:
+      temporary_directory = None
 
-    stream_name = 'plaso_index.{0:06d}'.format(self._file_number)
-    self._WriteStream(stream_name, ''.join(index_str))
+    file_descriptor, proto_stream_path = tempfile.mkstemp(
+        prefix='plaso_proto.', dir=temporary_directory)
 
-    stream_name = 'plaso_proto.{0:06d}'.format(self._file_number)
-    self._WriteStream(stream_name, ''.join(proto_str))
+    try:
+      index_data = bytearray()
+      timestamps_data = bytearray()
 
-    stream_name = 'plaso_timestamps.{0:06d}'.format(self._file_number)
-    self._WriteStream(stream_name, ''.join(timestamp_str))
+      with os.fdopen(file_descriptor, 'wb') as proto_file_object:
+        stream_offset = 0
+        while self._buffer:
+          timestamp, entry = heapq.heappop(self._buffer)
+          try:
+            # Appending a timestamp to the timestamp index, this is used during
+            # time based filtering. If this is not done we would need to
+            # unserialize all events to get the timestamp value which is really
+            # slow.
+            timestamp_data = struct.pack('<q', timestamp)
+          except struct.error as exception:
+            # TODO: Instead of just logging the error unserialize the event
+            # and print out information from the event, eg. parser and path
+            # spec location. That way we can find the root cause and fix that
+            # instead of just catching the exception.
+            logging.error((
+                u'Unable to store event, not able to index timestamp value '
+                u'with error: {0:s} [timestamp: {1:d}]').format(
+                    exception, timestamp))
+            continue
+
+          timestamps_data.extend(timestamp_data)
+          index_data.extend(struct.pack('<I', stream_offset))
+
+          proto_file_object.write(struct.pack('<I', len(entry)))
+          proto_file_object.write(entry)
+          stream_offset += 4 + len(entry)
+
+      stream_name = 'plaso_index.{0:06d}'.format(self._file_number)
+      self._WriteStream(stream_name, str(index_data))
+
+      stream_name = 'plaso_proto.{0:06d}'.format(self._file_number)
+      self._zipfile.write(proto_stream_path, stream_name)
+
+      stream_name = 'plaso_timestamps.{0:06d}'.format(self._file_number)
+      self._WriteStream(stream_name, str(timestamps_data))
+
+    finally:
+      os.remove(proto_stream_path)
 
     self._file_number += 1
     self._buffer_size = 0
@@ -443,6 +930,21 @@ class StorageFile(object):
     self._buffer_first_timestamp = sys.maxint
     self._buffer_last_timestamp = 0
 
+  def _GetBloomFilters(self):
+    """Retrieves the bloom filters of the attribute values in the buffer.
+
+    Returns:
+      A dictionary containing the attribute names and the corresponding bloom
+      filter dictionaries, as created by BloomFilter.CopyToDict.
+    """
+    bloom_filters = {}
+    for attribute_name in self._BLOOM_FILTER_ATTRIBUTE_NAMES:
+      values = self._bloom_filter_values.get(attribute_name, [])
+      bloom_filters[attribute_name] = bloom_filter.BloomFilter.FromValues(
+          values).CopyToDict()
+
+    return bloom_filters
+
   def _GetEventTagIndexValue(self, store_number, store_index, uuid):
     """Retrieves an event tag index value.
 
@@ -508,40 +1010,14 @@ class StorageFile(object):
 
     if (not last_entry_index and hasattr(self, '_bound_first')
         and self._bound_first and entry_index == -1):
-      # We only get here if the following conditions are met:
-      #   1. last_entry_index is not set (so this is the first read
-      #      from this file).
-      #   2. There is a lower bound (so we have a date filter).
-      #   3. The lower bound is higher than zero (basically set to a value).
-      #   4. We are accessing this function using 'get me the next entry' as an
-      #      opposed to the 'get me entry X', where we just want to server entry
-      #      X.
-      #
-      # The purpose: speed seeking into the storage file based on time. Instead
-      # of spending precious time reading through the storage file and
-      # deserializing protobufs just to compare timestamps we read a much
-      # 'cheaper' file, one that only contains timestamps to find the proper
-      # entry into the storage file. That way we'll get to the right place in
-      # the file and can start reading protobufs from the right location.
-      index = 0
-
-      # TODO: why is the stream name set here but not used? Is this a left over?
-      stream_name = 'plaso_timestamps.{0:06d}'.format(stream_number)
-
-      # Recent add-on to the storage file, not certain this file exists.
-      if stream_name in self._GetStreamNames():
-        timestamp_file_object = self._OpenStream(stream_name, 'r')
-        if timestamp_file_object is None:
-          raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
-
-        timestamp_compare = 0
-        while timestamp_compare < self._bound_first:
-          timestamp_raw = timestamp_file_object.read(8)
-          if len(timestamp_raw) != 8:
-            break
-          timestamp_compare = struct.unpack('<q', timestamp_raw)[0]
-          index += 1
-        return self._GetEventObjectProtobufString(stream_number, index)
+      # When there is a lower bound the first read from the stream starts at
+      # the first entry within the time bounds. The entry is looked up in
+      # the timestamps instead of reading through the stream and
+      # deserializing protobufs just to compare timestamps.
+      first_entry_index, _ = self._GetStoreEntryRange(stream_number)
+      if first_entry_index:
+        return self._GetEventObjectProtobufString(
+            stream_number, first_entry_index)
 
     size_data = file_object.read(4)
 
@@ -620,21 +1096,15 @@ class StorageFile(object):
     Raises:
       IOError: if the stream cannot be opened.
     """
-    # Since zipfile.ZipExtFile is not seekable we need to close the stream
-    # and reopen it to fake a seek.
-    if stream_number in self._proto_streams:
-      previous_file_object, _ = self._proto_streams[stream_number]
-      del self._proto_streams[stream_number]
-      previous_file_object.close()
-
     stream_name = 'plaso_proto.{0:06d}'.format(stream_number)
-    file_object = self._OpenStream(stream_name, 'r')
+    file_object = self._OpenStreamAtOffset(stream_name, stream_offset)
     if file_object is None:
       raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
 
-    # Since zipfile.ZipExtFile is not seekable we need to read upto
-    # the stream offset.
-    _ = file_object.read(stream_offset)
+    if stream_number in self._proto_streams:
+      previous_file_object, _ = self._proto_streams[stream_number]
+      if previous_file_object != file_object:
+        previous_file_object.close()
 
     self._proto_streams[stream_number] = (file_object, entry_index)
 
@@ -643,6 +1113,8 @@ class StorageFile(object):
   def _GetProtoStreamOffset(self, stream_number, entry_index):
     """Retrieves the offset of a proto stream entry from the index stream.
 
+    The index stream is read once and cached.
+
     Args:
       stream_number: the number of the stream.
       entry_index: the entry index.
@@ -654,29 +1126,106 @@ class StorageFile(object):
     Raises:
       IOError: if the stream cannot be opened.
     """
-    # TODO: cache the index file object in the same way as the proto
-    # stream file objects.
+    index_array = self._index_cache.GetValue(stream_number)
+    if index_array is None:
+      stream_name = 'plaso_index.{0:06d}'.format(stream_number)
+      index_data = self._ReadStream(stream_name)
+      if index_data is None:
+        raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
 
-    # TODO: once cached use the last entry index to determine if the stream
-    # file object should be re-opened.
+      # The index consists of 32-bit little-endian offsets ('<I').
+      index_data_size = len(index_data) - (len(index_data) % 4)
+      index_array = array.array('I')
+      index_array.fromstring(index_data[:index_data_size])
+      if sys.byteorder != 'little':
+        index_array.byteswap()
 
-    stream_name = 'plaso_index.{0:06d}'.format(stream_number)
-    index_file_object = self._OpenStream(stream_name, 'r')
-    if index_file_object is None:
-      raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
+      self._index_cache.SetValue(stream_number, index_array)
 
-    # Since zipfile.ZipExtFile is not seekable we need to read upto
-    # the stream offset.
-    _ = index_file_object.read(entry_index * 4)
+    if entry_index >= len(index_array):
+      return None
 
-    index_data = index_file_object.read(4)
+    return index_array[entry_index]
 
-    index_file_object.close()
+  def _OpenSeekableStream(self, stream_name):
+    """Opens a seekable stream.
 
-    if len(index_data) != 4:
-      return None
+    The seekable streams are cached, hence the stream should not be used to
+    read sequentially from by more than one reader at the same time.
+
+    Args:
+      stream_name: the name of the stream.
 
-    return struct.unpack('<I', index_data)[0]
+    Returns:
+      The stream file-like object (instance of _SeekableZipStream) or None
+      if the stream does not exist or cannot be read directly from
+      the ZIP file.
+    """
+    seekable_stream = self._seekable_streams.get(stream_name, None)
+    if seekable_stream:
+      return seekable_stream
+
+    try:
+      zip_info = self._zipfile.getinfo(stream_name)
+    except KeyError:
+      return
+
+    if not self._zip_file_object:
+      # The ZIP file can only be opened a second time when its path is known.
+      if not isinstance(self._output_file, basestring):
+        return
+      self._zip_file_object = open(self._output_file, 'rb')
+
+      if self._read_only:
+        # The streams stored uncompressed are read from a memory map. The ZIP
+        # file can only be memory mapped read-only since otherwise it grows.
+        try:
+          self._zip_file_memory_map = mmap.mmap(
+              self._zip_file_object.fileno(), 0, access=mmap.ACCESS_READ)
+        except (EnvironmentError, ValueError) as exception:
+          logging.debug(
+              u'Unable to memory map storage file with error: {0:s}'.format(
+                  exception))
+
+    if not self._read_only:
+      # Make sure the data written to the ZIP file can be read.
+      self._zipfile.fp.flush()
+
+    try:
+      seekable_stream = _SeekableZipStream(
+          self._zip_file_object, zip_info, self._stream_block_cache,
+          memory_map=self._zip_file_memory_map)
+    except IOError as exception:
+      logging.debug((
+          u'Unable to open seekable stream: {0:s} with error: '
+          u'{1:s}').format(stream_name, exception))
+      return
+
+    self._seekable_streams[stream_name] = seekable_stream
+    return seekable_stream
+
+  def _OpenStreamAtOffset(self, stream_name, stream_offset):
+    """Opens a stream and seeks a specified offset in the stream.
+
+    Args:
+      stream_name: the name of the stream.
+      stream_offset: the offset relative to the start of the stream.
+
+    Returns:
+      The stream file-like object or None.
+    """
+    file_object = self._OpenSeekableStream(stream_name)
+    if file_object:
+      file_object.seek(stream_offset, 0)
+      return file_object
+
+    file_object = self._OpenStream(stream_name, 'r')
+    if file_object:
+      # Since zipfile.ZipExtFile is not seekable we need to read upto
+      # the stream offset.
+      _ = file_object.read(stream_offset)
+
+    return file_object
 
   def _OpenStream(self, stream_name, mode='r'):
     """Opens a stream.
@@ -693,6 +1242,40 @@ class StorageFile(object):
     except KeyError:
       return
 
+  def _ReadStream(self, stream_name):
+    """Reads all the data of a stream.
+
+    Streams that are stored uncompressed are read directly from the memory
+    map of the storage file when it is opened read-only.
+
+    Args:
+      stream_name: the name of the stream.
+
+    Returns:
+      A byte string containing the data of the stream or None if the stream
+      does not exist.
+    """
+    if self._read_only:
+      seekable_stream = self._OpenSeekableStream(stream_name)
+      if seekable_stream and seekable_stream.is_memory_mapped:
+        seekable_stream.seek(0, 0)
+        return seekable_stream.read()
+
+    file_object = self._OpenStream(stream_name, 'r')
+    if file_object is None:
+      return
+
+    # zipfile.ZipExtFile does not support the with-statement interface.
+    data_segments = []
+    data = file_object.read(self._STREAM_DATA_SEGMENT_SIZE)
+    while data:
+      data_segments.append(data)
+      data = file_object.read(self._STREAM_DATA_SEGMENT_SIZE)
+
+    file_object.close()
+
+    return ''.join(data_segments)
+
   def _ReadEventTag(self, file_object):
     """Reads an event tag from the storage file.
 
@@ -733,38 +1316,13 @@ class StorageFile(object):
       return
 
     stream_name = 'plaso_tagging.{0:06d}'.format(tag_index_value.store_number)
-    tag_file_object = self._OpenStream(stream_name, 'r')
+    tag_file_object = self._OpenStreamAtOffset(
+        stream_name, tag_index_value.store_offset)
     if tag_file_object is None:
       raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
 
-    # Since zipfile.ZipExtFile is not seekable we need to read upto
-    # the store offset.
-    _ = tag_file_object.read(tag_index_value.store_offset)
     return self._ReadEventTag(tag_file_object)
 
-  def _ReadStream(self, stream_name):
-    """Reads the data in a stream.
-
-    Args:
-      stream_name: the name of the stream.
-
-    Returns:
-      A byte string containing the data of the stream.
-    """
-    data_segments = []
-    file_object = self._OpenStream(stream_name, 'r')
-
-    # zipfile.ZipExtFile does not support the with-statement interface.
-    if file_object:
-      data = file_object.read(self._STREAM_DATA_SEGMENT_SIZE)
-      while data:
-        data_segments.append(data)
-        data = file_object.read(self._STREAM_DATA_SEGMENT_SIZE)
-
-      file_object.close()
-
-    return ''.join(data_segments)
-
   def _WritePreprocessObject(self, pre_obj):
     """Writes a preprocess object to the storage file.
 
@@ -774,7 +1332,7 @@ class StorageFile(object):
     Raises:
       IOError: if the stream cannot be opened.
     """
-    existing_stream_data = self._ReadStream('information.dump')
+    existing_stream_data = self._ReadStream('information.dump') or ''
 
     # Store information about store range for this particular
     # preprocessing object. This will determine which stores
@@ -805,6 +1363,11 @@ class StorageFile(object):
 
   def Close(self):
     """Closes the storage, flush the last buffer and closes the ZIP file."""
+    if self._sorted_entries:
+      # Make sure the process pool of the sorted entries generator is stopped.
+      self._sorted_entries.close()
+      self._sorted_entries = None
+
     if self._file_open:
       if not self._read_only and self._pre_obj:
         self._WritePreprocessObject(self._pre_obj)
@@ -812,6 +1375,20 @@ class StorageFile(object):
       self._FlushBuffer()
       self._zipfile.close()
       self._file_open = False
+
+      if self._zip_file_memory_map:
+        self._zip_file_memory_map.close()
+        self._zip_file_memory_map = None
+
+      if self._zip_file_object:
+        self._zip_file_object.close()
+        self._zip_file_object = None
+
+      self._index_cache.Empty()
+      self._seekable_streams = {}
+      self._store_entry_ranges = {}
+      self._stream_block_cache.Empty()
+      self._timestamps_cache.Empty()
       if not self._read_only:
         logging.info((
             u'[Storage] Closing the storage, number of events processed: '
@@ -970,35 +1547,89 @@ class StorageFile(object):
 
     return information
 
-  def SetStoreLimit(self, unused_my_filter=None):
-    """Set a limit to the stores used for returning data."""
+  def SetStoreLimit(self, my_filter=None):
+    """Set a limit to the stores used for returning data.
+
+    The stores are limited to those that contain entries within the time
+    bounds and, when a filter is provided, to those that can contain entries
+    that match the filter, based on the metadata of the store.
+
+    Args:
+      my_filter: optional filter object (instance of FilterObject).
+                 The default is None.
+    """
     # We are setting the bounds now, remove potential prior bound settings.
     if hasattr(self, '_bound_first'):
       del self._bound_first
 
     self.store_range = []
+    self._store_entry_ranges = {}
 
     # Retrieve set first and last timestamps.
     self._GetTimeBounds()
 
-    # TODO: Fetch a filter object from the filter query.
+    # Only filter objects based on a filter expression have a matcher.
+    matcher = getattr(my_filter, 'matcher', None)
 
     for number in self.GetProtoNumbers():
-      # TODO: Read more criteria from here.
-      first, last = self.ReadMeta(number).get('range', (0, limit.MAX_INT64))
+      store_metadata = self.ReadMeta(number)
+      first, last = store_metadata.get('range', (0, limit.MAX_INT64))
       if last < first:
         logging.error(
             u'last: {0:d} first: {1:d} container: {2:d} (last < first)'.format(
                 last, first, number))
 
       if first <= self._bound_last and self._bound_first <= last:
-        # TODO: Check at least parser and data_type (stored in metadata).
-        # Check whether these attributes exist in filter, if so use the filter
-        # to determine whether the stores should be included.
-        self.store_range.append(number)
+        if matcher and not self._StoreCanMatch(store_metadata, matcher):
+          logging.debug(
+              u'Store [{0:d}] not used, no entries match filter'.format(number))
+          continue
 
-      else:
-        logging.debug(u'Store [{0:d}] not used'.format(number))
+        # The range in the metadata can overlap the time bounds without
+        # an entry being within the time bounds.
+        first_entry_index, last_entry_index = self._GetStoreEntryRange(number)
+        if first_entry_index < last_entry_index:
+          self.store_range.append(number)
+          continue
+
+      logging.debug(u'Store [{0:d}] not used'.format(number))
+
+  def _StoreCanMatch(self, store_metadata, matcher):
+    """Determines if entries in a store can match a filter.
+
+    Args:
+      store_metadata: the metadata of the store (dictionary).
+      matcher: the filter matcher (instance of objectfilter.Filter).
+
+    Returns:
+      False if none of the entries in the store can match the filter,
+      True otherwise.
+    """
+    attribute_values = {}
+
+    data_types = store_metadata.get('data_type', None)
+    if data_types is not None:
+      attribute_values['data_type'] = data_types
+
+    # The parsers are only known if every entry has a parser.
+    parsers = store_metadata.get('parsers', None)
+    if parsers is not None and 'unknown_parser' not in parsers:
+      attribute_values['parser'] = parsers
+
+    attribute_value_filters = {}
+    bloom_filters = store_metadata.get('bloom_filters', None) or {}
+    for attribute_name, bloom_filter_dict in bloom_filters.iteritems():
+      try:
+        attribute_value_filters[attribute_name] = (
+            bloom_filter.BloomFilter.CopyFromDict(bloom_filter_dict))
+      except ValueError as exception:
+        logging.warning(
+            u'Unable to read bloom filter: {0:s} with error: {1:s}'.format(
+                attribute_name, exception))
+
+    return pfilter.CanMatchValues(
+        matcher, attribute_values,
+        attribute_value_filters=attribute_value_filters)
 
   def _GetTimeBounds(self):
     """Get the upper and lower time bounds."""
@@ -1007,70 +1638,382 @@ class StorageFile(object):
 
     self._bound_first, self._bound_last = pfilter.TimeRangeCache.GetTimeRange()
 
-  def GetSortedEntry(self, proto_out=False):
-    """Return a sorted entry from the storage file.
+  def _GetStoreEntryKeys(self, store_number):
+    """Retrieves the sort keys of the entries in a store within the time bounds.
 
     Args:
-      proto_out: A boolean variable indicating whether or not a protobuf
-      or a python object should be returned.
+      store_number: the store number.
+
+    Yields:
+      A tuple of the timestamp, store number and store index of every entry
+      within the time bounds, in the order they are stored.
+    """
+    first_entry_index, last_entry_index = self._GetStoreEntryRange(
+        store_number)
+
+    timestamps = self._ReadTimestamps(
+        store_number, first_entry_index, last_entry_index)
+    for store_index, timestamp in enumerate(timestamps, first_entry_index):
+      yield timestamp, store_number, store_index
+
+  def _GetStoreEntryRange(self, store_number):
+    """Retrieves the range of the entries in a store within the time bounds.
+
+    Since the entries in a store are sorted by timestamp the range is
+    determined by bisecting the timestamps. The range is cached per store
+    and time bounds, hence a range is never used for other time bounds.
+
+    Args:
+      store_number: the store number.
 
     Returns:
-      An EventObject python object, unless proto_out is set then an EventObject
-      protobuf is returned back.
+      A tuple of the index of the first entry within the time bounds and
+      the index of the entry following the last entry within the time bounds.
     """
-    if not hasattr(self, '_bound_first'):
-      self._GetTimeBounds()
-
-    if not hasattr(self, '_merge_buffer'):
-      self._merge_buffer = []
-      number_range = getattr(self, 'store_range', list(self.GetProtoNumbers()))
-      for store_number in number_range:
-        if proto_out:
-          event_object = self.GetProtoEntry(store_number)
-          if not event_object:
-            return
-          while event_object.timestamp < self._bound_first:
-            event_object = self.GetProtoEntry(store_number)
-            if not event_object:
-              return
-        else:
-          event_object = self.GetEventObject(store_number)
-          if not event_object:
-            return
-          while event_object.timestamp < self._bound_first:
-            event_object = self.GetEventObject(store_number)
-            if not event_object:
-              return
-
-        heapq.heappush(
-            self._merge_buffer,
-            (event_object.timestamp, store_number, event_object))
-
-    if not self._merge_buffer:
-      return
+    self._GetTimeBounds()
 
-    _, store_number, event_read = heapq.heappop(self._merge_buffer)
-    if not event_read:
-      return
+    cache_key = (store_number, self._bound_first, self._bound_last)
+    entry_range = self._store_entry_ranges.get(cache_key, None)
+    if entry_range is None:
+      timestamps = self._GetTimestamps(store_number)
+      entry_range = (
+          bisect.bisect_left(timestamps, self._bound_first),
+          bisect.bisect_right(timestamps, self._bound_last))
+      self._store_entry_ranges[cache_key] = entry_range
+
+    return entry_range
+
+  def _GetTimestamps(self, store_number):
+    """Retrieves the timestamps of the entries in a store.
+
+    The timestamps are read once and cached.
+
+    Args:
+      store_number: the store number.
+
+    Returns:
+      An array (instance of array.array) or list of the timestamps of
+      the entries, in the order they are stored.
+
+    Raises:
+      IOError: if the stream cannot be opened.
+    """
+    timestamps = self._timestamps_cache.GetValue(store_number)
+    if timestamps is not None:
+      return timestamps
+
+    stream_name = 'plaso_timestamps.{0:06d}'.format(store_number)
+    if stream_name not in self._GetStreamNames():
+      timestamps = list(self._ReadTimestampsFromProtoStream(store_number))
+
+    else:
+      timestamps_data = self._ReadStream(stream_name)
+      if timestamps_data is None:
+        raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
+
+      # The timestamps consist of 64-bit little-endian values ('<q').
+      number_of_timestamps = len(timestamps_data) // 8
+      timestamps_data = timestamps_data[:number_of_timestamps * 8]
+
+      if _TIMESTAMPS_ARRAY_TYPE_CODE:
+        timestamps = array.array(_TIMESTAMPS_ARRAY_TYPE_CODE)
+        timestamps.fromstring(timestamps_data)
+        if sys.byteorder != 'little':
+          timestamps.byteswap()
+
+      else:
+        timestamps = list(struct.unpack(
+            '<{0:d}q'.format(number_of_timestamps), timestamps_data))
+
+    self._timestamps_cache.SetValue(store_number, timestamps)
+    return timestamps
+
+  def _GetSortedEntryKeys(self):
+    """Retrieves the sort keys of all the entries in the used stores.
+
+    The stores are merged using their timestamps streams only, hence
+    without reading or deserializing the event object protobufs.
+
+    Returns:
+      A generator of tuples of the timestamp, store number and store index
+      in sorted order.
+    """
+    number_range = getattr(self, 'store_range', list(self.GetProtoNumbers()))
+    return heapq.merge(*[
+        self._GetStoreEntryKeys(store_number) for store_number in number_range])
 
-    # Stop as soon as we hit the upper bound.
-    if event_read.timestamp > self._bound_last:
+  def _GetSortedSerializedEntries(self):
+    """Retrieves the serialized entries of the used stores in sorted order.
+
+    Yields:
+      A tuple of the store number, store index and serialized event object
+      (protobuf) string.
+    """
+    last_store_indexes = {}
+    for _, store_number, store_index in self._GetSortedEntryKeys():
+      # The entries of a single store are read in the order they are stored,
+      # so only the first entry read from a store requires a seek.
+      if last_store_indexes.get(store_number, None) == store_index - 1:
+        entry_index = -1
+      else:
+        entry_index = store_index
+
+      event_object_data, _ = self._GetEventObjectProtobufString(
+          store_number, entry_index)
+      last_store_indexes[store_number] = store_index
+
+      if not event_object_data:
+        logging.error((
+            u'Unable to read entry index: {0:d} from proto stream: '
+            u'{1:d}').format(store_index, store_number))
+        continue
+
+      yield store_number, store_index, event_object_data
+
+  def _ReadTimestamps(self, store_number, first_entry_index=0,
+                      last_entry_index=None):
+    """Reads the timestamps of the entries in a store.
+
+    In contrast to _GetTimestamps the timestamps are read in segments
+    and are not cached.
+
+    Args:
+      store_number: the store number.
+      first_entry_index: optional index of the first entry to read the
+                         timestamp of. The default is 0.
+      last_entry_index: optional index of the entry following the last entry
+                        to read the timestamp of. The default is None, which
+                        represents the last entry in the store.
+
+    Yields:
+      The timestamps of the entries, in the order they are stored.
+
+    Raises:
+      IOError: if the stream cannot be opened.
+    """
+    stream_name = 'plaso_timestamps.{0:06d}'.format(store_number)
+    if stream_name not in self._GetStreamNames():
+      # Older storage files do not contain timestamps streams, in which case
+      # the timestamps are read from the proto stream.
+      timestamps = self._ReadTimestampsFromProtoStream(store_number)
+      for store_index, timestamp in enumerate(timestamps):
+        if last_entry_index is not None and store_index >= last_entry_index:
+          break
+        if store_index >= first_entry_index:
+          yield timestamp
       return
 
+    stream_offset = first_entry_index * 8
+    if last_entry_index is None:
+      stream_end_offset = None
+    else:
+      stream_end_offset = last_entry_index * 8
+
+    file_object = self._OpenStreamAtOffset(stream_name, stream_offset)
+    if file_object is None:
+      raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
+
+    while stream_end_offset is None or stream_offset < stream_end_offset:
+      read_size = self._TIMESTAMPS_DATA_SEGMENT_SIZE
+      if stream_end_offset is not None:
+        read_size = min(read_size, stream_end_offset - stream_offset)
+
+      # The seekable streams are shared, hence the offset is set before
+      # every read.
+      if isinstance(file_object, _SeekableZipStream):
+        file_object.seek(stream_offset, 0)
+
+      timestamps_data = file_object.read(read_size)
+      number_of_timestamps = len(timestamps_data) // 8
+      if not number_of_timestamps:
+        break
+
+      stream_offset += number_of_timestamps * 8
+
+      for timestamp in struct.unpack(
+          '<{0:d}q'.format(number_of_timestamps),
+          timestamps_data[:number_of_timestamps * 8]):
+        yield timestamp
+
+    file_object.close()
+
+  def _ReadTimestampsFromProtoStream(self, store_number):
+    """Reads the timestamps of the entries in a store from the proto stream.
+
+    Args:
+      store_number: the store number.
+
+    Yields:
+      The timestamps of the entries, in the order they are stored.
+
+    Raises:
+      IOError: if the stream cannot be opened.
+      errors.WrongProtobufEntry: If the probotuf size is too large for storage.
+    """
+    stream_name = 'plaso_proto.{0:06d}'.format(store_number)
+    file_object = self._OpenStream(stream_name, 'r')
+    if file_object is None:
+      raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
+
+    while True:
+      size_data = file_object.read(4)
+      if len(size_data) != 4:
+        break
+
+      proto_string_size = struct.unpack('<I', size_data)[0]
+      if proto_string_size > self.MAX_PROTO_STRING_SIZE:
+        raise errors.WrongProtobufEntry(
+            u'Protobuf string size value exceeds maximum: {0:d}'.format(
+                proto_string_size))
+
+      proto = plaso_storage_pb2.EventObject()
+      proto.ParseFromString(file_object.read(proto_string_size))
+      yield proto.timestamp
+
+    file_object.close()
+
+  def GetSortedEntries(self, proto_out=False):
+    """Retrieves the entries from the storage file in sorted order.
+
+    The entries are merged using the timestamps streams of the stores. When
+    more than one deserialization process is set, the event objects are
+    deserialized in chunks by a pool of processes, while the original order
+    is kept.
+
+    Args:
+      proto_out: optional boolean value to indicate whether an EventObject
+                 protobuf instead of a python object should be returned.
+                 The default is False.
+
+    Yields:
+      An event object (instance of EventObject), unless proto_out is set then
+      an EventObject protobuf.
+    """
+    self._GetTimeBounds()
+
+    serialized_entries = self._GetSortedSerializedEntries()
+
     if proto_out:
-      new_event_object = self.GetProtoEntry(store_number)
+      for store_number, store_index, event_object_data in serialized_entries:
+        proto = plaso_storage_pb2.EventObject()
+        proto.ParseFromString(event_object_data)
+
+        if (self._event_values_predicate and not _CanMatchEventObjectProtobuf(
+            self._event_values_predicate, proto)):
+          self._number_of_skipped_event_objects += 1
+          continue
+
+        proto.store_number = store_number
+        proto.store_index = store_index
+        yield proto
+      return
+
+    process_pool = None
+    if self._number_of_deserialization_processes > 1:
+      process_pool = multiprocessing.Pool(
+          self._number_of_deserialization_processes)
+
+    try:
+      for event_objects in self._DeserializeChunks(
+          serialized_entries, process_pool):
+        for event_object in event_objects:
+          event_object.tag = self._ReadEventTagByIdentifier(
+              event_object.store_number, event_object.store_index,
+              event_object.uuid)
+          yield event_object
+
+    finally:
+      if process_pool:
+        process_pool.terminate()
+        process_pool.join()
+
+  def _DeserializeChunks(self, serialized_entries, process_pool=None):
+    """Deserializes the serialized entries in chunks.
+
+    Args:
+      serialized_entries: a generator of the serialized entries.
+      process_pool: optional process pool (instance of multiprocessing.Pool).
+                    The default is None, which deserializes the entries
+                    in the current process.
+
+    Yields:
+      A list of event objects (instances of EventObject) per chunk, in the
+      order of the serialized entries.
+    """
+    # Limit the number of chunks that are being deserialized to bound
+    # the amount of memory used.
+    if process_pool:
+      maximum_number_of_pending_chunks = (
+          2 * self._number_of_deserialization_processes)
     else:
-      new_event_object = self.GetEventObject(store_number)
+      maximum_number_of_pending_chunks = 0
 
-    if new_event_object:
-      heapq.heappush(
-          self._merge_buffer,
-          (new_event_object.timestamp, store_number, new_event_object))
+    pending_chunks = collections.deque()
+    chunk = []
+    for serialized_entry in serialized_entries:
+      chunk.append(serialized_entry)
+      if len(chunk) < self._DESERIALIZATION_CHUNK_SIZE:
+        continue
 
-    event_read.tag = self._ReadEventTagByIdentifier(
-        event_read.store_number, event_read.store_index, event_read.uuid)
+      if not process_pool:
+        yield self._GetDeserializedChunk(
+            len(chunk), _DeserializeEventObjects(
+                chunk, self._event_values_predicate))
 
-    return event_read
+      else:
+        pending_chunks.append((len(chunk), process_pool.apply_async(
+            _DeserializeEventObjects, (chunk, self._event_values_predicate))))
+        if len(pending_chunks) >= maximum_number_of_pending_chunks:
+          chunk_size, result = pending_chunks.popleft()
+          yield self._GetDeserializedChunk(chunk_size, result.get())
+
+      chunk = []
+
+    if chunk:
+      if not process_pool:
+        yield self._GetDeserializedChunk(
+            len(chunk), _DeserializeEventObjects(
+                chunk, self._event_values_predicate))
+      else:
+        pending_chunks.append((len(chunk), process_pool.apply_async(
+            _DeserializeEventObjects, (chunk, self._event_values_predicate))))
+
+    while pending_chunks:
+      chunk_size, result = pending_chunks.popleft()
+      yield self._GetDeserializedChunk(chunk_size, result.get())
+
+  def _GetDeserializedChunk(self, chunk_size, event_objects):
+    """Counts the event objects skipped while deserializing a chunk.
+
+    Args:
+      chunk_size: the number of serialized entries in the chunk.
+      event_objects: a list of the deserialized event objects (instances of
+                     EventObject).
+
+    Returns:
+      The list of the deserialized event objects.
+    """
+    self._number_of_skipped_event_objects += chunk_size - len(event_objects)
+    return event_objects
+
+  def GetSortedEntry(self, proto_out=False):
+    """Return a sorted entry from the storage file.
+
+    Args:
+      proto_out: A boolean variable indicating whether or not a protobuf
+      or a python object should be returned.
+
+    Returns:
+      An EventObject python object, unless proto_out is set then an EventObject
+      protobuf is returned back.
+    """
+    if not self._sorted_entries:
+      self._sorted_entries = self.GetSortedEntries(proto_out=proto_out)
+
+    try:
+      return next(self._sorted_entries)
+    except StopIteration:
+      return
 
   def GetEventObject(self, stream_number, entry_index=-1):
     """Reads an event object from the store.
@@ -1178,6 +2121,51 @@ class StorageFile(object):
     """Return the current file number of the storage."""
     return self._file_number
 
+  def GetNumberOfSkippedEventObjects(self):
+    """Retrieves the number of event objects skipped by the event filter.
+
+    Returns:
+      The number of sorted entries that were not returned because they cannot
+      match the filter set by SetEventFilter.
+    """
+    return self._number_of_skipped_event_objects
+
+  def SetEventFilter(self, my_filter=None):
+    """Sets the filter used to skip sorted entries that cannot match.
+
+    The comparisons of the filter that only depend on the data type, parser
+    and timestamp, or on the presence of attributes, are evaluated against
+    the event object protobuf, so that entries that cannot match the filter
+    are skipped without deserializing them. The entries that are returned
+    still need to be matched against the filter.
+
+    Args:
+      my_filter: optional filter object (instance of FilterObject).
+                 The default is None, which represents no filter.
+    """
+    self._event_values_predicate = None
+    self._number_of_skipped_event_objects = 0
+
+    # Only filter objects based on a filter expression have a matcher.
+    matcher = getattr(my_filter, 'matcher', None)
+    if not matcher:
+      return
+
+    event_values_predicate = pfilter.EventValuesPredicate(
+        matcher, _EVENT_VALUES_PREDICATE_ATTRIBUTE_NAMES)
+    if event_values_predicate.has_comparisons:
+      self._event_values_predicate = event_values_predicate
+
+  def SetNumberOfDeserializationProcesses(self, number_of_processes):
+    """Sets the number of processes used to deserialize sorted entries.
+
+    Args:
+      number_of_processes: the number of processes, where a value of 1 or
+                           less deserializes the entries in the current
+                           process.
+    """
+    self._number_of_deserialization_processes = number_of_processes
+
   def AddEventObject(self, event_object):
     """Adds an event object to the storage.
 
@@ -1190,32 +2178,67 @@ class StorageFile(object):
     if not self._file_open:
       raise IOError(u'Trying to add an entry to a closed storage file.')
 
-    if event_object.timestamp > self._buffer_last_timestamp:
-      self._buffer_last_timestamp = event_object.timestamp
+    attributes = event_object.GetValues()
+
+    event_object_data = self._event_object_serializer.WriteSerialized(
+        event_object)
+
+    self.AddSerializedEventObject(
+        event_object.timestamp, event_object_data, event_object.data_type,
+        parser=attributes.get('parser', None),
+        plugin=attributes.get('plugin', None),
+        filename=attributes.get('filename', None),
+        hostname=attributes.get('hostname', None),
+        username=attributes.get('username', None))
+
+  def AddSerializedEventObject(
+      self, timestamp, event_object_data, data_type, parser=None, plugin=None,
+      filename=None, hostname=None, username=None):
+    """Adds an event object that was serialized by the producer to the storage.
+
+    Args:
+      timestamp: the timestamp of the event object.
+      event_object_data: the serialized event object (protobuf) string.
+      data_type: the data type of the event object.
+      parser: optional name of the parser that produced the event object.
+              The default is None.
+      plugin: optional name of the plugin that produced the event object.
+              The default is None.
+      filename: optional filename of the event object. The default is None.
+      hostname: optional hostname of the event object. The default is None.
+      username: optional username of the event object. The default is None.
+
+    Raises:
+      IOError: When trying to write to a closed storage file.
+    """
+    if not self._file_open:
+      raise IOError(u'Trying to add an entry to a closed storage file.')
+
+    if timestamp > self._buffer_last_timestamp:
+      self._buffer_last_timestamp = timestamp
 
     # TODO: support negative timestamps.
-    if (event_object.timestamp < self._buffer_first_timestamp and
-        event_object.timestamp > 0):
-      self._buffer_first_timestamp = event_object.timestamp
+    if timestamp < self._buffer_first_timestamp and timestamp > 0:
+      self._buffer_first_timestamp = timestamp
 
-    attributes = event_object.GetValues()
     # Add values to counters.
     if self._pre_obj:
       self._pre_obj.counter['total'] += 1
-      self._pre_obj.counter[attributes.get('parser', 'N/A')] += 1
-      if 'plugin' in attributes:
-        self._pre_obj.plugin_counter[attributes.get('plugin', 'N/A')] += 1
+      self._pre_obj.counter[parser or 'N/A'] += 1
+      if plugin:
+        self._pre_obj.plugin_counter[plugin] += 1
 
     # Add to temporary counter.
-    self._count_data_type[event_object.data_type] += 1
-    parser = attributes.get('parser', 'unknown_parser')
-    self._count_parser[parser] += 1
+    self._count_data_type[data_type] += 1
+    self._count_parser[parser or 'unknown_parser'] += 1
 
-    event_object_data = self._event_object_serializer.WriteSerialized(
-        event_object)
+    for attribute_name, attribute_value in [
+        ('filename', filename), ('hostname', hostname),
+        ('username', username)]:
+      if isinstance(attribute_value, basestring):
+        self._bloom_filter_values[attribute_name].add(attribute_value)
 
-    heapq.heappush(
-        self._buffer, (event_object.timestamp, event_object_data))
+    heapq.heappush(self._buffer, (timestamp, event_object_data))
     self._buffer_size += len(event_object_data)
     self._write_counter += 1
 
@@ -1422,14 +2445,11 @@ class StorageFile(object):
         stream_name = 'plaso_tagging.{0:06d}'.format(
             tag_index_value.store_number)
 
-        tag_file_object = self._OpenStream(stream_name, 'r')
+        tag_file_object = self._OpenStreamAtOffset(
+            stream_name, tag_index_value.store_offset)
         if tag_file_object is None:
           raise IOError(u'Unable to open stream: {0:s}'.format(stream_name))
 
-        # Since zipfile.ZipExtFile is not seekable we need to read upto
-        # the store offset.
-        _ = tag_file_object.read(tag_index_value.store_offset)
-
         old_tag = self._ReadEventTag(tag_file_object)
 
         # TODO: move the append functionality into EventTag.
@@ -1483,7 +2503,9 @@ class StorageFile(object):
 class StorageFileWriter(queue.EventObjectQueueConsumer):
   """Class that implements a storage file writer object."""
 
-  def __init__(self, storage_queue, output_file, buffer_size=0, pre_obj=None):
+  def __init__(
+      self, storage_queue, output_file, buffer_size=0, pre_obj=None,
+      compress=True):
     """Initializes the storage file writer.
 
     Args:
@@ -1491,21 +2513,51 @@ class StorageFileWriter(queue.EventObjectQueueConsumer):
       output_file: The path to the output file.
       buffer_size: The estimated size of a protobuf file.
       pre_obj: A preprocessing object (instance of PreprocessObject).
+      compress: Optional boolean to indicate the storage file should be
+                deflate compressed. The default is True.
     """
     super(StorageFileWriter, self).__init__(storage_queue)
     self._buffer_size = buffer_size
+    self._compress = compress
     self._output_file = output_file
     self._pre_obj = pre_obj
     self._storage_file = None
 
   def _ConsumeEventObject(self, event_object):
-    """Consumes an event object callback for ConsumeEventObjects."""
-    self._storage_file.AddEventObject(event_object)
+    """Consumes an event object callback for ConsumeEventObjects.
+
+    Args:
+      event_object: an event object (instance of EventObject) or a tuple
+                    of a serialized event object as produced by
+                    SerializedEventObjectQueueProducer.
+    """
+    if isinstance(event_object, tuple):
+      self._storage_file.AddSerializedEventObject(*event_object)
+    else:
+      self._storage_file.AddEventObject(event_object)
+
+  def _ConsumeEventObjects(self, event_objects):
+    """Consumes a batch of event objects callback for ConsumeEventObjects.
+
+    Args:
+      event_objects: a list of event objects (instances of EventObject) or
+                     tuples of serialized event objects as produced by
+                     SerializedEventObjectQueueProducer.
+    """
+    add_event_object = self._storage_file.AddEventObject
+    add_serialized_event_object = self._storage_file.AddSerializedEventObject
+
+    for event_object in event_objects:
+      if isinstance(event_object, tuple):
+        add_serialized_event_object(*event_object)
+      else:
+        add_event_object(event_object)
 
   def WriteEventObjects(self):
     """Writes the event objects that are pushed on the queue."""
     self._storage_file = StorageFile(
-        self._output_file, buffer_size=self._buffer_size, pre_obj=self._pre_obj)
+        self._output_file, buffer_size=self._buffer_size, pre_obj=self._pre_obj,
+        compress=self._compress)
     self.ConsumeEventObjects()
     self._storage_file.Close()
 
@@ -1539,6 +2591,14 @@ class BypassStorageWriter(queue.EventObjectQueueConsumer):
 
     self._output_module.WriteEvent(event_object)
 
+  def _ConsumeEventObjects(self, event_objects):
+    """Consumes a batch of event objects callback for ConsumeEventObjects."""
+    for event_object in event_objects:
+      event_object.store_number = 1
+      event_object.store_index = -1
+
+      self._output_module.WriteEvent(event_object)
+
   # Typically you will have a storage object that has this function,
   # as in you can call store.GetStorageInformation and that will read
   # the information from the store. However in this case we are not
@@ -20,9 +20,11 @@
 import os
 import tempfile
 import shutil
+import struct
 import unittest
 import zipfile
 
+from plaso.filters import eventfilter
 from plaso.lib import event
 from plaso.lib import eventdata
 from plaso.lib import pfilter
@@ -147,6 +149,155 @@ class StorageFileTest(unittest.TestCase):
       self.assertEquals(len(z_filename_list), 4)
       self.assertEquals(z_filename_list, expected_z_filename_list)
 
+  def testStorageWriterSerializedEventObjects(self):
+    """Test the storage writer with event objects serialized by the producer."""
+    test_queue = queue.MultiThreadedQueue(maximum_batch_size=3)
+    test_queue_producer = queue.SerializedEventObjectQueueProducer(test_queue)
+    test_queue_producer.ProduceEventObjects(self._event_objects)
+    test_queue_producer.SignalEndOfInput()
+
+    with TempDirectory() as dirname:
+      temp_file = os.path.join(dirname, 'plaso.db')
+      storage_writer = storage.StorageFileWriter(test_queue, temp_file)
+      storage_writer.WriteEventObjects()
+
+      with storage.StorageFile(temp_file, read_only=True) as store:
+        self.assertEquals(store.ReadMeta(1)['count'], 4)
+        self.assertEquals(store.ReadMeta(1)['parsers'], ['UNKNOWN'])
+
+        timestamps = [
+            event_object.timestamp for event_object in store.GetEntries(1)]
+
+    expected_timestamps = sorted([
+        event_object.timestamp for event_object in self._event_objects])
+    self.assertEquals(timestamps, expected_timestamps)
+
+  def testStorageFileFlushBuffer(self):
+    """Test flushing the buffer into multiple stores."""
+    with TempDirectory() as dirname:
+      temp_file = os.path.join(dirname, 'plaso.db')
+
+      # Use a buffer size that causes every event object to be flushed.
+      with storage.StorageFile(temp_file, buffer_size=1) as store:
+        for event_object in self._event_objects:
+          store.AddEventObject(event_object)
+
+      self.assertEquals(os.listdir(dirname), ['plaso.db'])
+
+      with storage.StorageFile(temp_file, read_only=True) as store:
+        store_numbers = list(store.GetProtoNumbers())
+        timestamps = []
+        for store_number in store_numbers:
+          number_of_entries = store.ReadMeta(store_number)['count']
+          for entry_index in range(number_of_entries):
+            event_object = store.GetEventObject(store_number, entry_index)
+            timestamps.append(event_object.timestamp)
+
+    self.assertEquals(len(store_numbers), 4)
+    expected_timestamps = sorted([
+        event_object.timestamp for event_object in self._event_objects])
+    self.assertEquals(sorted(timestamps), expected_timestamps)
+
+  def testSetStoreLimitWithFilter(self):
+    """Test the SetStoreLimit function with a filter."""
+    self._event_objects[0].filename = u'/Windows/System32/config/SOFTWARE'
+    self._event_objects[3].filename = u'/var/log/messages'
+
+    queries_and_store_ranges = [
+        ('filename is \'/Windows/System32/config/SOFTWARE\'', [1]),
+        ('filename is \'/var/log/messages\'', [4]),
+        ('filename is \'/etc/passwd\'', []),
+        ('filename contains \'passwd\'', [1, 2, 3, 4]),
+        ('parser is \'UNKNOWN\'', [1, 2, 3, 4]),
+        ('data_type is \'text:entry\'', [4]),
+        ('data_type is \'text:entry\' or parser is \'winreg\'', [4]),
+        ('username is \'johndoe\'', [4]),
+        ('text contains \'log\'', [1, 2, 3, 4])]
+
+    pfilter.TimeRangeCache.ResetTimeConstraints()
+
+    with TempDirectory() as dirname:
+      temp_file = os.path.join(dirname, 'plaso.db')
+
+      # Use a buffer size that causes every event object to be flushed.
+      with storage.StorageFile(temp_file, buffer_size=1) as store:
+        for event_object in self._event_objects:
+          store.AddEventObject(event_object)
+
+      with storage.StorageFile(temp_file, read_only=True) as store:
+        bloom_filters = store.ReadMeta(1)['bloom_filters']
+        self.assertEquals(
+            sorted(bloom_filters.keys()), ['filename', 'hostname', 'username'])
+
+        for query, expected_store_range in queries_and_store_ranges:
+          filter_object = eventfilter.EventObjectFilter()
+          filter_object.CompileFilter(query)
+
+          store.SetStoreLimit(filter_object)
+          self.assertEquals(store.store_range, expected_store_range, query)
+
+  def testStorageWriterUncompressed(self):
+    """Test the storage writer with uncompressed storage."""
+    test_queue = queue.MultiThreadedQueue()
+    test_queue_producer = queue.EventObjectQueueProducer(test_queue)
+    test_queue_producer.ProduceEventObjects(self._event_objects)
+    test_queue_producer.SignalEndOfInput()
+
+    with TempDirectory() as dirname:
+      temp_file = os.path.join(dirname, 'plaso.db')
+      storage_writer = storage.StorageFileWriter(
+          test_queue, temp_file, compress=False)
+      storage_writer.WriteEventObjects()
+
+      with zipfile.ZipFile(temp_file, 'r') as z_file:
+        compress_types = set([
+            zip_info.compress_type for zip_info in z_file.infolist()])
+        index_data = z_file.read('plaso_index.000001')
+
+      with storage.StorageFile(temp_file, read_only=True) as store:
+        timestamps = [
+            event_object.timestamp for event_object in store.GetEntries(1)]
+
+        # Read the entries in reverse order from the memory map.
+        reversed_timestamps = [
+            store.GetEventObject(1, entry_index).timestamp
+            for entry_index in range(3, -1, -1)]
+
+      with storage.StorageFile(temp_file, read_only=True) as store:
+        # The index and timestamps streams are read from the memory map,
+        # not by zipfile.
+        def _OpenStream(stream_name, unused_mode='r'):
+          raise AssertionError(u'Stream: {0:s} read by zipfile.'.format(
+              stream_name))
+
+        # pylint: disable=protected-access
+        store._OpenStream = _OpenStream
+
+        index_offsets = [
+            store._GetProtoStreamOffset(1, entry_index)
+            for entry_index in range(4)]
+        store_timestamps = list(store._GetTimestamps(1))
+
+    self.assertEquals(compress_types, set([zipfile.ZIP_STORED]))
+    self.assertEquals(
+        index_offsets, list(struct.unpack('<4I', index_data[:16])))
+
+    expected_timestamps = sorted([
+        event_object.timestamp for event_object in self._event_objects])
+    self.assertEquals(timestamps, expected_timestamps)
+    self.assertEquals(reversed_timestamps, expected_timestamps[::-1])
+    self.assertEquals(store_timestamps, expected_timestamps)
+
+  def testReadStream(self):
+    """Tests reading a missing stream."""
+    test_file = os.path.join('test_data', 'psort_test.out')
+    with storage.StorageFile(test_file, read_only=True) as store:
+      # pylint: disable=protected-access
+      self.assertEquals(store._ReadStream('missing'), None)
+
+      with self.assertRaises(IOError):
+        store._GetProtoStreamOffset(99, 0)
+
   def testStorage(self):
     """Test the storage object."""
     event_objects = []
@@ -289,6 +440,61 @@ class StorageFileTest(unittest.TestCase):
     self.assertEquals(same_events, proto_group_events)
 
 
+class SeekableZipStreamTest(unittest.TestCase):
+  """Tests for the seekable ZIP stream."""
+
+  def setUp(self):
+    """Sets up the needed objects used throughout the test."""
+    self._temp_directory = tempfile.mkdtemp()
+    self._zip_file_path = os.path.join(self._temp_directory, 'test.zip')
+
+    # Use data that does not compress too well to span multiple blocks.
+    self._stream_data = ''.join([
+        '{0:d}:{1:d};'.format(index, (index * 7919) % 104729)
+        for index in range(20000)])
+
+    with zipfile.ZipFile(self._zip_file_path, 'w') as zip_file:
+      zip_file.writestr('deflated', self._stream_data, zipfile.ZIP_DEFLATED)
+      zip_file.writestr('stored', self._stream_data, zipfile.ZIP_STORED)
+
+  def tearDown(self):
+    """Cleans up after running an individual test."""
+    shutil.rmtree(self._temp_directory, True)
+
+  def _TestReadStream(self, stream_name):
+    """Reads a stream at several offsets and compares the data."""
+    block_cache = storage._LeastRecentlyUsedCache(4)
+    with open(self._zip_file_path, 'rb') as file_object:
+      with zipfile.ZipFile(self._zip_file_path, 'r') as zip_file:
+        zip_info = zip_file.getinfo(stream_name)
+
+      stream = storage._SeekableZipStream(file_object, zip_info, block_cache)
+      # Use small blocks and checkpoint intervals to test block boundaries.
+      stream._BLOCK_SIZE = 1024
+      stream._CHECKPOINT_INTERVAL = 4
+
+      self.assertEquals(stream.size, len(self._stream_data))
+      self.assertEquals(stream.read(), self._stream_data)
+
+      for offset in [150000, 1023, 0, 70000, 4096, len(self._stream_data) - 5]:
+        stream.seek(offset, 0)
+        self.assertEquals(stream.tell(), offset)
+        self.assertEquals(
+            stream.read(3000), self._stream_data[offset:offset + 3000])
+
+      stream.seek(-10, 2)
+      self.assertEquals(stream.read(), self._stream_data[-10:])
+      self.assertEquals(stream.read(10), '')
+
+  def testReadDeflated(self):
+    """Tests reading a deflate compressed stream."""
+    self._TestReadStream('deflated')
+
+  def testReadStored(self):
+    """Tests reading a stored stream."""
+    self._TestReadStream('stored')
+
+
 class StoreStorageTest(unittest.TestCase):
   """Test sorting storage file,"""
 
@@ -325,11 +531,144 @@ class StoreStorageTest(unittest.TestCase):
       event_object = store.GetSortedEntry()
 
     expected_timestamps = [
-        1344270407000000L, 1392438730000000L, 1427151678000000L,
+        1343166324000000L, 1344270407000000L, 1392438730000000L,
+        1418925272000000L, 1427151678000000L, 1427151678000123L,
         1451584472000000L]
 
     self.assertEquals(read_list, expected_timestamps)
 
+  def testGetSortedEntries(self):
+    """Tests the GetSortedEntries function with a deserialization pool."""
+    pfilter.TimeRangeCache.ResetTimeConstraints()
+
+    with storage.StorageFile(self.test_file, read_only=True) as store:
+      expected_entries = [
+          (event_object.timestamp, event_object.store_number,
+           event_object.store_index)
+          for event_object in store.GetSortedEntries()]
+
+    with storage.StorageFile(self.test_file, read_only=True) as store:
+      store.SetNumberOfDeserializationProcesses(2)
+      # pylint: disable=protected-access
+      store._DESERIALIZATION_CHUNK_SIZE = 2
+
+      entries = [
+          (event_object.timestamp, event_object.store_number,
+           event_object.store_index)
+          for event_object in store.GetSortedEntries()]
+
+    self.assertEquals(len(entries), 15)
+    self.assertEquals(entries, sorted(entries))
+    self.assertEquals(entries, expected_entries)
+
+  def testSetEventFilter(self):
+    """Tests the SetEventFilter function."""
+    queries_and_numbers_of_entries = [
+        ('parser is \'filestat\'', 3),
+        ('parser is not \'filestat\' and data_type is \'fs:stat\'', 0),
+        ('data_type is \'syslog:line\' and body contains \'x\'', 11),
+        ('pid is 1', 10),
+        ('timestamp > 1418925272000000 or parser inlist \'webhist\'', 5),
+        ('message contains \'x\'', 15)]
+
+    for query, expected_number_of_entries in queries_and_numbers_of_entries:
+      filter_object = eventfilter.EventObjectFilter()
+      filter_object.CompileFilter(query)
+
+      # Read all the entries regardless of the time bounds of the filter.
+      pfilter.TimeRangeCache.ResetTimeConstraints()
+
+      with storage.StorageFile(self.test_file, read_only=True) as store:
+        store.SetEventFilter(filter_object)
+        store.SetNumberOfDeserializationProcesses(2)
+        # pylint: disable=protected-access
+        store._DESERIALIZATION_CHUNK_SIZE = 2
+
+        entries = [
+            (event_object.timestamp, event_object.store_number,
+             event_object.store_index)
+            for event_object in store.GetSortedEntries()]
+
+        self.assertEquals(len(entries), expected_number_of_entries, query)
+        self.assertEquals(entries, sorted(entries))
+        self.assertEquals(
+            store.GetNumberOfSkippedEventObjects(),
+            15 - expected_number_of_entries, query)
+
+      with storage.StorageFile(self.test_file, read_only=True) as store:
+        store.SetEventFilter(filter_object)
+
+        protos = list(store.GetSortedEntries(proto_out=True))
+        self.assertEquals(len(protos), expected_number_of_entries, query)
+
+  def testSetStoreLimit(self):
+    """Tests the SetStoreLimit function."""
+    pfilter.TimeRangeCache.ResetTimeConstraints()
+    pfilter.TimeRangeCache.SetLowerTimestamp(1390377181000000)
+    pfilter.TimeRangeCache.SetUpperTimestamp(1418925272000000)
+
+    with storage.StorageFile(self.test_file, read_only=True) as store:
+      store.SetStoreLimit()
+      self.assertEquals(store.store_range, [1, 3, 4, 5])
+
+      # pylint: disable=protected-access
+      self.assertEquals(store._GetStoreEntryRange(1), (2, 3))
+      self.assertEquals(store._GetStoreEntryRange(3), (0, 2))
+      self.assertEquals(store._GetStoreEntryRange(5), (0, 1))
+
+      # The cached ranges are not used for other time bounds.
+      store._bound_first, store._bound_last = 0, 1390377181000000
+      self.assertEquals(store._GetStoreEntryRange(1), (0, 2))
+
+      store._bound_first, store._bound_last = (
+          1390377181000000, 1418925272000000)
+
+      # The first entry read from a store is the first entry within
+      # the time bounds.
+      event_object = store.GetEventObject(1)
+      self.assertEquals(event_object.store_index, 2)
+      self.assertEquals(event_object.timestamp, 1392438730000000)
+
+      timestamps = [
+          event_object.timestamp for event_object in store.GetSortedEntries()]
+
+    pfilter.TimeRangeCache.ResetTimeConstraints()
+
+    expected_timestamps = [
+        1390377181000000, 1390377241000000, 1390377241000000,
+        1390377272000000, 1392438730000000, 1418925272000000]
+    self.assertEquals(timestamps, expected_timestamps)
+
+  def testGetEventObject(self):
+    """Tests the GetEventObject function with random access."""
+    with storage.StorageFile(self.test_file, read_only=True) as store:
+      expected_entries = []
+      for store_number in store.GetProtoNumbers():
+        for event_object in store.GetEntries(store_number):
+          expected_entries.append((
+              store_number, event_object.store_index, event_object.timestamp,
+              event_object.uuid))
+
+    with storage.StorageFile(self.test_file, read_only=True) as store:
+      entries = []
+      for store_number, store_index, _, _ in reversed(expected_entries):
+        event_object = store.GetEventObject(store_number, store_index)
+        entries.append((
+            event_object.store_number, event_object.store_index,
+            event_object.timestamp, event_object.uuid))
+
+      # The entries following an entry read with random access can be read
+      # sequentially.
+      first_event_object = store.GetEventObject(5, 0)
+      second_event_object = store.GetEventObject(5)
+
+      self.assertEquals(store.GetEventObject(1, 100), None)
+
+    self.assertEquals(len(entries), 15)
+    self.assertEquals(list(reversed(entries)), expected_entries)
+    self.assertEquals(first_event_object.timestamp, 1418925272000000L)
+    self.assertEquals(second_event_object.timestamp, 1427151678000000L)
+
 
 if __name__ == '__main__':
   unittest.main()
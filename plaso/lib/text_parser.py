@@ -23,9 +23,12 @@ parser.
 """
 
 import abc
+import collections
 import csv
+import itertools
 import logging
 import os
+import StringIO
 
 from dfvfs.helpers import text_file
 import pyparsing
@@ -34,6 +37,7 @@ from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import lexer
 from plaso.lib import parser
+from plaso.lib import pyparsing_compiler
 from plaso.lib import timelib
 from plaso.lib import utils
 
@@ -44,7 +48,294 @@ import pytz
 # pylint: disable=abstract-method
 
 
-class SlowLexicalTextParser(parser.BaseParser, lexer.SelfFeederMixIn):
+class TextProbe(object):
+  """Class that caches the start of a file for the text parsers.
+
+  The start of a file is read once, after which every text parser can
+  verify it against the probe instead of opening and reading the file
+  itself.
+  """
+
+  # The number of bytes read from the start of the file.
+  DATA_SIZE = 16 * 1024
+
+  def __init__(self, file_object):
+    """Initializes the text probe.
+
+    Args:
+      file_object: the file-like object.
+    """
+    super(TextProbe, self).__init__()
+    file_object.seek(0, os.SEEK_SET)
+    self._data = file_object.read(self.DATA_SIZE)
+    self._is_text = {}
+
+    # Value to indicate the probe contains all the data of the file.
+    self.is_complete = len(self._data) < self.DATA_SIZE
+
+  def GetData(self, size):
+    """Retrieves data from the start of the file.
+
+    Args:
+      size: the number of bytes to retrieve.
+
+    Returns:
+      A byte string containing the data, which is smaller than size if
+      the file is, or None if the probe does not contain enough data.
+    """
+    if size > len(self._data) and not self.is_complete:
+      return
+    return self._data[:size]
+
+  def GetFileObject(self):
+    """Retrieves a file-like object of the data of the probe.
+
+    Returns:
+      A file-like object (instance of StringIO).
+    """
+    return StringIO.StringIO(self._data)
+
+  def IsText(self, size):
+    """Determines if the data at the start of the file is text.
+
+    Args:
+      size: the number of bytes to check.
+
+    Returns:
+      A boolean value indicating if the data is text or None if the probe
+      does not contain enough data.
+    """
+    if size not in self._is_text:
+      data = self.GetData(size)
+      if data is None:
+        return
+      self._is_text[size] = utils.IsText(data)
+
+    return self._is_text[size]
+
+  def IsSufficient(self, offset):
+    """Determines if the data read from the probe suffices.
+
+    Args:
+      offset: the byte offset up to which the data of the probe was read.
+
+    Returns:
+      A boolean value indicating the data read from the probe is the same
+      as the data that would be read from the file.
+    """
+    return self.is_complete or offset < len(self._data)
+
+
+class TextLineReader(object):
+  """Class that implements a buffered reader of the lines of a text file.
+
+  The file is read in large blocks, which are split into lines and decoded
+  at once, instead of reading and decoding the file line by line.
+  """
+
+  # The number of bytes read from the file at once.
+  BLOCK_SIZE = 64 * 1024
+
+  def __init__(self, file_object, encoding=u'', quiet=False):
+    """Initializes the line reader.
+
+    The lines are read from the start of the file.
+
+    Args:
+      file_object: the file-like object.
+      encoding: optional encoding of the lines. The default is an empty
+                string, which means the lines are not decoded.
+      quiet: optional boolean value to indicate no warning should be
+             logged for lines that cannot be decoded. The default is False.
+    """
+    super(TextLineReader, self).__init__()
+    self._encoding = encoding
+    self._end_of_file = False
+    self._file_object = file_object
+    self._lines = collections.deque()
+    self._partial_line = []
+    self._partial_line_size = 0
+    self._quiet = quiet
+    # The offset of the data that has not been split into lines.
+    self._read_offset = 0
+
+    # The offset of the end of the last line read.
+    self.offset = 0
+
+    self._file_object.seek(0, os.SEEK_SET)
+
+  def __iter__(self):
+    """Iterates over the lines.
+
+    Yields:
+      A tuple of the offset of the line and the line, including the end
+      of line characters.
+    """
+    while True:
+      offset, line = self.ReadLine()
+      if line is None:
+        break
+      yield offset, line
+
+  def _DecodeLine(self, line):
+    """Decodes a line.
+
+    Args:
+      line: the line.
+
+    Returns:
+      The decoded line or the line if it cannot be decoded.
+    """
+    try:
+      return line.decode(self._encoding)
+    except UnicodeDecodeError:
+      if not self._quiet:
+        logging.warning(u'Unable to decode line [{0:s}...] using {1:s}'.format(
+            repr(line[1:30]), self._encoding))
+    return line
+
+  def _AddLines(self, data):
+    """Splits data into lines and adds them to the pending lines.
+
+    Args:
+      data: the data, which contains complete lines only, except for
+            the last line at the end of the file.
+    """
+    lines = data.split('\n')
+    # The empty string after the last end of line character is not a line.
+    if not lines[-1]:
+      lines.pop()
+
+    decoded_lines = lines
+    if self._encoding:
+      try:
+        decoded_lines = data.decode(self._encoding).split(u'\n')
+      except UnicodeDecodeError:
+        decoded_lines = None
+
+      # The encoding could contain end of line characters that are not
+      # the same as the byte, in which case the lines are decoded one
+      # by one.
+      if decoded_lines is not None:
+        if not decoded_lines[-1]:
+          decoded_lines.pop()
+        if len(decoded_lines) != len(lines):
+          decoded_lines = None
+
+    last_index = len(lines) - 1
+    for index, line in enumerate(lines):
+      size = len(line)
+      if index < last_index or data.endswith('\n'):
+        size += 1
+
+      if decoded_lines is None:
+        decoded_line = self._DecodeLine(line)
+      else:
+        decoded_line = decoded_lines[index]
+
+      if size > len(line):
+        decoded_line += u'\n' if isinstance(decoded_line, unicode) else '\n'
+
+      self._lines.append((self._read_offset, decoded_line, size))
+      self._read_offset += size
+
+  def _ReadBlock(self, maximum_length=None):
+    """Reads a block of data from the file and splits it into lines.
+
+    Args:
+      maximum_length: optional maximum number of bytes of a line. The default
+                      is None, which represents no maximum.
+
+    Returns:
+      A boolean value indicating data was read.
+    """
+    if self._end_of_file:
+      return False
+
+    data = self._file_object.read(self.BLOCK_SIZE)
+    if not data:
+      self._end_of_file = True
+      if self._partial_line:
+        self._AddLines(''.join(self._partial_line))
+        self._partial_line = []
+        self._partial_line_size = 0
+      return bool(self._lines)
+
+    last_end_of_line = data.rfind('\n')
+    if last_end_of_line < 0:
+      self._partial_line.append(data)
+      self._partial_line_size += len(data)
+
+      # Do not keep reading a single line beyond its maximum length.
+      if maximum_length and self._partial_line_size >= maximum_length:
+        self._AddLines(''.join(self._partial_line))
+        self._partial_line = []
+        self._partial_line_size = 0
+      return True
+
+    self._partial_line.append(data[:last_end_of_line + 1])
+    self._AddLines(''.join(self._partial_line))
+
+    self._partial_line = []
+    self._partial_line_size = 0
+    if last_end_of_line + 1 < len(data):
+      self._partial_line.append(data[last_end_of_line + 1:])
+      self._partial_line_size = len(data) - last_end_of_line - 1
+    return True
+
+  def ReadLine(self, maximum_length=None):
+    """Reads a line.
+
+    Args:
+      maximum_length: optional maximum number of bytes of the line. If the
+                      line is longer the remainder of the line is returned
+                      as the next line. The default is None, which represents
+                      no maximum.
+
+    Returns:
+      A tuple of the offset of the line and the line, including the end
+      of line characters, or (None, None) if there are no more lines.
+    """
+    while not self._lines:
+      if not self._ReadBlock(maximum_length=maximum_length):
+        return None, None
+
+    offset, line, size = self._lines.popleft()
+    if maximum_length and size > maximum_length:
+      remainder = line[maximum_length:]
+      line = line[:maximum_length]
+      if isinstance(line, unicode):
+        line_size = len(line.encode(self._encoding))
+      else:
+        line_size = len(line)
+
+      if remainder:
+        self._lines.appendleft(
+            (offset + line_size, remainder, size - line_size))
+      size = line_size
+
+    self.offset = offset + size
+    return offset, line
+
+
+class TextParser(parser.BaseParser):
+  """Class that defines the text parser interface."""
+
+  __abstract = True
+
+  @abc.abstractmethod
+  def VerifyTextProbe(self, text_probe):
+    """Verifies the start of a file against the text probe.
+
+    Args:
+      text_probe: the text probe (instance of TextProbe).
+
+    Returns:
+      False if the parser is unable to parse the file, True otherwise.
+    """
+
+
+class SlowLexicalTextParser(TextParser, lexer.SelfFeederMixIn):
   """Generic text based parser that uses lexer to assist with parsing.
 
   This text parser is based on a rather slow lexer, which makes the
@@ -258,6 +549,17 @@ class SlowLexicalTextParser(parser.BaseParser, lexer.SelfFeederMixIn):
               self.parser_name, path_spec_printable, file_offset))
     file_object.close()
 
+  def VerifyTextProbe(self, text_probe):
+    """Verifies the start of a file against the text probe.
+
+    Args:
+      text_probe: the text probe (instance of TextProbe).
+
+    Returns:
+      False if the parser is unable to parse the file, True otherwise.
+    """
+    return text_probe.IsText(40) is not False
+
   def ParseString(self, match, **unused_kwargs):
     """Return a string with combined values from the lexer.
 
@@ -371,7 +673,7 @@ class SlowLexicalTextParser(parser.BaseParser, lexer.SelfFeederMixIn):
     return event_object
 
 
-class TextCSVParser(parser.BaseParser):
+class TextCSVParser(TextParser):
   """An implementation of a simple CSV line-per-entry log files."""
 
   __abstract = True
@@ -415,22 +717,19 @@ class TextCSVParser(parser.BaseParser):
     event_object.row_dict = row
     yield event_object
 
-  def Parse(self, file_entry):
-    """Extract data from a CVS file.
+  def _ReadFirstRow(self, text_file_object, path_spec_printable):
+    """Reads and verifies the first row.
 
     Args:
-      file_entry: A file entry object.
-
-    Yields:
-      An event object (EventObject) that contains the parsed
-      attributes.
-    """
-    path_spec_printable = file_entry.path_spec.comparable.replace(u'\n', u';')
-    file_object = file_entry.GetFileObject()
-    file_object.seek(0, os.SEEK_SET)
+      text_file_object: the text file-like object.
+      path_spec_printable: the printable path specification of the file.
 
-    text_file_object = text_file.TextFile(file_object)
+    Returns:
+      A tuple containing the CSV reader and the first row.
 
+    Raises:
+      UnableToParseFile: when the first row cannot be verified.
+    """
     # If we specifically define a number of lines we should skip do that here.
     for _ in range(0, self.NUMBER_OF_HEADER_LINES):
       _ = text_file_object.readline()
@@ -468,6 +767,25 @@ class TextCSVParser(parser.BaseParser):
           u'[{0:s}] Unable to parse CSV file: {1:s}. Verification '
           u'failed.').format(self.parser_name, path_spec_printable))
 
+    return reader, row
+
+  def Parse(self, file_entry):
+    """Extract data from a CVS file.
+
+    Args:
+      file_entry: A file entry object.
+
+    Yields:
+      An event object (EventObject) that contains the parsed
+      attributes.
+    """
+    path_spec_printable = file_entry.path_spec.comparable.replace(u'\n', u';')
+    file_object = file_entry.GetFileObject()
+    file_object.seek(0, os.SEEK_SET)
+
+    text_file_object = text_file.TextFile(file_object)
+    reader, row = self._ReadFirstRow(text_file_object, path_spec_printable)
+
     for event_object in self.ParseRow(row):
       if event_object:
         event_object.offset = text_file_object.tell()
@@ -481,6 +799,25 @@ class TextCSVParser(parser.BaseParser):
 
     file_object.close()
 
+  def VerifyTextProbe(self, text_probe):
+    """Verifies the start of a file against the text probe.
+
+    Args:
+      text_probe: the text probe (instance of TextProbe).
+
+    Returns:
+      False if the parser is unable to parse the file, True otherwise.
+    """
+    file_object = text_probe.GetFileObject()
+    try:
+      self._ReadFirstRow(file_object, u'text probe')
+    except errors.UnableToParseFile:
+      return not text_probe.IsSufficient(file_object.tell())
+    except StopIteration:
+      pass
+
+    return True
+
 
 def PyParseRangeCheck(lower_bound, upper_bound):
   """Verify that a number is within a defined range.
@@ -627,7 +964,7 @@ class PyparsingConstants(object):
       pyparsing.nums, min=1, max=5).setParseAction(PyParseIntCast)
 
 
-class PyparsingSingleLineTextParser(parser.BaseParser):
+class PyparsingSingleLineTextParser(TextParser):
   """Single line text parser based on the pyparsing library."""
   __abstract = True
 
@@ -659,58 +996,94 @@ class PyparsingSingleLineTextParser(parser.BaseParser):
   # attribute.
   ENCODING = ''
 
+  # Determines if the line structures are compiled into regular expressions,
+  # which match a line considerably faster than pyparsing. A line structure
+  # that cannot be compiled is matched by pyparsing. A parser that relies on
+  # pyparsing specific behavior in ParseRecord can set this to False.
+  COMPILE_LINE_STRUCTURES = True
+
+  # The parse actions that are safe to call on compiled parse results.
+  _COMPILER_PARSE_ACTIONS = [PyParseIntCast, PyParseJoinList]
+
   def __init__(self, pre_obj, config):
     """A constructor for the pyparsing assistant."""
     super(PyparsingSingleLineTextParser, self).__init__(pre_obj, config)
     self.encoding = self.ENCODING
-    self._current_offset = 0
+    self._line_structures = None
 
-  def _ReadLine(self, text_file_object, max_len=0, quiet=False, depth=0):
-    """Read a single line from a text file and return it back.
+  def _GetLineStructures(self):
+    """Retrieves the line structures and their compiled counterparts.
+
+    The line structures are compiled the first time they are needed.
+
+    Returns:
+      A list of tuples of the key, the pyparsing structure and the compiled
+      line structure (instance of CompiledLineStructure) or None if the line
+      structure is matched by pyparsing.
+    """
+    if self._line_structures is None:
+      compiler = pyparsing_compiler.LineStructureCompiler(
+          self._COMPILER_PARSE_ACTIONS)
+
+      self._line_structures = []
+      for key, structure in self.LINE_STRUCTURES:
+        compiled_structure = None
+        if self.COMPILE_LINE_STRUCTURES:
+          compiled_structure = compiler.Compile(structure)
+          if not compiled_structure:
+            logging.debug((
+                u'Line structure: {0:s} of parser: {1:s} is matched by '
+                u'pyparsing.').format(key, self.parser_name))
+
+        self._line_structures.append((key, structure, compiled_structure))
+
+    return self._line_structures
+
+  def _ParseLine(self, line):
+    """Parses a line using the line structures.
 
     Args:
-      text_file_object: A text file object (instance of dfvfs.TextFile).
-      max_len: If defined determines the maximum number of bytes a single line
-      can take.
-      quiet: If True then a decode warning is not displayed.
-      depth: A threshold of how many newlines we can encounter before bailing
-      out.
+      line: the line.
 
     Returns:
-      A single line read from the file-like object, or the maximum number of
-      characters (if max_len defined and line longer than the defined size).
+      A tuple of the key of the line structure that matched and the parse
+      results or (None, None) if none of the line structures matched.
     """
-    if max_len:
-      line = text_file_object.readline(max_len)
-    else:
-      line = text_file_object.readline()
+    for key, structure, compiled_structure in self._GetLineStructures():
+      if compiled_structure:
+        parsed_structure = compiled_structure.ParseString(line)
+      else:
+        try:
+          parsed_structure = structure.parseString(line)
+        except pyparsing.ParseException:
+          parsed_structure = None
 
-    if not line:
-      return
+      if parsed_structure:
+        return key, parsed_structure
 
-    # If line is empty, skip it and go on.
-    if line == '\n' or line == '\r\n':
-      # Max 40 new lines in a row before we bail out.
-      if depth == 40:
-        return ''
+    return None, None
 
-      return self._ReadLine(text_file_object, max_len, depth=depth + 1)
+  def _ReadLines(self, line_reader):
+    """Reads the non-empty lines of a text file.
 
-    if not self.encoding:
-      return line.strip()
+    Args:
+      line_reader: the line reader (instance of TextLineReader).
 
-    try:
-      decoded_line = line.decode(self.encoding)
-      return decoded_line.strip()
-    except UnicodeDecodeError:
-      if not quiet:
-        logging.warning(u'Unable to decode line [{}...] using {}'.format(
-            repr(line[1:30]), self.encoding))
-      return line.strip()
+    Yields:
+      A tuple of the offset of the line and the line without the leading
+      and trailing white space.
+    """
+    for offset, line in line_reader:
+      line = line.strip()
+      if line:
+        yield offset, line
 
   def Parse(self, file_entry):
     """Extract data from a text file using a pyparsing definition.
 
+    The offset of an event is the byte offset in the file of the start of
+    the line it was parsed from, also when the lines are decoded.
+
     Args:
       file_entry: A file entry object.
 
@@ -728,53 +1101,43 @@ class PyparsingSingleLineTextParser(parser.BaseParser):
       raise errors.UnableToParseFile(
           u'Line structure undeclared, unable to proceed.')
 
-    file_object.seek(0, os.SEEK_SET)
-    text_file_object = text_file.TextFile(file_object)
+    line_reader = TextLineReader(file_object, encoding=self.encoding)
+
+    # Skip the empty lines at the start of the file.
+    offset, line = line_reader.ReadLine(self.MAX_LINE_LENGTH)
+    while line is not None and not line.strip():
+      offset, line = line_reader.ReadLine(self.MAX_LINE_LENGTH)
 
-    line = self._ReadLine(text_file_object, self.MAX_LINE_LENGTH, True)
     if not line:
       raise errors.UnableToParseFile(u'Not a text file.')
 
-    if len(line) == self.MAX_LINE_LENGTH or len(
-        line) == self.MAX_LINE_LENGTH - 1:
+    if line_reader.offset - offset >= self.MAX_LINE_LENGTH:
       logging.debug((
           u'Trying to read a line and reached the maximum allowed length of '
           '{}. The last few bytes of the line are: {} [parser {}]').format(
               self.MAX_LINE_LENGTH, repr(line[-10:]), self.parser_name))
 
+    line = line.strip()
     if not utils.IsText(line):
       raise errors.UnableToParseFile(u'Not a text file, unable to proceed.')
 
     if not self.VerifyStructure(line):
       raise errors.UnableToParseFile('Wrong file structure.')
 
-    # Set the offset to the beginning of the file.
-    self._current_offset = 0
     # Read every line in the text file.
-    while line:
-      parsed_structure = None
-      use_key = None
+    lines = itertools.chain([(offset, line)], self._ReadLines(line_reader))
+    for offset, line in lines:
       # Try to parse the line using all the line structures.
-      for key, structure in self.LINE_STRUCTURES:
-        try:
-          parsed_structure = structure.parseString(line)
-        except pyparsing.ParseException:
-          pass
-        if parsed_structure:
-          use_key = key
-          break
+      use_key, parsed_structure = self._ParseLine(line)
 
       if parsed_structure:
         parsed_event = self.ParseRecord(use_key, parsed_structure)
         if parsed_event:
-          parsed_event.offset = self._current_offset
+          parsed_event.offset = offset
           yield parsed_event
       else:
         logging.warning(u'Unable to parse log line: {}'.format(line))
 
-      self._current_offset = text_file_object.get_offset()
-      line = self._ReadLine(text_file_object)
-
     file_object.close()
 
   @abc.abstractmethod
@@ -787,14 +1150,39 @@ class PyparsingSingleLineTextParser(parser.BaseParser):
     Args:
       key: An identification string indicating the name of the parsed
       structure.
-      structure: A pyparsing.ParseResults object from a line in the
-      log file.
+      structure: A pyparsing.ParseResults object, or an equivalent
+      CompiledParseResults object, from a line in the log file.
 
     Returns:
       An EventObject if one can be extracted from the structure, otherwise
       None.
     """
 
+  def VerifyTextProbe(self, text_probe):
+    """Verifies the start of a file against the text probe.
+
+    Args:
+      text_probe: the text probe (instance of TextProbe).
+
+    Returns:
+      False if the parser is unable to parse the file, True otherwise.
+    """
+    if not self.LINE_STRUCTURES:
+      return False
+
+    line_reader = TextLineReader(
+        text_probe.GetFileObject(), encoding=self.encoding, quiet=True)
+
+    _, line = line_reader.ReadLine(self.MAX_LINE_LENGTH)
+    while line is not None and not line.strip():
+      _, line = line_reader.ReadLine(self.MAX_LINE_LENGTH)
+
+    if not text_probe.IsSufficient(line_reader.offset):
+      return True
+
+    line = (line or u'').strip()
+    return bool(line and utils.IsText(line) and self.VerifyStructure(line))
+
   @abc.abstractmethod
   def VerifyStructure(self, line):
     """Verify the structure of the file and return boolean based on that check.
@@ -820,39 +1208,107 @@ class PyparsingMultiLineTextParser(PyparsingSingleLineTextParser):
   def __init__(self, pre_obj, config):
     """A constructor for the pyparsing assistant."""
     super(PyparsingMultiLineTextParser, self).__init__(pre_obj, config)
-    self._buffer = ''
     self._buffer_size = self.BUFFER_SIZE
 
-  def _FillBuffer(self, filehandle):
-    """Fill the buffer."""
-    if len(self._buffer) > self._buffer_size:
-      return
+  def _FillBuffer(self, line_iterator, lines, buffer_size):
+    """Fills the buffer with lines up to the buffer size.
 
-    self._buffer += filehandle.read(self._buffer_size)
+    Args:
+      line_iterator: the iterator of the lines of the file.
+      lines: the buffer, a deque of tuples of the offset of the line and
+             the line.
+      buffer_size: the number of characters that are currently buffered.
 
-    # If a parser specifically indicates specific encoding we need
-    # to handle the buffer as it is an unicode string.
-    # If it fails we fail back to the original raw string.
-    if self.encoding:
-      try:
-        buffer_decoded = self._buffer.decode(self.encoding)
-        self._buffer = buffer_decoded
-      except UnicodeDecodeError:
-        pass
+    Returns:
+      The number of characters that are buffered.
+    """
+    while buffer_size <= self._buffer_size:
+      offset, line = next(line_iterator, (None, None))
+      if line is None:
+        break
+
+      lines.append((offset, line))
+      buffer_size += len(line)
 
-  def _NextLine(self, filehandle):
-    """Move to the next newline in the buffer."""
-    throw, _, self._buffer = self._buffer.partition('\n')
-    if throw.startswith('\r'):
-      throw = throw[1:]
-      self._current_offset += 1
+    return buffer_size
 
-    self._current_offset += 1 + len(throw)
-    self._FillBuffer(filehandle)
-    return throw
+  def _GetBufferData(self, lines):
+    """Retrieves the buffered lines as a single string.
+
+    Args:
+      lines: the buffer, a deque of tuples of the offset of the line and
+             the line.
+
+    Returns:
+      The buffered lines joined into a single string.
+    """
+    # Without an encoding the lines are not decoded.
+    if not self.encoding:
+      return ''.join(line for _, line in lines)
+
+    try:
+      return u''.join(line for _, line in lines)
+    except UnicodeDecodeError:
+      # A line that could not be decoded is kept as a byte string in the
+      # buffer. Its bytes are mapped one to one onto characters, so that
+      # the length of the line in the buffered data matches the length
+      # of the line that is consumed.
+      return u''.join(
+          line.decode('latin-1') if isinstance(line, str) else line
+          for _, line in lines)
+
+  def _GetLineSize(self, line):
+    """Retrieves the number of bytes of (part of) a line in the file.
+
+    Args:
+      line: the line.
+
+    Returns:
+      The number of bytes.
+    """
+    if isinstance(line, unicode) and self.encoding:
+      return len(line.encode(self.encoding))
+    return len(line)
+
+  def VerifyTextProbe(self, text_probe):
+    """Verifies the start of a file against the text probe.
+
+    Args:
+      text_probe: the text probe (instance of TextProbe).
+
+    Returns:
+      False if the parser is unable to parse the file, True otherwise.
+    """
+    if not self.LINE_STRUCTURES:
+      return False
+
+    # The structure is verified against the same buffered lines as Parse
+    # verifies it against.
+    line_reader = TextLineReader(
+        text_probe.GetFileObject(), encoding=self.encoding, quiet=True)
+
+    lines = collections.deque()
+    self._FillBuffer(iter(line_reader), lines, 0)
+
+    if not text_probe.IsSufficient(line_reader.offset):
+      return True
+
+    buffer_data = self._GetBufferData(lines)
+    return bool(utils.IsText(buffer_data) and self.VerifyStructure(buffer_data))
 
   def Parse(self, file_entry):
-    """Parse a text file using a pyparsing definition."""
+    """Parse a text file using a pyparsing definition.
+
+    The offset of an event is the byte offset in the file of the start of
+    the record it was parsed from.
+
+    Args:
+      file_entry: A file entry object.
+
+    Yields:
+      An event object (EventObject) that contains the parsed
+      attributes.
+    """
     self.file_entry = file_entry
 
     file_object = file_entry.GetFileObject()
@@ -861,22 +1317,22 @@ class PyparsingMultiLineTextParser(PyparsingSingleLineTextParser):
       raise errors.UnableToParseFile(
           u'Line structure undeclared, unable to proceed.')
 
-    file_object.seek(0, os.SEEK_SET)
+    line_iterator = iter(TextLineReader(file_object, encoding=self.encoding))
 
-    self._buffer = ''
-    self._FillBuffer(file_object)
+    # The buffer contains the lines, of which the first line can be partially
+    # consumed, that are matched against the line structures.
+    lines = collections.deque()
+    buffer_size = self._FillBuffer(line_iterator, lines, 0)
+    buffer_data = self._GetBufferData(lines)
 
-    if not utils.IsText(self._buffer):
+    if not utils.IsText(buffer_data):
       raise errors.UnableToParseFile(u'Not a text file, unable to proceed.')
 
-    if not self.VerifyStructure(self._buffer):
+    if not self.VerifyStructure(buffer_data):
       raise errors.UnableToParseFile('Wrong file structure.')
 
-    # Set the offset to the beginning of the file.
-    self._current_offset = 0
-
     # Read every line in the text file.
-    while self._buffer:
+    while lines:
       # Initialize pyparsing objects.
       tokens = None
       start = 0
@@ -888,7 +1344,7 @@ class PyparsingMultiLineTextParser(PyparsingSingleLineTextParser):
       for key, structure in self.LINE_STRUCTURES:
         try:
           parsed_structure = next(
-              structure.scanString(self._buffer, maxMatches=1), None)
+              structure.scanString(buffer_data, maxMatches=1), None)
         except pyparsing.ParseException:
           continue
         if not parsed_structure:
@@ -903,17 +1359,30 @@ class PyparsingMultiLineTextParser(PyparsingSingleLineTextParser):
           break
 
       if tokens and not start:
+        offset, _ = lines[0]
         parsed_event = self.ParseRecord(structure_key, tokens)
         if parsed_event:
-          parsed_event.offset = self._current_offset
+          parsed_event.offset = offset
           yield parsed_event
-        self._current_offset += end
-        self._buffer = self._buffer[end:]
+
+        # Remove the lines that were consumed by the structure.
+        while lines and end >= len(lines[0][1]):
+          _, line = lines.popleft()
+          end -= len(line)
+          buffer_size -= len(line)
+
+        if lines and end:
+          offset, line = lines[0]
+          lines[0] = (offset + self._GetLineSize(line[:end]), line[end:])
+          buffer_size -= end
+
       else:
-        old_line = self._NextLine(file_object)
-        if old_line:
+        _, old_line = lines.popleft()
+        buffer_size -= len(old_line)
+        if old_line.strip():
           logging.warning(u'Unable to parse log line: {}'.format(
-              repr(old_line)))
+              repr(old_line.rstrip())))
 
       # Re-fill the buffer.
-      self._FillBuffer(file_object)
+      buffer_size = self._FillBuffer(line_iterator, lines, buffer_size)
+      buffer_data = self._GetBufferData(lines)
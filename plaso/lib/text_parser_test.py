@@ -18,6 +18,7 @@
 """This file contains the tests for the generic text parser."""
 
 import os
+import StringIO
 import unittest
 
 from dfvfs.lib import definitions
@@ -82,6 +83,80 @@ class TestTextParser(text_parser.SlowLexicalTextParser):
     return event_object
 
 
+class TestPyparsingTextParser(text_parser.PyparsingSingleLineTextParser):
+  """Implement a single line text parser object for testing."""
+
+  NAME = 'test_pyparsing_text'
+
+  LINE_STRUCTURES = [(
+      'line', text_parser.PyparsingConstants.DATE + pyparsing.restOfLine)]
+
+  def ParseRecord(self, unused_key, unused_structure):
+    return
+
+  def VerifyStructure(self, line):
+    try:
+      self.LINE_STRUCTURES[0][1].parseString(line)
+    except pyparsing.ParseException:
+      return False
+    return True
+
+
+class TestPyparsingMultiLineTextParser(
+    text_parser.PyparsingMultiLineTextParser):
+  """Implement a multi line text parser object for testing."""
+
+  NAME = 'test_pyparsing_multi_line_text'
+
+  LINE_STRUCTURES = TestPyparsingTextParser.LINE_STRUCTURES
+
+  def ParseRecord(self, unused_key, unused_structure):
+    return
+
+  def VerifyStructure(self, unused_lines):
+    return True
+
+
+class TestOffsetPyparsingTextParser(TestPyparsingTextParser):
+  """Implement a single line text parser object that produces events."""
+
+  NAME = 'test_offset_pyparsing_text'
+
+  ENCODING = 'utf-8'
+
+  def ParseRecord(self, unused_key, unused_structure):
+    return event.EventObject()
+
+
+class TestOffsetPyparsingMultiLineTextParser(
+    TestPyparsingMultiLineTextParser):
+  """Implement a multi line text parser object that produces events."""
+
+  NAME = 'test_offset_pyparsing_multi_line_text'
+
+  ENCODING = 'utf-8'
+
+  def ParseRecord(self, unused_key, unused_structure):
+    return event.EventObject()
+
+
+class TestFileEntry(object):
+  """A file entry of which the file object contains data in memory."""
+
+  def __init__(self, data):
+    """Initializes the file entry.
+
+    Args:
+      data: the data of the file.
+    """
+    super(TestFileEntry, self).__init__()
+    self._data = data
+
+  def GetFileObject(self):
+    """Retrieves the file-like object of the data."""
+    return StringIO.StringIO(self._data)
+
+
 class BaseParserTest(unittest.TestCase):
   """An unit test for the plaso parser library."""
 
@@ -159,6 +234,180 @@ class TextParserTest(unittest.TestCase):
     self.assertEquals(second_entry.username, 'myuser')
 
 
+class TextProbeTest(unittest.TestCase):
+  """Tests for the text probe object."""
+
+  def testGetData(self):
+    """Tests the GetData function."""
+    text_probe = text_parser.TextProbe(StringIO.StringIO('1234567890'))
+    self.assertTrue(text_probe.is_complete)
+    self.assertEquals(text_probe.GetData(4), '1234')
+    self.assertEquals(text_probe.GetData(64), '1234567890')
+
+    data = 'A' * (text_parser.TextProbe.DATA_SIZE + 1)
+    text_probe = text_parser.TextProbe(StringIO.StringIO(data))
+    self.assertFalse(text_probe.is_complete)
+    self.assertEquals(text_probe.GetData(4), 'AAAA')
+    self.assertIsNone(text_probe.GetData(text_parser.TextProbe.DATA_SIZE + 1))
+
+  def testIsText(self):
+    """Tests the IsText function."""
+    text_probe = text_parser.TextProbe(StringIO.StringIO('this is text'))
+    self.assertTrue(text_probe.IsText(40))
+
+    text_probe = text_parser.TextProbe(StringIO.StringIO('\x00\x01\xff\xfe'))
+    self.assertFalse(text_probe.IsText(40))
+
+  def testVerifyTextProbe(self):
+    """Tests the VerifyTextProbe function of the text parsers."""
+    pre_obj = event.PreprocessObject()
+    lexical_parser = TestTextParser(pre_obj, None)
+    pyparsing_parser = TestPyparsingTextParser(pre_obj, None)
+
+    text_probe = text_parser.TextProbe(StringIO.StringIO(
+        '2013-09-06 first line.\n2013-09-07 second line.\n'))
+    self.assertTrue(lexical_parser.VerifyTextProbe(text_probe))
+    self.assertTrue(pyparsing_parser.VerifyTextProbe(text_probe))
+
+    text_probe = text_parser.TextProbe(StringIO.StringIO(
+        'first line without a date.\n'))
+    self.assertTrue(lexical_parser.VerifyTextProbe(text_probe))
+    self.assertFalse(pyparsing_parser.VerifyTextProbe(text_probe))
+
+    text_probe = text_parser.TextProbe(StringIO.StringIO('\x00\x01\xff\xfe'))
+    self.assertFalse(lexical_parser.VerifyTextProbe(text_probe))
+    self.assertFalse(pyparsing_parser.VerifyTextProbe(text_probe))
+
+    # The first line is read up to the maximum line length, as Parse does.
+    data = '2013-09-06 {0:s}'.format('B' * text_parser.TextProbe.DATA_SIZE)
+    text_probe = text_parser.TextProbe(StringIO.StringIO(data))
+    self.assertTrue(pyparsing_parser.VerifyTextProbe(text_probe))
+
+    data = 'no date\n{0:s}'.format('B' * text_parser.TextProbe.DATA_SIZE)
+    text_probe = text_parser.TextProbe(StringIO.StringIO(data))
+    self.assertFalse(pyparsing_parser.VerifyTextProbe(text_probe))
+
+
+class TextLineReaderTest(unittest.TestCase):
+  """Tests for the text line reader object."""
+
+  def testIterate(self):
+    """Tests iterating over the lines."""
+    line_reader = text_parser.TextLineReader(StringIO.StringIO(
+        'first line\r\n\nthird line\nlast line'))
+
+    self.assertEquals(list(line_reader), [
+        (0, 'first line\r\n'), (12, '\n'), (13, 'third line\n'),
+        (24, 'last line')])
+    self.assertEquals(line_reader.offset, 33)
+
+  def testIterateBlocks(self):
+    """Tests iterating over lines that span multiple blocks."""
+    line_reader = text_parser.TextLineReader(StringIO.StringIO(
+        'first line\nsecond line\nthird line\n'))
+    line_reader.BLOCK_SIZE = 4
+
+    self.assertEquals(list(line_reader), [
+        (0, 'first line\n'), (11, 'second line\n'), (23, 'third line\n')])
+
+  def testIterateEncoded(self):
+    """Tests iterating over encoded lines."""
+    line_reader = text_parser.TextLineReader(StringIO.StringIO(
+        'caf\xc3\xa9\nna\xefve\nend\n'), encoding='utf-8', quiet=True)
+
+    # The offsets are byte offsets and the line that cannot be decoded
+    # is not decoded.
+    self.assertEquals(list(line_reader), [
+        (0, u'caf\xe9\n'), (6, 'na\xefve\n'), (12, u'end\n')])
+
+  def testReadLine(self):
+    """Tests the ReadLine function."""
+    line_reader = text_parser.TextLineReader(StringIO.StringIO(
+        '{0:s}\nsecond line\n'.format('A' * 100)))
+
+    self.assertEquals(line_reader.ReadLine(40), (0, 'A' * 40))
+    self.assertEquals(line_reader.offset, 40)
+    self.assertEquals(line_reader.ReadLine(), (40, '{0:s}\n'.format('A' * 60)))
+    self.assertEquals(line_reader.ReadLine(), (101, 'second line\n'))
+    self.assertEquals(line_reader.ReadLine(), (None, None))
+
+    # A line without end of line characters is read no further than
+    # its maximum length.
+    line_reader = text_parser.TextLineReader(StringIO.StringIO('A' * 100))
+    line_reader.BLOCK_SIZE = 8
+
+    self.assertEquals(line_reader.ReadLine(10), (0, 'A' * 10))
+    self.assertEquals(line_reader.offset, 10)
+
+
+class PyparsingSingleLineTextParserTest(unittest.TestCase):
+  """Tests for the single line text parser object."""
+
+  def testParseOffsets(self):
+    """Tests that the offsets of the events are byte offsets."""
+    test_parser = TestOffsetPyparsingTextParser(event.PreprocessObject(), None)
+    file_entry = TestFileEntry(
+        '\n2013-09-06 caf\xc3\xa9\n\n2013-09-07 second line\n')
+
+    offsets = [
+        event_object.offset for event_object in test_parser.Parse(file_entry)]
+    self.assertEquals(offsets, [1, 19])
+
+
+class PyparsingMultiLineTextParserTest(unittest.TestCase):
+  """Tests for the multi line text parser object."""
+
+  def testParseOffsets(self):
+    """Tests that the offsets of the events are byte offsets."""
+    test_parser = TestOffsetPyparsingMultiLineTextParser(
+        event.PreprocessObject(), None)
+    file_entry = TestFileEntry(
+        '2013-09-06 caf\xc3\xa9\n2013-09-07 second line\n')
+
+    offsets = [
+        event_object.offset for event_object in test_parser.Parse(file_entry)]
+    self.assertEquals(offsets, [0, 17])
+
+  def testVerifyTextProbe(self):
+    """Tests the VerifyTextProbe function."""
+    test_parser = TestOffsetPyparsingMultiLineTextParser(
+        event.PreprocessObject(), None)
+
+    text_probe = text_parser.TextProbe(StringIO.StringIO(
+        '2013-09-06 caf\xc3\xa9\n2013-09-07 second line\n'))
+    self.assertTrue(test_parser.VerifyTextProbe(text_probe))
+
+    # Without an encoding the data is checked as bytes.
+    test_parser = TestPyparsingMultiLineTextParser(
+        event.PreprocessObject(), None)
+    text_probe = text_parser.TextProbe(StringIO.StringIO('\x00\x01\xff\xfe'))
+    self.assertFalse(test_parser.VerifyTextProbe(text_probe))
+
+    # A line that exceeds the probe cannot be verified.
+    data = 'A' * (text_parser.TextProbe.DATA_SIZE + 1)
+    text_probe = text_parser.TextProbe(StringIO.StringIO(data))
+    self.assertTrue(test_parser.VerifyTextProbe(text_probe))
+
+  def testGetBufferData(self):
+    """Tests the _GetBufferData function."""
+    test_parser = TestPyparsingMultiLineTextParser(
+        event.PreprocessObject(), None)
+    lines = [(0, 'caf\xc3\xa9\n'), (6, 'na\xefve\n')]
+
+    # pylint: disable=protected-access
+    buffer_data = test_parser._GetBufferData(lines)
+    self.assertEquals(buffer_data, 'caf\xc3\xa9\nna\xefve\n')
+
+    test_parser.encoding = 'utf-8'
+    lines = [(0, u'caf\xe9\n'), (6, 'na\xefve\n'), (12, u'end\n')]
+
+    # The line that cannot be decoded keeps its length.
+    buffer_data = test_parser._GetBufferData(lines)
+    self.assertEquals(buffer_data, u'caf\xe9\nna\xefve\nend\n')
+    self.assertEquals(
+        len(buffer_data), sum(len(line) for _, line in lines))
+
+
 class PyParserTest(unittest.TestCase):
   """Few unit tests for the pyparsing unit."""
 
@@ -32,6 +32,8 @@ class Dynamic(output.FileLogOutputFormatter):
 
   FORMAT_ATTRIBUTE_RE = re.compile('{([^}]+)}')
 
+  SUPPORTS_PARALLEL_FORMATTING = True
+
   # A dict containing mappings between "special" attributes and
   # how they should be calculated and presented.
   # They should be documented here:
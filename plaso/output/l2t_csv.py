@@ -36,6 +36,8 @@ class L2tcsv(output.FileLogOutputFormatter):
 
   FORMAT_ATTRIBUTE_RE = re.compile('{([^}]+)}')
 
+  SUPPORTS_PARALLEL_FORMATTING = True
+
   def Start(self):
     """Returns a header for the output."""
     # Build a hostname and username dict objects.
@@ -44,6 +44,8 @@ class L2ttln(output.FileLogOutputFormatter):
 
   DELIMITER = u'|'
 
+  SUPPORTS_PARALLEL_FORMATTING = True
+
   def Start(self):
     """Returns a header for the output."""
     # Build a hostname and username dict objects.
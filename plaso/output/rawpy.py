@@ -24,6 +24,8 @@ class Rawpy(output.FileLogOutputFormatter):
   # something more closely similar to what it is doing now, as in
   # "native" or something else.
 
+  SUPPORTS_PARALLEL_FORMATTING = True
+
   def EventBody(self, event_object):
     """Prints out to a filehandle string representation of an EventObject.
 
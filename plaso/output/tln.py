@@ -41,6 +41,8 @@ class Tln(output.FileLogOutputFormatter):
 
   DELIMITER = u'|'
 
+  SUPPORTS_PARALLEL_FORMATTING = True
+
   def Start(self):
     """Returns a header for the output."""
     # Build a hostname and username dict objects.
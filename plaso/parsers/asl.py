@@ -21,6 +21,7 @@ import construct
 import logging
 import os
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -198,6 +199,13 @@ class AslParser(parser.BaseParser):
     super(AslParser, self).__init__(pre_obj, config)
     self._asl_record_struct_size = self.ASL_RECORD_STRUCT.sizeof()
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('asl')
+    format_specification.AddNewSignature(cls.ASL_MAGIC, offset=0, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extract entries from an ASL file.
 
@@ -25,6 +25,7 @@ import construct
 from dfvfs.resolver import resolver as path_spec_resolver
 from dfvfs.path import factory as path_spec_factory
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -326,6 +327,14 @@ class ChromeCacheParser(parser.BaseParser):
 
   _EMPTY_CACHE_ADDRESS = CacheAddress(0x00000000)
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('chrome_cache_index')
+    format_specification.AddNewSignature(
+        '\xc3\xca\x03\xc1', offset=0, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extract event objects from Chrome Cache files.
 
@@ -21,6 +21,7 @@ import logging
 
 import pyesedb
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import parser
 from plaso.lib import plugin
@@ -52,6 +53,14 @@ class EseDbParser(parser.BaseParser):
     self._plugins = plugin.GetRegisteredPlugins(
         interface.EseDbPlugin, self._pre_obj, parser_filter_string)
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('esedb')
+    format_specification.AddNewSignature(
+        '\xef\xcd\xab\x89', offset=4, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extracts data from an ESE database File.
 
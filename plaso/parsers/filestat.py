@@ -147,6 +147,9 @@ class FileStatParser(parser.BaseParser):
 
   NAME = 'filestat'
 
+  # The file system metadata is available regardless of the file format.
+  FORMAT_INDEPENDENT = True
+
   def Parse(self, file_entry):
     """Extract data from a file system stat entry.
 
@@ -34,6 +34,7 @@ import construct
 import logging
 import os
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -197,6 +198,14 @@ class KeychainParser(parser.BaseParser):
       u'imap': u'imap',
       u'http': u'http'}
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('keychain')
+    format_specification.AddNewSignature(
+        cls.KEYCHAIN_MAGIC_HEADER, offset=0, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extract data from a Keychain file.
 
@@ -19,6 +19,7 @@
 
 import logging
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -72,6 +73,14 @@ class MsiecfParser(parser.BaseParser):
 
   NAME = 'msiecf'
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('msiecf')
+    format_specification.AddNewSignature(
+        'Client UrlCache MMF Ver ', offset=0, is_bound=True)
+    return format_specification
+
   def _ParseUrl(self, pre_obj, msiecf_item, recovered=False):
     """Extract data from a MSIE Cache Files (MSIECF) URL item.
 
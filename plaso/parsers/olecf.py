@@ -21,6 +21,7 @@ import logging
 
 import pyolecf
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import parser
 from plaso.lib import plugin
@@ -55,6 +56,16 @@ class OleCfParser(parser.BaseParser):
     self._plugins = plugin.GetRegisteredPlugins(
         interface.OlecfPlugin, self._pre_obj, parser_filter_string)
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('olecf')
+    format_specification.AddNewSignature(
+        '\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', offset=0, is_bound=True)
+    format_specification.AddNewSignature(
+        '\x0e\x11\xfc\x0d\xd0\xcf\x11\x0e', offset=0, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extracts data from an OLE Compound File (OLECF).
 
@@ -22,6 +22,7 @@ import re
 import struct
 import zipfile
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -77,6 +78,28 @@ class OpenXMLParser(parser.BaseParser):
   _FILES_REQUIRED = frozenset([
       '[Content_Types].xml', '_rels/.rels', 'docProps/core.xml'])
 
+  # The names of the OXML package parts of which one is expected to be
+  # the first entry of the ZIP archive.
+  _FIRST_FILE_NAMES = frozenset([
+      '[Content_Types].xml', '_rels/.rels', 'docProps/core.xml'])
+
+  # The offset of the name of the first entry, which directly follows
+  # the local file header of the ZIP archive.
+  _FIRST_FILE_NAME_OFFSET = 30
+
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification.
+
+    A ZIP archive is only claimed when its first entry is an OXML package
+    part, so that other ZIP archives are not passed to the parser.
+    """
+    format_specification = specification.Specification('openxml')
+    for file_name in sorted(cls._FIRST_FILE_NAMES):
+      format_specification.AddNewSignature(
+          file_name, offset=cls._FIRST_FILE_NAME_OFFSET, is_bound=True)
+    return format_specification
+
   def _FixString(self, key):
     """Convert CamelCase to lower_with_underscore."""
     # TODO: Add unicode support.
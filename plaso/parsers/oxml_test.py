@@ -20,6 +20,7 @@
 import unittest
 
 # pylint: disable=unused-import
+from plaso.engine import signatures
 from plaso.formatters import oxml as oxml_formatter
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -93,6 +94,19 @@ class OXMLTest(test_lib.ParserTestCase):
 
     self._TestGetMessageStrings(event_object, expected_msg, expected_msg_short)
 
+  def testGetFormatSpecification(self):
+    """Tests that only OXML files match the format specification."""
+    registry = signatures.ParserSignatureRegistry([self._parser])
+
+    test_file = self._GetTestFilePath(['Document.docx'])
+    with open(test_file, 'rb') as file_object:
+      self.assertEquals(registry.GetFormatParsers(file_object), [self._parser])
+
+    # A ZIP archive that is not an OXML file is not claimed.
+    test_file = self._GetTestFilePath(['syslog.zip'])
+    with open(test_file, 'rb') as file_object:
+      self.assertEquals(registry.GetFormatParsers(file_object), [])
+
 
 if __name__ == '__main__':
   unittest.main()
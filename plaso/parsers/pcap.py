@@ -22,6 +22,7 @@ import dpkt
 import operator
 import socket
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -488,6 +489,20 @@ class PcapParser(parser.BaseParser):
 
   NAME = 'pcap'
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('pcap')
+    format_specification.AddNewSignature(
+        '\xa1\xb2\xc3\xd4', offset=0, is_bound=True)
+    format_specification.AddNewSignature(
+        '\xd4\xc3\xb2\xa1', offset=0, is_bound=True)
+    format_specification.AddNewSignature(
+        '\xa1\xb2\x3c\x4d', offset=0, is_bound=True)
+    format_specification.AddNewSignature(
+        '\x4d\x3c\xb2\xa1', offset=0, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extract data from a pcap file.
 
@@ -19,6 +19,7 @@
 
 import logging
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import parser
 from plaso.lib import plugin
@@ -53,6 +54,51 @@ class SQLiteParser(parser.BaseParser):
     self._plugins = plugin.GetRegisteredPlugins(
         interface.SQLitePlugin, self._pre_obj, parser_filter_string)
 
+    # The plugins are indexed by one of their required tables, so that
+    # only the plugins of the tables in a database need to be checked.
+    self._plugin_indexes = {}
+    self._plugins_by_table = {}
+    self._plugins_without_tables = []
+
+    for plugin_index, plugin_obj in enumerate(self._plugins.itervalues()):
+      self._plugin_indexes[plugin_obj.plugin_name] = plugin_index
+      if not plugin_obj.REQUIRED_TABLES:
+        self._plugins_without_tables.append(plugin_obj)
+        continue
+
+      table_name = min(plugin_obj.REQUIRED_TABLES)
+      self._plugins_by_table.setdefault(table_name, []).append(plugin_obj)
+
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('sqlite')
+    format_specification.AddNewSignature(
+        'SQLite format 3\x00', offset=0, is_bound=True)
+    return format_specification
+
+  def _GetPlugins(self, tables):
+    """Retrieves the plugins of which the required tables are present.
+
+    Args:
+      tables: a list of the names of the tables in the database.
+
+    Returns:
+      A list of plugin objects (instances of SQLitePlugin) in the order
+      of the registered plugins.
+    """
+    tables = frozenset(tables)
+
+    plugins = list(self._plugins_without_tables)
+    for table_name in tables:
+      for plugin_obj in self._plugins_by_table.get(table_name, []):
+        if plugin_obj.REQUIRED_TABLES <= tables:
+          plugins.append(plugin_obj)
+
+    return sorted(
+        plugins,
+        key=lambda plugin_obj: self._plugin_indexes[plugin_obj.plugin_name])
+
   def Parse(self, file_entry):
     """Parses an SQLite database.
 
@@ -74,9 +120,10 @@ class SQLiteParser(parser.BaseParser):
             u'Unable to parse SQLite database with error: {0:s}.'.format(
                 repr(exception)))
 
-      # Create a cache in which the resulting tables are cached.
+      # Create a cache in which the resulting tables are cached. The cache
+      # is scoped to the database and shared by the plugins that parse it.
       cache = interface.SQLiteCache()
-      for plugin_obj in self._plugins.itervalues():
+      for plugin_obj in self._GetPlugins(database.tables):
         try:
           for event_object in plugin_obj.Process(
               cache=cache, database=database):
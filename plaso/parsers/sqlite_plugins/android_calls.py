@@ -58,6 +58,9 @@ class AndroidCallPlugin(interface.SQLitePlugin):
   QUERIES = [((u'SELECT _id AS id, date, number, name, duration, type '
                u'FROM calls'), 'ParseCallsRow')]
 
+  # The required tables.
+  REQUIRED_TABLES = frozenset(['calls'])
+
   CALL_TYPE = {
       1: 'INCOMING',
       2: 'OUTGOING',
@@ -0,0 +1,358 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A read-only APSW virtual file system that reads from dfVFS file objects.
+
+The virtual file system allows SQLite to read the pages of a database
+straight from a dfVFS file object, hence the database does not need to be
+copied to a temporary file first. The connection is wrapped so that it
+can be used the same way as a sqlite3 connection by the SQLite plugins.
+"""
+
+import os
+import threading
+
+import apsw
+import sqlite3
+
+
+class DfvfsVFSFile(object):
+  """Class that implements a read-only APSW file backed by a file object."""
+
+  def __init__(self, file_object):
+    """Initializes the file.
+
+    Args:
+      file_object: the file-like object.
+    """
+    super(DfvfsVFSFile, self).__init__()
+    self._file_object = file_object
+    self._file_object.seek(0, os.SEEK_END)
+    self._size = self._file_object.tell()
+
+  def xCheckReservedLock(self):  # pylint: disable=invalid-name
+    """Determines if a reserved lock is held, which never is the case."""
+    return False
+
+  def xClose(self):  # pylint: disable=invalid-name
+    """Closes the file, the file object is owned by the caller."""
+    return
+
+  def xDeviceCharacteristics(self):  # pylint: disable=invalid-name
+    """Retrieves the device characteristics."""
+    return 0
+
+  def xFileControl(self, unused_operation, unused_pointer):  # pylint: disable=invalid-name
+    """Handles file control operations, which are not supported."""
+    return False
+
+  def xFileSize(self):  # pylint: disable=invalid-name
+    """Retrieves the size of the file."""
+    return self._size
+
+  def xLock(self, unused_level):  # pylint: disable=invalid-name
+    """Locks the file, which is not needed for a read-only file."""
+    return
+
+  def xRead(self, amount, offset):  # pylint: disable=invalid-name
+    """Reads data from the file.
+
+    Args:
+      amount: the number of bytes to read.
+      offset: the offset of the data.
+
+    Returns:
+      A byte string containing the data, which is smaller than amount
+      at the end of the file.
+    """
+    self._file_object.seek(offset, os.SEEK_SET)
+    return self._file_object.read(amount)
+
+  def xSectorSize(self):  # pylint: disable=invalid-name
+    """Retrieves the sector size, 0 represents the default size."""
+    return 0
+
+  def xSync(self, unused_flags):  # pylint: disable=invalid-name
+    """Synchronizes the file, which is not needed for a read-only file."""
+    return
+
+  def xTruncate(self, unused_size):  # pylint: disable=invalid-name
+    """Truncates the file, which is not supported."""
+    raise apsw.ReadOnlyError(u'Read-only file.')
+
+  def xUnlock(self, unused_level):  # pylint: disable=invalid-name
+    """Unlocks the file, which is not needed for a read-only file."""
+    return
+
+  def xWrite(self, unused_data, unused_offset):  # pylint: disable=invalid-name
+    """Writes data to the file, which is not supported."""
+    raise apsw.ReadOnlyError(u'Read-only file.')
+
+
+class DfvfsVFS(apsw.VFS):
+  """Class that implements a read-only APSW VFS of dfVFS file objects.
+
+  The file objects are registered under a unique name, which is then used
+  as the filename of the database. Other files, such as the rollback journal,
+  do not exist in the virtual file system. The methods that do not access
+  files, such as xRandomness, xSleep, xCurrentTime and xGetLastError, are
+  inherited from the default VFS.
+  """
+
+  NAME = u'plaso-dfvfs'
+
+  def __init__(self):
+    """Initializes the virtual file system."""
+    super(DfvfsVFS, self).__init__(self.NAME, base=None)
+    self._file_objects = {}
+    self._lock = threading.Lock()
+    self._sequence_number = 0
+
+  def _GetFilename(self, name):
+    """Retrieves the filename of the name passed by APSW.
+
+    Args:
+      name: the name, a string or an instance of apsw.URIFilename.
+
+    Returns:
+      A string containing the filename.
+    """
+    if isinstance(name, apsw.URIFilename):
+      return name.filename()
+    return name
+
+  def RegisterFileObject(self, file_object):
+    """Registers a file object.
+
+    Args:
+      file_object: the file-like object.
+
+    Returns:
+      A string containing the filename of the file object in the virtual
+      file system.
+    """
+    with self._lock:
+      self._sequence_number += 1
+      filename = u'/{0:s}/{1:d}'.format(self.NAME, self._sequence_number)
+      self._file_objects[filename] = file_object
+    return filename
+
+  def DeregisterFileObject(self, filename):
+    """Deregisters a file object.
+
+    Args:
+      filename: the filename of the file object in the virtual file system.
+    """
+    with self._lock:
+      self._file_objects.pop(filename, None)
+
+  def xAccess(self, pathname, unused_flags):  # pylint: disable=invalid-name
+    """Determines if a file exists in the virtual file system."""
+    return pathname in self._file_objects
+
+  def xDelete(self, unused_filename, unused_syncdir):  # pylint: disable=invalid-name
+    """Deletes a file, which is not supported."""
+    raise apsw.ReadOnlyError(u'Read-only virtual file system.')
+
+  def xFullPathname(self, name):  # pylint: disable=invalid-name
+    """Retrieves the full path of a file, which is the name itself."""
+    return name
+
+  def xOpen(self, name, flags):  # pylint: disable=invalid-name
+    """Opens a file.
+
+    Args:
+      name: the name of the file, a string, an instance of apsw.URIFilename
+            or None for a temporary file.
+      flags: a list containing the input and output open flags.
+
+    Returns:
+      The file (instance of DfvfsVFSFile).
+
+    Raises:
+      apsw.CantOpenError: if the file does not exist or is opened
+                          for writing.
+    """
+    filename = self._GetFilename(name)
+    file_object = self._file_objects.get(filename, None)
+    if file_object is None or not flags[0] & apsw.SQLITE_OPEN_READONLY:
+      raise apsw.CantOpenError(u'Unable to open: {0!s}.'.format(filename))
+
+    flags[1] = flags[0]
+    return DfvfsVFSFile(file_object)
+
+
+class Row(object):
+  """Class that implements a row that behaves like a sqlite3.Row."""
+
+  def __init__(self, column_names, values):
+    """Initializes the row.
+
+    Args:
+      column_names: a list of the column names.
+      values: a tuple of the values.
+    """
+    super(Row, self).__init__()
+    self._column_names = column_names
+    self._values = values
+
+  def __eq__(self, other):
+    """Determines if the row is equal to another row."""
+    return (
+        isinstance(other, Row) and self._column_names == other._column_names
+        and self._values == other._values)
+
+  def __getitem__(self, key):
+    """Retrieves a value by index or case insensitive column name."""
+    if isinstance(key, basestring):
+      key = key.lower()
+      for index, column_name in enumerate(self._column_names):
+        if column_name.lower() == key:
+          return self._values[index]
+      raise IndexError(u'No item with that key')
+
+    return self._values[key]
+
+  def __iter__(self):
+    """Iterates over the values."""
+    return iter(self._values)
+
+  def __len__(self):
+    """Retrieves the number of values."""
+    return len(self._values)
+
+  def __ne__(self, other):
+    """Determines if the row is not equal to another row."""
+    return not self == other
+
+  def keys(self):
+    """Retrieves the column names."""
+    return list(self._column_names)
+
+
+class Cursor(object):
+  """Class that implements a cursor that behaves like a sqlite3.Cursor.
+
+  APSW errors are raised as sqlite3.DatabaseError, which is what the SQLite
+  plugins handle.
+  """
+
+  def __init__(self, cursor):
+    """Initializes the cursor.
+
+    Args:
+      cursor: the APSW cursor (instance of apsw.Cursor).
+    """
+    super(Cursor, self).__init__()
+    self._column_names = []
+    self._cursor = cursor
+    self._iterator = iter([])
+
+  def __iter__(self):
+    """Iterates over the rows."""
+    return iter(self.fetchone, None)
+
+  def execute(self, query, parameters=None):
+    """Executes a query.
+
+    Args:
+      query: the SQL query.
+      parameters: optional parameters of the query. The default is None.
+
+    Returns:
+      The cursor (instance of Cursor).
+
+    Raises:
+      sqlite3.DatabaseError: if the query cannot be executed.
+    """
+    try:
+      self._iterator = self._cursor.execute(query, parameters)
+      # The description is not available once the query has completed,
+      # which is the case if there are no rows.
+      try:
+        description = self._cursor.getdescription()
+      except apsw.ExecutionCompleteError:
+        description = []
+    except apsw.Error as exception:
+      raise sqlite3.DatabaseError(u'{0!s}'.format(exception))
+
+    self._column_names = [column_name for column_name, _ in description]
+    return self
+
+  def fetchall(self):
+    """Retrieves the remaining rows."""
+    return list(self)
+
+  def fetchone(self):
+    """Retrieves the next row.
+
+    Returns:
+      The row (instance of Row) or None if there are no more rows.
+
+    Raises:
+      sqlite3.DatabaseError: if the row cannot be retrieved.
+    """
+    try:
+      values = next(self._iterator)
+    except StopIteration:
+      return
+    except apsw.Error as exception:
+      raise sqlite3.DatabaseError(u'{0!s}'.format(exception))
+
+    return Row(self._column_names, values)
+
+
+class Connection(object):
+  """Class that implements a read-only connection to a dfVFS file object.
+
+  The connection behaves like a sqlite3.Connection.
+  """
+
+  _vfs = None
+  _vfs_lock = threading.Lock()
+
+  def __init__(self, file_object):
+    """Initializes the connection.
+
+    Args:
+      file_object: the file-like object of the database.
+
+    Raises:
+      sqlite3.DatabaseError: if the database cannot be opened.
+    """
+    super(Connection, self).__init__()
+    with self._vfs_lock:
+      if Connection._vfs is None:
+        Connection._vfs = DfvfsVFS()
+
+    self._filename = self._vfs.RegisterFileObject(file_object)
+    try:
+      self._connection = apsw.Connection(
+          self._filename, flags=apsw.SQLITE_OPEN_READONLY,
+          vfs=DfvfsVFS.NAME)
+    except apsw.Error as exception:
+      self._vfs.DeregisterFileObject(self._filename)
+      raise sqlite3.DatabaseError(u'{0!s}'.format(exception))
+
+  def close(self):
+    """Closes the connection."""
+    self._connection.close()
+    self._vfs.DeregisterFileObject(self._filename)
+
+  def cursor(self):
+    """Retrieves a cursor (instance of Cursor)."""
+    return Cursor(self._connection.cursor())
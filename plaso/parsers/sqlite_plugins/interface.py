@@ -20,6 +20,9 @@
 import logging
 import os
 import tempfile
+import urllib
+
+from dfvfs.lib import definitions as dfvfs_definitions
 
 from plaso.lib import errors
 from plaso.lib import plugin
@@ -27,6 +30,11 @@ from plaso.lib import plugin
 import pytz
 import sqlite3
 
+try:
+  from plaso.parsers.sqlite_plugins import apsw_vfs
+except ImportError:
+  apsw_vfs = None
+
 
 class SQLiteCache(plugin.BasePluginCache):
   """A cache storing query results for SQLite plugins."""
@@ -176,13 +184,22 @@ class SQLitePlugin(plugin.BasePlugin):
 
 
 class SQLiteDatabase(object):
-  """A simple wrapper for opening up a SQLite database."""
+  """A simple wrapper for opening up a SQLite database.
+
+  The database is opened read-only where it is stored if it is a file on
+  the operating system, from the file object through a virtual file system
+  if APSW is available, or otherwise from a temporary copy.
+  """
 
   # Magic value for a SQLite database.
   MAGIC = 'SQLite format 3'
 
   _READ_BUFFER_SIZE = 65536
 
+  # Value to indicate the SQLite library supports URI filenames,
+  # which is determined the first time a database is opened.
+  _uri_filenames_supported = None
+
   def __init__(self, file_entry):
     """Initializes the database object.
 
@@ -212,16 +229,106 @@ class SQLiteDatabase(object):
 
     return self._database.cursor()
 
+  @classmethod
+  def _SupportsURIFilenames(cls):
+    """Determines if the SQLite library supports read-only URI filenames.
+
+    The immutable query parameter requires SQLite 3.8.0 or later. The sqlite3
+    module of Python 2 only supports URI filenames if the SQLite library
+    was built with URI filenames enabled.
+
+    Returns:
+      A boolean value indicating URI filenames are supported.
+    """
+    if cls._uri_filenames_supported is None:
+      cls._uri_filenames_supported = False
+      if sqlite3.sqlite_version_info >= (3, 8, 0):
+        database = sqlite3.connect(u':memory:')
+        try:
+          compile_options = [
+              row[0] for row in database.execute(u'PRAGMA compile_options')]
+        except sqlite3.DatabaseError:
+          compile_options = []
+        finally:
+          database.close()
+
+        cls._uri_filenames_supported = u'USE_URI' in compile_options
+
+    return cls._uri_filenames_supported
+
+  def _GetOperatingSystemPath(self):
+    """Retrieves the path of the database if it is an operating system file.
+
+    Returns:
+      A string containing the path or None if the database is not stored
+      in a file on the operating system.
+    """
+    path_spec = getattr(self._file_entry, 'path_spec', None)
+    if getattr(path_spec, 'type_indicator', None) != (
+        dfvfs_definitions.TYPE_INDICATOR_OS):
+      return
+
+    return getattr(path_spec, 'location', None)
+
+  def _CopyToTemporaryFile(self, file_object):
+    """Copies the database into a temporary file.
+
+    Args:
+      file_object: the file-like object of the database.
+
+    Returns:
+      A string containing the path of the temporary file.
+    """
+    file_object.seek(0, os.SEEK_SET)
+
+    # Note that the with statement closes the temporary file, which makes
+    # it available for sqlite3.connect().
+    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+      self._temp_file_name = temp_file.name
+      data = file_object.read(self._READ_BUFFER_SIZE)
+      while data:
+        temp_file.write(data)
+        data = file_object.read(self._READ_BUFFER_SIZE)
+
+    return self._temp_file_name
+
+  def _Connect(self, file_object):
+    """Connects to the database.
+
+    Args:
+      file_object: the file-like object of the database.
+
+    Returns:
+      The database connection (instance of sqlite3.Connection or
+      apsw_vfs.Connection).
+
+    Raises:
+      sqlite3.DatabaseError: if the database cannot be opened.
+    """
+    path = self._GetOperatingSystemPath()
+    if path and self._SupportsURIFilenames():
+      # The immutable query parameter prevents SQLite from locking or
+      # changing the file, e.g. to roll back a hot journal.
+      path = os.path.abspath(path)
+      if isinstance(path, unicode):
+        path = path.encode('utf-8')
+
+      database = sqlite3.connect('file:{0:s}?mode=ro&immutable=1'.format(
+          urllib.pathname2url(path)))
+      database.row_factory = sqlite3.Row
+      return database
+
+    if apsw_vfs:
+      return apsw_vfs.Connection(file_object)
+
+    database = sqlite3.connect(self._CopyToTemporaryFile(file_object))
+    database.row_factory = sqlite3.Row
+    return database
+
   def Open(self):
     """Opens up a database connection and build a list of table names."""
     file_object = self._file_entry.GetFileObject()
 
-    # TODO: Remove this when the classifier gets implemented
-    # and used. As of now, there is no check made against the file
-    # to verify it's signature, thus all files are sent here, meaning
-    # that this method assumes everything is a SQLite file and starts
-    # copying the content of the file into memory, which is not good
-    # for very large files.
     file_object.seek(0, os.SEEK_SET)
 
     data = file_object.read(len(self.MAGIC))
@@ -232,31 +339,8 @@ class SQLiteDatabase(object):
           u'File {} not a SQLite database. (invalid signature)'.format(
               self._file_entry.name))
 
-    # TODO: Current design copies the entire file into a buffer
-    # that is parsed by each SQLite parser. This is not very efficient,
-    # especially when many SQLite parsers are ran against a relatively
-    # large SQLite database. This temporary file that is created should
-    # be usable by all SQLite parsers so the file should only be read
-    # once in memory and then deleted when all SQLite parsers have completed.
-
-    # TODO: Change this into a proper implementation using APSW
-    # and virtual filesystems when that will be available.
-    # Info: http://apidoc.apsw.googlecode.com/hg/vfs.html#vfs and
-    # http://apidoc.apsw.googlecode.com/hg/example.html#example-vfs
-    # Until then, just copy the file into a tempfile and parse it.
-
-    # Note that data is filled here with the file header data and
-    # that with will explicityly close the temporary files and thus
-    # making sure it is available for sqlite3.connect().
-    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-      self._temp_file_name = temp_file.name
-      while data:
-        temp_file.write(data)
-        data = file_object.read(self._READ_BUFFER_SIZE)
-
-    self._database = sqlite3.connect(self._temp_file_name)
     try:
-      self._database.row_factory = sqlite3.Row
+      self._database = self._Connect(file_object)
       self._cursor = self._database.cursor()
     except sqlite3.DatabaseError as exception:
       logging.debug(
@@ -288,13 +372,14 @@ class SQLiteDatabase(object):
 
     self._database.close()
 
-    try:
-      os.remove(self._temp_file_name)
-    except (OSError, IOError) as exception:
-      logging.warning((
-          u'Unable to remove temporary copy: {0:s} of SQLite database: {1:s} '
-          u'with error: {2:s}').format(
-              self._temp_file_name, self._file_entry.name, exception))
+    if self._temp_file_name:
+      try:
+        os.remove(self._temp_file_name)
+      except (OSError, IOError) as exception:
+        logging.warning((
+            u'Unable to remove temporary copy: {0:s} of SQLite database: '
+            u'{1:s} with error: {2:s}').format(
+                self._temp_file_name, self._file_entry.name, exception))
 
     self._tables = []
     self._database = None
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2012 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the SQLite database wrapper."""
+
+import unittest
+
+from dfvfs.lib import definitions
+from dfvfs.path import factory as path_spec_factory
+from dfvfs.resolver import resolver as path_spec_resolver
+
+from plaso.parsers.sqlite_plugins import interface
+from plaso.parsers.sqlite_plugins import test_lib
+
+
+class SQLiteDatabaseTest(test_lib.SQLitePluginTestCase):
+  """Tests for the SQLite database wrapper."""
+
+  def _OpenFileEntry(self, path):
+    """Opens the file entry of an operating system file.
+
+    Args:
+      path: the path of the file.
+
+    Returns:
+      The file entry (instance of dfvfs.FileEntry).
+    """
+    path_spec = path_spec_factory.Factory.NewPathSpec(
+        definitions.TYPE_INDICATOR_OS, location=path)
+    return path_spec_resolver.Resolver.OpenFileEntry(path_spec)
+
+  def testOpen(self):
+    """Tests the Open function."""
+    file_entry = self._OpenFileEntry(self._GetTestFilePath(['History']))
+
+    with interface.SQLiteDatabase(file_entry) as database:
+      database.Open()
+      self.assertIn(u'urls', database.tables)
+
+      # An operating system file is not copied if the SQLite library supports
+      # URI filenames.
+      if interface.SQLiteDatabase._SupportsURIFilenames():  # pylint: disable=protected-access
+        self.assertEquals(database._temp_file_name, '')  # pylint: disable=protected-access
+
+      row = database.cursor.execute(
+          u'SELECT id, url FROM urls ORDER BY id').fetchone()
+      self.assertEquals(row['url'], u'http://start.ubuntu.com/10.04/Google/')
+
+    file_entry = self._OpenFileEntry(self._GetTestFilePath(['syslog']))
+    database = interface.SQLiteDatabase(file_entry)
+    with self.assertRaises(IOError):
+      database.Open()
+
+  @unittest.skipIf(interface.apsw_vfs is None, u'APSW not available')
+  def testOpenVirtualFileSystem(self):
+    """Tests the Open function with the APSW virtual file system."""
+    file_entry = self._OpenFileEntry(self._GetTestFilePath(['History']))
+
+    # pylint: disable=protected-access
+    uri_filenames_supported = interface.SQLiteDatabase._uri_filenames_supported
+    interface.SQLiteDatabase._uri_filenames_supported = False
+
+    try:
+      with interface.SQLiteDatabase(file_entry) as database:
+        database.Open()
+
+        # The database is read from the file object and not copied.
+        self.assertIsInstance(
+            database._database, interface.apsw_vfs.Connection)
+        self.assertEquals(database._temp_file_name, '')
+        self.assertIn(u'urls', database.tables)
+
+        row = database.cursor.execute(
+            u'SELECT id, url FROM urls ORDER BY id').fetchone()
+        self.assertEquals(row['url'], u'http://start.ubuntu.com/10.04/Google/')
+
+    finally:
+      interface.SQLiteDatabase._uri_filenames_supported = (
+          uri_filenames_supported)
+
+
+if __name__ == '__main__':
+  unittest.main()
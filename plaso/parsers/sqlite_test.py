@@ -68,6 +68,22 @@ class SQLiteParserTest(unittest.TestCase):
     # This should result in all plugins EXCEPT the skype one.
     self.assertEquals(len(plugins), len(all_plugins) - 1)
 
+  def testGetPlugins(self):
+    """Tests the _GetPlugins function."""
+    # pylint: disable=protected-access
+    self._parser = sqlite.SQLiteParser(self._pre_obj, self._config)
+
+    plugins = self._parser._GetPlugins([
+        u'cookies', u'keyword_search_terms', u'meta', u'urls', u'visits',
+        u'visit_source', u'unrelated'])
+    plugin_names = [plugin_obj.plugin_name for plugin_obj in plugins]
+    self.assertEquals(
+        sorted(plugin_names), [u'chrome_cookies', u'chrome_history'])
+
+    # A plugin is not returned if one of its required tables is missing.
+    plugins = self._parser._GetPlugins([u'meta', u'urls', u'visits'])
+    self.assertEquals(plugins, [])
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -19,6 +19,7 @@
 
 import logging
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -86,6 +87,13 @@ class WinEvtParser(parser.BaseParser):
     super(WinEvtParser, self).__init__(pre_obj, config)
     self._codepage = getattr(self._pre_obj, 'codepage', 'cp1252')
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('evt')
+    format_specification.AddNewSignature('LfLe', offset=4, is_bound=True)
+    return format_specification
+
   def _ParseRecord(self, evt_record, recovered=False):
     """Extract data from a Windows EventLog (EVT) record.
 
@@ -19,6 +19,7 @@
 
 import logging
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -93,6 +94,13 @@ class WinEvtxParser(parser.BaseParser):
     super(WinEvtxParser, self).__init__(pre_obj, config)
     self._codepage = getattr(self._pre_obj, 'codepage', 'cp1252')
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('evtx')
+    format_specification.AddNewSignature('ElfFile\x00', offset=0, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extract data from a Windows XML EventLog (EVTX) file.
 
@@ -17,6 +17,7 @@
 # limitations under the License.
 """Parser for Windows Shortcut (LNK) files."""
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import event
 from plaso.lib import eventdata
@@ -76,6 +77,16 @@ class WinLnkParser(parser.BaseParser):
     super(WinLnkParser, self).__init__(pre_obj, config)
     self._codepage = getattr(self._pre_obj, 'codepage', 'cp1252')
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('lnk')
+    format_specification.AddNewSignature(
+        '\x4c\x00\x00\x00\x01\x14\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00'
+        '\x00\x00\x00\x46',
+        offset=0, is_bound=True)
+    return format_specification
+
   def Parse(self, file_entry):
     """Extract data from a Windows Shortcut (LNK) file.
 
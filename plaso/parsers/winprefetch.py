@@ -21,6 +21,7 @@ import os
 
 import construct
 
+from plaso.classifier import specification
 from plaso.lib import binary
 from plaso.lib import errors
 from plaso.lib import event
@@ -156,6 +157,14 @@ class WinPrefetchParser(parser.BaseParser):
       construct.ULInt32('number_of_directory_strings'),
       construct.Padding(68))
 
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('prefetch')
+    format_specification.AddNewSignature(
+        cls.FILE_SIGNATURE, offset=4, is_bound=True)
+    return format_specification
+
   def _ParseFileHeader(self, file_object):
     """Parses the file header.
 
@@ -19,14 +19,15 @@
 
 import logging
 import os
+import time
 
+from plaso.classifier import specification
 from plaso.lib import errors
 from plaso.lib import parser
 # pylint: disable=unused-import
 from plaso.parsers import winreg_plugins
 from plaso.parsers.winreg_plugins import interface
 from plaso.winreg import cache
-from plaso.winreg import winregistry
 
 
 class WinRegistryParser(parser.BaseParser):
@@ -57,18 +58,56 @@ class WinRegistryParser(parser.BaseParser):
     parser_filter_string = getattr(self._config, 'parsers', None)
     self._plugins = interface.GetRegistryPlugins(parser_filter_string)
 
-  def _RecurseKey(self, key):
-    """A generator that takes a key and yields every subkey of it."""
+  @classmethod
+  def GetFormatSpecification(cls):
+    """Retrieves the format specification."""
+    format_specification = specification.Specification('regf')
+    format_specification.AddNewSignature('regf', offset=0, is_bound=True)
+    return format_specification
+
+  def _GetKeys(self, root_key):
+    """Retrieves a key and all its subkeys.
+
+    The keys are walked iteratively, depth first, to prevent a chain of
+    recursive generators on deeply nested keys.
+
+    Args:
+      root_key: the root key (instance of WinRegKey).
+
+    Yields:
+      The key and its subkeys (instances of WinRegKey).
+    """
     # In the case of a Registry file not having a root key we will not be able
     # to traverse the Registry, in which case we need to return here.
-    if not key:
+    if not root_key:
       return
 
-    yield key
+    yield root_key
+
+    subkey_iterators = [iter(root_key.GetSubkeys())]
+    while subkey_iterators:
+      subkey = next(subkey_iterators[-1], None)
+      if subkey is None:
+        subkey_iterators.pop()
+        continue
 
-    for subkey in key.GetSubkeys():
-      for recursed_key in self._RecurseKey(subkey):
-        yield recursed_key
+      yield subkey
+      subkey_iterators.append(iter(subkey.GetSubkeys()))
+
+  def _GetKeysByPath(self, winreg_file, key_paths):
+    """Retrieves specific keys.
+
+    Args:
+      winreg_file: the Windows Registry file (instance of WinRegFile).
+      key_paths: a list of the paths of the keys.
+
+    Yields:
+      The keys that exist in the file (instances of WinRegKey).
+    """
+    for key_path in key_paths:
+      key = winreg_file.GetKeyByPath(key_path)
+      if key:
+        yield key
 
   def GetEvents(self, call_back, key):
     """Return all events generated by a Windows Registry plugin."""
@@ -104,75 +143,90 @@ class WinRegistryParser(parser.BaseParser):
           u'[{0:s}] unable to parse file: {1:s} with error: invalid '
           u'signature.').format(self.parser_name, file_entry.name))
 
-    registry = winregistry.WinRegistry(
-        winregistry.WinRegistry.BACKEND_PYREGF)
-
     # Determine type, find all parsers
     try:
-      winreg_file = registry.OpenFile(file_entry, codepage=self._codepage)
+      winreg_file = cache.FILE_CACHE.OpenFile(
+          file_entry, codepage=self._codepage)
     except IOError as exception:
       raise errors.UnableToParseFile(
           u'[{0:s}] unable to parse file: {1:s} with error: {2:s}'.format(
               self.parser_name, file_entry.name, exception))
 
-    # Detect the Windows Registry file type.
-    registry_type = 'UNKNOWN'
-    for reg_type in self.REG_TYPES:
-      if reg_type == 'UNKNOWN':
-        continue
+    # The Windows Registry file is shared with the preprocess plugins and
+    # must be released when it is no longer used.
+    try:
+      # Detect the Windows Registry file type.
+      registry_type = 'UNKNOWN'
+      for reg_type in self.REG_TYPES:
+        if reg_type == 'UNKNOWN':
+          continue
+
+        # Check if all the known keys for a certain Registry file exist.
+        known_keys_found = True
+        for known_key_path in self.REG_TYPES[reg_type]:
+          if not winreg_file.GetKeyByPath(known_key_path):
+            known_keys_found = False
+            break
 
-      # Check if all the known keys for a certain Registry file exist.
-      known_keys_found = True
-      for known_key_path in self.REG_TYPES[reg_type]:
-        if not winreg_file.GetKeyByPath(known_key_path):
-          known_keys_found = False
+        if known_keys_found:
+          registry_type = reg_type
           break
 
-      if known_keys_found:
-        registry_type = reg_type
-        break
-
-    self._registry_type = registry_type
-    logging.debug(
-        u'Windows Registry file {0:s}: detected as: {1:s}'.format(
-            file_entry.name, registry_type))
-
-    registry_cache = cache.WinRegistryCache()
-    registry_cache.BuildCache(winreg_file, registry_type)
-
-    plugins = {}
-    number_of_plugins = 0
-    for weight in self._plugins.GetWeights():
-      plist = self._plugins.GetWeightPlugins(weight, registry_type)
-      plugins[weight] = []
-      for plugin in plist:
-        plugins[weight].append(plugin(
-            pre_obj=self._pre_obj, reg_cache=registry_cache))
-        number_of_plugins += 1
-
-    logging.debug(
-        u'Number of plugins for this Windows Registry file: {0:d}.'.format(
-            number_of_plugins))
-
-    # Recurse through keys in the file and apply the plugins in the order:
-    # 1. file type specific key-based plugins.
-    # 2. generic key-based plugins.
-    # 3. file type specific value-based plugins.
-    # 4. generic value-based plugins.
-    root_key = winreg_file.GetKeyByPath(u'\\')
-
-    for key in self._RecurseKey(root_key):
-      parsed = False
-      for weight in plugins:
-        if parsed:
-          break
-        for plugin in plugins[weight]:
+      self._registry_type = registry_type
+      logging.debug(
+          u'Windows Registry file {0:s}: detected as: {1:s}'.format(
+              file_entry.name, registry_type))
+
+      registry_cache = cache.FILE_CACHE.GetRegistryCache(
+          file_entry, registry_type, codepage=self._codepage)
+
+      # The plugins are ordered by weight:
+      # 1. file type specific key-based plugins.
+      # 2. generic key-based plugins.
+      # 3. file type specific value-based plugins.
+      # 4. generic value-based plugins.
+      plugins = []
+      for weight in sorted(self._plugins.GetWeights()):
+        for plugin in self._plugins.GetWeightPlugins(weight, registry_type):
+          plugins.append(
+              plugin(pre_obj=self._pre_obj, reg_cache=registry_cache))
+
+      logging.debug(
+          u'Number of plugins for this Windows Registry file: {0:d}.'.format(
+              len(plugins)))
+
+      plugin_dispatcher = interface.PluginDispatcher(plugins)
+
+      # When the parser filter only selects plugins that apply to specific
+      # key paths, e.g. "winreg_run,winreg_userassist", these keys are
+      # retrieved directly instead of walking all the keys in the file.
+      start_time = time.time()
+      if plugin_dispatcher.RequiresFullWalk():
+        parse_mode = u'full'
+        root_key = winreg_file.GetKeyByPath(u'\\')
+        keys = self._GetKeys(root_key)
+      else:
+        parse_mode = u'targeted'
+        keys = self._GetKeysByPath(
+            winreg_file, plugin_dispatcher.GetKeyPaths())
+
+      # Apply the first plugin that parses the key.
+      number_of_keys = 0
+      for key in keys:
+        number_of_keys += 1
+        for plugin in plugin_dispatcher.GetPlugins(key):
           call_back = plugin.Process(key)
           if call_back:
-            parsed = True
             for event_object in self.GetEvents(call_back, key):
               event_object.plugin = plugin.plugin_name
               yield event_object
             break
 
-    winreg_file.Close()
+      logging.debug((
+          u'Windows Registry file {0:s}: {1:s} parse of {2:d} keys took '
+          u'{3:.3f} seconds.').format(
+              file_entry.name, parse_mode, number_of_keys,
+              time.time() - start_time))
+
+    finally:
+      cache.FILE_CACHE.CloseFile(file_entry, codepage=self._codepage)
@@ -131,6 +131,10 @@ class KeyPlugin(RegistryPlugin):
       if self.REG_TYPE == 'SOFTWARE' or self.REG_TYPE == 'any':
         self.expanded_keys.append(u'\\Wow6432Node{:s}'.format(key_fixed))
 
+    # Windows Registry key paths are case insensitive.
+    self._expanded_key_paths = frozenset(
+        key_path.lower() for key_path in self.expanded_keys)
+
   @abc.abstractmethod
   def GetEntries(self, key=None, **kwargs):
     """Extracts event objects from the Windows Registry key."""
@@ -142,7 +146,7 @@ class KeyPlugin(RegistryPlugin):
 
     super(KeyPlugin, self).Process(key=key, **kwargs)
 
-    if key.path in self.expanded_keys:
+    if key.path.lower() in self._expanded_key_paths:
       return self.GetEntries(key=key)
 
 
@@ -169,6 +173,90 @@ class ValuePlugin(RegistryPlugin):
       return self.GetEntries(key=key)
 
 
+class PluginDispatcher(object):
+  """Class that dispatches Windows Registry keys to the plugins that apply.
+
+  Instead of trying every plugin on every key, the key-based plugins are
+  looked up by the case insensitive path of the key and the value-based
+  plugins are only tried on keys that contain their values. Plugins that
+  override Process, such as the default plugin, are tried on every key.
+  """
+
+  def __init__(self, plugins):
+    """Initializes the plugin dispatcher.
+
+    Args:
+      plugins: a list of plugin objects (instances of RegistryPlugin)
+               in order of priority.
+    """
+    super(PluginDispatcher, self).__init__()
+    self._generic_plugins = []
+    self._key_paths = []
+    self._key_plugins = {}
+    self._value_plugins = []
+
+    for plugin_index, plugin_object in enumerate(plugins):
+      process_function = getattr(type(plugin_object).Process, 'im_func', None)
+
+      if (isinstance(plugin_object, KeyPlugin) and
+          process_function is KeyPlugin.Process.im_func):
+        for key_path in plugin_object.expanded_keys:
+          if key_path.lower() not in self._key_plugins:
+            self._key_paths.append(key_path)
+          key_plugins = self._key_plugins.setdefault(key_path.lower(), [])
+          if (plugin_index, plugin_object) not in key_plugins:
+            key_plugins.append((plugin_index, plugin_object))
+
+      elif (isinstance(plugin_object, ValuePlugin) and
+            process_function is ValuePlugin.Process.im_func):
+        self._value_plugins.append((plugin_index, plugin_object))
+
+      else:
+        self._generic_plugins.append((plugin_index, plugin_object))
+
+  def GetKeyPaths(self):
+    """Retrieves the key paths of the key-based plugins.
+
+    Returns:
+      A list of the expanded key paths in order of priority, where key paths
+      that only differ in case are included once.
+    """
+    return list(self._key_paths)
+
+  def RequiresFullWalk(self):
+    """Determines if all the keys need to be passed to the plugins.
+
+    Returns:
+      False if all plugins apply to specific key paths, which means the keys
+      can be retrieved by their path, True otherwise.
+    """
+    return bool(self._generic_plugins or self._value_plugins)
+
+  def GetPlugins(self, key):
+    """Retrieves the plugins that can apply to a Windows Registry key.
+
+    Args:
+      key: A Windows Registry key (instance of WinRegKey).
+
+    Returns:
+      A list of plugin objects (instances of RegistryPlugin) in order of
+      priority. The first plugin of which Process returns a generator
+      should parse the key.
+    """
+    plugins = list(self._generic_plugins)
+    plugins.extend(self._key_plugins.get(key.path.lower(), []))
+
+    if self._value_plugins:
+      value_names = frozenset(value.name for value in key.GetValues())
+      plugins.extend(
+          (plugin_index, plugin_object)
+          for plugin_index, plugin_object in self._value_plugins
+          if plugin_object.REG_VALUES.issubset(value_names))
+
+    plugins.sort(key=lambda plugin_tuple: plugin_tuple[0])
+    return [plugin_object for _, plugin_object in plugins]
+
+
 class PluginList(object):
   """A simple class that stores information about Windows Registry plugins."""
 
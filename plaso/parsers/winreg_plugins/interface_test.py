@@ -0,0 +1,100 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the Windows Registry plugin interface."""
+
+import unittest
+
+from plaso.parsers.winreg_plugins import default
+from plaso.parsers.winreg_plugins import interface
+from plaso.parsers.winreg_plugins import mrulist
+from plaso.parsers.winreg_plugins import mrulistex
+from plaso.parsers.winreg_plugins import run
+from plaso.parsers.winreg_plugins import typedurls
+from plaso.winreg import test_lib as winreg_test_lib
+
+
+class PluginDispatcherTest(unittest.TestCase):
+  """Tests for the Windows Registry plugin dispatcher."""
+
+  def setUp(self):
+    """Sets up the needed objects used throughout the test."""
+    self._run_plugin = run.RunUserPlugin()
+    self._mrulist_plugin = mrulist.MRUListPlugin()
+    self._mrulistex_plugin = mrulistex.MRUListExPlugin()
+    self._default_plugin = default.DefaultPlugin()
+
+    self._dispatcher = interface.PluginDispatcher([
+        self._run_plugin, self._mrulist_plugin, self._mrulistex_plugin,
+        self._default_plugin])
+
+  def _CreateKey(self, key_path, value_names):
+    """Creates a test Windows Registry key.
+
+    Args:
+      key_path: the path of the key.
+      value_names: a list of the names of the values of the key.
+
+    Returns:
+      A Windows Registry key (instance of TestRegKey).
+    """
+    values = [
+        winreg_test_lib.TestRegValue(value_name, 'data', 1)
+        for value_name in value_names]
+    return winreg_test_lib.TestRegKey(key_path, 0, values, subkeys=[])
+
+  def testGetPlugins(self):
+    """Tests the GetPlugins function."""
+    # Key paths are matched case insensitive.
+    key = self._CreateKey(
+        u'\\software\\microsoft\\windows\\currentversion\\RUN', [u'Sidebar'])
+    plugins = self._dispatcher.GetPlugins(key)
+    self.assertEquals(plugins, [
+        self._run_plugin, self._mrulistex_plugin, self._default_plugin])
+    self.assertNotEquals(self._run_plugin.Process(key), None)
+
+    # Value-based plugins are only returned for keys that contain the values.
+    key = self._CreateKey(u'\\Software\\App\\MRU', [u'MRUList', u'a'])
+    plugins = self._dispatcher.GetPlugins(key)
+    self.assertEquals(plugins, [
+        self._mrulist_plugin, self._mrulistex_plugin, self._default_plugin])
+
+    key = self._CreateKey(u'\\Software\\App', [u'a'])
+    plugins = self._dispatcher.GetPlugins(key)
+    self.assertEquals(plugins, [
+        self._mrulistex_plugin, self._default_plugin])
+
+  def testGetKeyPaths(self):
+    """Tests the GetKeyPaths and RequiresFullWalk functions."""
+    self.assertTrue(self._dispatcher.RequiresFullWalk())
+
+    typed_urls_plugin = typedurls.TypedURLsPlugin()
+    dispatcher = interface.PluginDispatcher([
+        self._run_plugin, typed_urls_plugin])
+    self.assertFalse(dispatcher.RequiresFullWalk())
+
+    key_paths = dispatcher.GetKeyPaths()
+    self.assertEquals(
+        len(key_paths), len(set(key_path.lower() for key_path in key_paths)))
+    self.assertEquals(
+        key_paths[0], u'\\Software\\Microsoft\\Windows\\CurrentVersion\\Run')
+    self.assertTrue(
+        u'\\Software\\Microsoft\\Internet Explorer\\TypedURLs' in key_paths)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -24,6 +24,14 @@ from plaso.parsers import test_lib
 from plaso.parsers import winreg
 
 
+class Configuration(object):
+  """Config object."""
+
+  def __init__(self, parsers=''):
+    """Initializes the configuration object."""
+    self.parsers = parsers
+
+
 class WinRegTest(test_lib.ParserTestCase):
   """Tests for the Windows Registry file parser."""
 
@@ -60,6 +68,20 @@ class WinRegTest(test_lib.ParserTestCase):
 
     self.assertEquals(plugins['winreg_userassist'], 16)
 
+  def testNtuserTargetedParsing(self):
+    """Parse a NTUSER.dat file with only key-based plugins selected."""
+    pre_obj = event.PreprocessObject()
+    config = Configuration(parsers='winreg_userassist, winreg_typed_urls')
+    parser = winreg.WinRegistryParser(pre_obj, config)
+
+    test_file = self._GetTestFilePath(['NTUSER.DAT'])
+    event_generator = self._ParseFile(parser, test_file)
+
+    plugins = self._GetPlugins(event_generator)
+
+    self.assertEquals(plugins.get('winreg_userassist', 0), 16)
+    self.assertFalse('winreg_default' in plugins)
+
   def testSystemParsing(self):
     """Parse a SYSTEM hive an run few tests."""
     test_file = self._GetTestFilePath(['SYSTEM'])
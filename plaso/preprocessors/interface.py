@@ -29,7 +29,6 @@ from plaso.lib import registry
 from plaso.parsers.plist_plugins import interface as plist_interface
 from plaso.winreg import cache
 from plaso.winreg import path_expander as winreg_path_expander
-from plaso.winreg import winregistry
 
 
 class PreprocessPlugin(object):
@@ -419,48 +418,50 @@ class WindowsRegistryPreprocess(PreprocessPlugin):
 
     codepage = getattr(self._obj_store, 'code_page', 'cp1252')
 
-    win_registry = winregistry.WinRegistry(
-        winregistry.WinRegistry.BACKEND_PYREGF)
-
+    # The Windows Registry file is shared with the other preprocess plugins
+    # and the Windows Registry parser.
     try:
-      winreg_file = win_registry.OpenFile(file_entry, codepage=codepage)
+      winreg_file = cache.FILE_CACHE.OpenFile(file_entry, codepage=codepage)
     except IOError as exception:
       raise errors.PreProcessFail(
           u'Unable to open Registry file: {0:s} with error: {1:s}'.format(
               file_location, exception))
 
-    self.winreg_file = winreg_file
-
-    if not self._key_path_expander:
-      # TODO: it is more efficient to have one cache that is passed to every
-      # plugin, or maybe one path expander. Or replace the path expander by
-      # dfvfs WindowsPathResolver?
-      reg_cache = cache.WinRegistryCache()
-      reg_cache.BuildCache(winreg_file, self.REG_FILE)
-      self._key_path_expander = winreg_path_expander.WinRegistryKeyPathExpander(
-          self._obj_store, reg_cache)
-
+    # The Windows Registry file is released when the key is parsed.
     try:
-      key_path = self._key_path_expander.ExpandPath(self.REG_KEY)
-    except KeyError:
-      key_path = u''
-
-    if not key_path:
-      raise errors.PreProcessFail(
-          u'Unable to expand path: {0:s}'.format(self.REG_KEY))
-
-    try:
-      key = winreg_file.GetKeyByPath(key_path)
-    except IOError as exception:
-      raise errors.PreProcessFail(
-          u'Unable to fetch Registry key: {0:s} with error: {1:s}'.format(
-              key_path, exception))
-
-    if not key:
-      raise errors.PreProcessFail(
-          u'Registry key {0:s} does not exist.'.format(self.REG_KEY))
-
-    return self.ParseKey(key)
+      if not self._key_path_expander:
+        # TODO: it is more efficient to have one path expander. Or replace
+        # the path expander by dfvfs WindowsPathResolver?
+        reg_cache = cache.FILE_CACHE.GetRegistryCache(
+            file_entry, self.REG_FILE, codepage=codepage)
+        self._key_path_expander = (
+            winreg_path_expander.WinRegistryKeyPathExpander(
+                self._obj_store, reg_cache))
+
+      try:
+        key_path = self._key_path_expander.ExpandPath(self.REG_KEY)
+      except KeyError:
+        key_path = u''
+
+      if not key_path:
+        raise errors.PreProcessFail(
+            u'Unable to expand path: {0:s}'.format(self.REG_KEY))
+
+      try:
+        key = winreg_file.GetKeyByPath(key_path)
+      except IOError as exception:
+        raise errors.PreProcessFail(
+            u'Unable to fetch Registry key: {0:s} with error: {1:s}'.format(
+                key_path, exception))
+
+      if not key:
+        raise errors.PreProcessFail(
+            u'Registry key {0:s} does not exist.'.format(self.REG_KEY))
+
+      return self.ParseKey(key)
+
+    finally:
+      cache.FILE_CACHE.CloseFile(file_entry, codepage=codepage)
 
   @abc.abstractmethod
   def ParseKey(self, key):
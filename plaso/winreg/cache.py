@@ -18,9 +18,13 @@
 """Interface and plugins for caching of Windows Registry objects."""
 
 import abc
+import collections
+import logging
+import os
 
 from plaso.lib import errors
 from plaso.lib import registry
+from plaso.winreg import winregistry
 
 
 class WinRegistryCache(object):
@@ -58,6 +62,189 @@ class WinRegistryCache(object):
         pass
 
 
+class WinRegistryFileCache(object):
+  """Class that implements a cache of open Windows Registry files.
+
+     The same Windows Registry files of an image, such as SYSTEM and SOFTWARE,
+     are opened by the preprocessors, the Windows Registry parser and preg.
+     This cache keeps the most recently used files open, identified by their
+     path specification, together with their Windows Registry objects caches.
+     Every file returned by OpenFile is referenced until it is released by
+     CloseFile. The least recently used file that is no longer referenced is
+     closed when the maximum number of open files is reached, hence a file
+     is never closed while it is in use.
+
+     Since the path specification includes the image the file is stored in,
+     the cached files and values are per image. Open files are not shared
+     between processes, a forked process starts with an empty cache.
+  """
+
+  def __init__(self, maximum_number_of_files=8):
+    """Initialize the cache object.
+
+    Args:
+      maximum_number_of_files: Optional maximum number of open Windows Registry
+                               files. The default is 8.
+    """
+    super(WinRegistryFileCache, self).__init__()
+    self._files = collections.OrderedDict()
+    self._maximum_number_of_files = maximum_number_of_files
+    self._process_identifier = os.getpid()
+    self._reference_counts = {}
+    self._registry_caches = {}
+
+  def _CloseUnreferencedFiles(self, maximum_number_of_files):
+    """Closes the least recently used files that are no longer referenced.
+
+    Args:
+      maximum_number_of_files: The maximum number of open files to keep.
+                               More files are kept open when they are still
+                               referenced.
+    """
+    for cache_identifier in list(self._files.iterkeys()):
+      if len(self._files) <= maximum_number_of_files:
+        break
+
+      if self._reference_counts.get(cache_identifier, 0) > 0:
+        continue
+
+      winreg_file = self._files.pop(cache_identifier)
+      self._reference_counts.pop(cache_identifier, None)
+      self._registry_caches.pop(cache_identifier, None)
+      logging.debug(u'Closing Windows Registry file: {0:s}'.format(
+          winreg_file.name))
+      winreg_file.Close()
+
+  def _GetCacheIdentifier(self, file_entry, codepage):
+    """Determines the cache identifier of a Windows Registry file.
+
+    Args:
+      file_entry: The file entry object.
+      codepage: The codepage for ASCII strings.
+
+    Returns:
+      A tuple of the comparable of the path specification and the codepage.
+    """
+    return file_entry.path_spec.comparable, codepage
+
+  def CloseFile(self, file_entry, codepage='cp1252'):
+    """Releases a Windows Registry file opened by OpenFile.
+
+    The file is closed once it is no longer referenced and the maximum number
+    of open files is exceeded.
+
+    Args:
+      file_entry: The file entry object.
+      codepage: Optional codepage for ASCII strings, default is cp1252.
+    """
+    if self._process_identifier != os.getpid():
+      return
+
+    cache_identifier = self._GetCacheIdentifier(file_entry, codepage)
+    reference_count = self._reference_counts.get(cache_identifier, 0)
+    if reference_count <= 0:
+      logging.warning(
+          u'Windows Registry file: {0:s} is not referenced.'.format(
+              file_entry.path_spec.comparable))
+      return
+
+    self._reference_counts[cache_identifier] = reference_count - 1
+    self._CloseUnreferencedFiles(self._maximum_number_of_files)
+
+  def Empty(self):
+    """Closes all the Windows Registry files and empties the cache.
+
+    The files are closed even if they are still referenced.
+    """
+    if self._process_identifier == os.getpid():
+      for winreg_file in self._files.itervalues():
+        winreg_file.Close()
+
+    self._files = collections.OrderedDict()
+    self._process_identifier = os.getpid()
+    self._reference_counts = {}
+    self._registry_caches = {}
+
+  def GetRegistryCache(self, file_entry, registry_type, codepage='cp1252'):
+    """Retrieves the Windows Registry objects cache of a file.
+
+    The cache is built once for every file and Windows Registry type.
+
+    Args:
+      file_entry: The file entry object.
+      registry_type: The Registry type, eg. "SYSTEM", "NTUSER".
+      codepage: Optional codepage for ASCII strings, default is cp1252.
+
+    Returns:
+      The Windows Registry objects cache (instance of WinRegistryCache).
+
+    Raises:
+      IOError: if the Windows Registry file cannot be opened.
+    """
+    winreg_file = self.OpenFile(file_entry, codepage=codepage)
+
+    try:
+      cache_identifier = self._GetCacheIdentifier(file_entry, codepage)
+      registry_caches = self._registry_caches.setdefault(cache_identifier, {})
+
+      registry_cache = registry_caches.get(registry_type, None)
+      if not registry_cache:
+        registry_cache = WinRegistryCache()
+        registry_cache.BuildCache(winreg_file, registry_type)
+        registry_caches[registry_type] = registry_cache
+
+    finally:
+      self.CloseFile(file_entry, codepage=codepage)
+
+    return registry_cache
+
+  def OpenFile(self, file_entry, codepage='cp1252'):
+    """Opens a Windows Registry file or retrieves it from the cache.
+
+    The file is owned by the cache and should not be closed by the caller,
+    instead it must be released by CloseFile when the caller no longer uses
+    it.
+
+    Args:
+      file_entry: The file entry object.
+      codepage: Optional codepage for ASCII strings, default is cp1252.
+
+    Returns:
+      The Windows Registry file (instance of WinRegFile).
+
+    Raises:
+      IOError: if the Windows Registry file cannot be opened.
+    """
+    if self._process_identifier != os.getpid():
+      # The files were opened by the parent process and share their file
+      # offsets with it, hence they are discarded without closing them.
+      self._files = collections.OrderedDict()
+      self._process_identifier = os.getpid()
+      self._reference_counts = {}
+      self._registry_caches = {}
+
+    cache_identifier = self._GetCacheIdentifier(file_entry, codepage)
+    winreg_file = self._files.pop(cache_identifier, None)
+
+    if not winreg_file:
+      registry = winregistry.WinRegistry(
+          winregistry.WinRegistry.BACKEND_PYREGF)
+      winreg_file = registry.OpenFile(file_entry, codepage=codepage)
+
+      self._CloseUnreferencedFiles(self._maximum_number_of_files - 1)
+
+    # The most recently used file is stored last.
+    self._files[cache_identifier] = winreg_file
+    self._reference_counts[cache_identifier] = (
+        self._reference_counts.get(cache_identifier, 0) + 1)
+    return winreg_file
+
+
+# The Windows Registry files cache shared by the preprocessors, the Windows
+# Registry parser and preg within a process.
+FILE_CACHE = WinRegistryFileCache()
+
+
 class WinRegCachePlugin(object):
   """Class that implement the Window Registry cache plugin interface."""
 
@@ -45,5 +45,73 @@ class CacheTest(test_lib.WinRegTestCase):
        winreg_cache.attributes['current_control_set'], 'ControlSet001')
 
 
+class FileCacheTest(test_lib.WinRegTestCase):
+  """Tests for the Windows Registry files cache."""
+
+  def testOpenFile(self):
+    """Tests opening Windows Registry files through the cache."""
+    file_cache = cache.WinRegistryFileCache(maximum_number_of_files=1)
+
+    test_file = self._GetTestFilePath(['SYSTEM'])
+    system_file_entry = self._GetTestFileEntry(test_file)
+    winreg_file = file_cache.OpenFile(system_file_entry)
+
+    # The same file entry returns the cached file.
+    system_file_entry = self._GetTestFileEntry(test_file)
+    self.assertEqual(file_cache.OpenFile(system_file_entry), winreg_file)
+
+    winreg_cache = file_cache.GetRegistryCache(system_file_entry, 'SYSTEM')
+    self.assertEqual(
+       winreg_cache.attributes['current_control_set'], 'ControlSet001')
+    self.assertEqual(
+        file_cache.GetRegistryCache(system_file_entry, 'SYSTEM'), winreg_cache)
+
+    # Opening another file evicts the least recently used file.
+    test_file = self._GetTestFilePath(['NTUSER.DAT'])
+    ntuser_file_entry = self._GetTestFileEntry(test_file)
+    file_cache.OpenFile(ntuser_file_entry)
+
+    self.assertNotEqual(file_cache.OpenFile(system_file_entry), winreg_file)
+
+    file_cache.Empty()
+
+  def testOpenFileReferenced(self):
+    """Tests that referenced Windows Registry files are not closed."""
+    file_cache = cache.WinRegistryFileCache(maximum_number_of_files=8)
+
+    # The codepage is part of the cache identifier, hence every codepage
+    # opens the file again.
+    codepages = [
+        'cp1250', 'cp1251', 'cp1252', 'cp1253', 'cp1254', 'cp1255', 'cp1256',
+        'cp1257', 'cp1258']
+
+    test_file = self._GetTestFilePath(['NTUSER.DAT'])
+    file_entry = self._GetTestFileEntry(test_file)
+
+    winreg_files = []
+    for codepage in codepages:
+      winreg_files.append(file_cache.OpenFile(file_entry, codepage=codepage))
+
+    # The first file is still referenced and hence not closed when
+    # the ninth file is opened.
+    root_key = winreg_files[0].GetKeyByPath(u'\\')
+    self.assertNotEqual(root_key, None)
+    self.assertEqual(
+        file_cache.OpenFile(file_entry, codepage='cp1250'), winreg_files[0])
+    file_cache.CloseFile(file_entry, codepage='cp1250')
+
+    # Once released the first file, which is no longer referenced, is closed
+    # to keep eight files open.
+    for codepage in codepages:
+      file_cache.CloseFile(file_entry, codepage=codepage)
+
+    self.assertNotEqual(
+        file_cache.OpenFile(file_entry, codepage='cp1250'), winreg_files[0])
+    self.assertEqual(
+        file_cache.OpenFile(file_entry, codepage='cp1258'), winreg_files[8])
+
+    file_cache.Empty()
+
+
 if __name__ == '__main__':
   unittest.main()
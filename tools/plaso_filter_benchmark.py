@@ -0,0 +1,146 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A simple tool that measures the throughput of the filter matchers.
+
+The tool matches the event objects of the fake parsers of the pfilter tests
+against the filter queries of the pfilter tests, both with the filter
+matchers as parsed and with the filter matchers compiled into functions,
+and reports the number of event objects matched per second.
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from plaso.lib import event
+from plaso.lib import pfilter
+from plaso.lib import pfilter_test
+
+
+# The filter queries of the pfilter tests.
+BENCHMARK_QUERIES = [
+    u'filename contains \'GoodFella\'',
+    u'date >= \'2015-11-18\'',
+    u'date < \'2015-11-18T01:15:44.341\' and date > \'2015-11-18 01:15:42\'',
+    u'filename not contains \'sometext\'',
+    (u'timestamp_desc CONTAINS \'written\' AND date > \'2015-11-18\' AND '
+     u'date < \'2015-11-25 12:56:21\' AND (source_short contains \'LOG\' or '
+     u'source_short CONTAINS \'REG\')'),
+    u'parser is not \'Weirdo\'',
+    u'source_long not contains \'Fake\'',
+    u'source is \'REG\'',
+    (u'source_long is \'Fake Parsing Source\' AND description_long '
+     u'regexp \'bad, bad thing [\\sa-zA-Z\\.]+ evil\''),
+    (u'description_long contains \'evil\' AND description_long iregexp '
+     u'\'dr\\. evil\' AND parser is \'Made\'')]
+
+# The fake parser classes of the pfilter tests.
+BENCHMARK_PARSERS = [
+    pfilter_test.PfilterFakeParser,
+    pfilter_test.PfilterAnotherParser,
+    pfilter_test.PfilterAllEvilParser]
+
+
+def GetEventObjects():
+  """Retrieves the event objects of the fake parsers.
+
+  Returns:
+    A list of event objects (instances of EventObject).
+  """
+  event_objects = []
+  for parser_class in BENCHMARK_PARSERS:
+    parser_object = parser_class(event.PreprocessObject())
+    for event_object in parser_object.Parse(None):
+      # The fake parsers share the parse method, the data type is set to
+      # have the event objects formatted by different formatters.
+      event_object.data_type = parser_class.DATA_TYPE
+      event_objects.append(event_object)
+
+  return event_objects
+
+
+def RunBenchmark(query, event_objects, iterations, compiled):
+  """Runs the benchmark of a filter query.
+
+  Args:
+    query: the filter query.
+    event_objects: a list of event objects (instances of EventObject).
+    iterations: the number of times the event objects are matched.
+    compiled: boolean value to indicate the filter matcher should be compiled.
+
+  Returns:
+    A tuple of the number of matched event objects and the elapsed time
+    in seconds.
+  """
+  matcher = pfilter.GetMatcher(query, compiled=compiled)
+
+  number_of_matched_events = 0
+  time_start = time.time()
+  for _ in range(iterations):
+    for event_object in event_objects:
+      if matcher.Matches(event_object):
+        number_of_matched_events += 1
+  time_end = time.time()
+
+  return number_of_matched_events, time_end - time_start
+
+
+def Main():
+  """Start the tool."""
+  arg_parser = argparse.ArgumentParser(description=(
+      u'Compares the throughput of the filter matchers with and without '
+      u'compiling them into functions.'))
+
+  arg_parser.add_argument(
+      '-i', '--iterations', dest='iterations', action='store', type=int,
+      default=10000, help=u'The number of times the event objects are matched.')
+
+  options = arg_parser.parse_args()
+
+  # The filters log a warning for every event object that cannot be formatted.
+  logging.disable(logging.WARNING)
+
+  event_objects = GetEventObjects()
+  number_of_events = len(event_objects) * options.iterations
+
+  total_elapsed_times = {}
+  for query in BENCHMARK_QUERIES:
+    print query
+    for label, compiled in [(u'parsed', False), (u'compiled', True)]:
+      number_of_matched_events, elapsed_time = RunBenchmark(
+          query, event_objects, options.iterations, compiled)
+      total_elapsed_times.setdefault(label, 0.0)
+      total_elapsed_times[label] += elapsed_time
+      print (
+          u'  {0:s}: {1:d} of {2:d} events matched in {3:f}s '
+          u'({4:.0f} events/s)').format(
+              label, number_of_matched_events, number_of_events,
+              elapsed_time, number_of_events / elapsed_time)
+
+  print u'Total: parsed {0:f}s, compiled {1:f}s'.format(
+      total_elapsed_times[u'parsed'], total_elapsed_times[u'compiled'])
+
+  return True
+
+
+if __name__ == '__main__':
+  if not Main():
+    sys.exit(1)
+  else:
+    sys.exit(0)
@@ -0,0 +1,157 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A simple tool that measures the throughput of the storage queue.
+
+The tool starts a number of producer processes that push event objects
+onto a multi threaded queue, similar to the extraction workers, and a single
+consumer that pops them off the queue, similar to the storage process. The
+throughput is measured with and without batching of the event objects.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+from plaso.lib import event
+from plaso.lib import queue
+
+
+class BenchmarkEventObjectQueueConsumer(queue.EventObjectQueueConsumer):
+  """Class that implements an event object queue consumer that counts."""
+
+  def __init__(self, queue_object):
+    """Initializes the queue consumer.
+
+    Args:
+      queue_object: the queue object (instance of Queue).
+    """
+    super(BenchmarkEventObjectQueueConsumer, self).__init__(queue_object)
+    self.number_of_event_objects = 0
+
+  def _ConsumeEventObject(self, unused_event_object):
+    """Consumes an event object callback for ConsumeEventObjects."""
+    self.number_of_event_objects += 1
+
+
+def ProduceEventObjects(queue_object, number_of_event_objects):
+  """Produces test event objects onto the queue.
+
+  Args:
+    queue_object: the queue object (instance of Queue).
+    number_of_event_objects: the number of event objects to produce.
+  """
+  queue_producer = queue.EventObjectQueueProducer(queue_object)
+
+  for index in range(number_of_event_objects):
+    event_object = event.EventObject()
+    event_object.data_type = 'test:benchmark'
+    event_object.timestamp = 1390000000000000 + index
+    event_object.timestamp_desc = u'Benchmark Time'
+    event_object.filename = u'/Windows/System32/config/SOFTWARE'
+    event_object.parser = u'winreg'
+    event_object.regvalue = {u'Value': u'Data {0:d}'.format(index)}
+    queue_producer.ProduceEventObject(event_object)
+
+  queue_producer.Flush()
+
+
+def _ConsumeAndReport(queue_object, result_queue):
+  """Consumes all event objects and reports the number consumed."""
+  queue_consumer = BenchmarkEventObjectQueueConsumer(queue_object)
+  queue_consumer.ConsumeEventObjects()
+  result_queue.put(queue_consumer.number_of_event_objects)
+
+
+def RunBenchmark(options, maximum_batch_size):
+  """Runs the benchmark with a specific batch size.
+
+  Args:
+    options: the command line arguments (instance of argparse.Namespace).
+    maximum_batch_size: the maximum number of event objects in a batch.
+
+  Returns:
+    A tuple of the number of consumed event objects and the elapsed time
+    in seconds.
+  """
+  queue_object = queue.MultiThreadedQueue(
+      maximum_batch_size=maximum_batch_size)
+
+  producers = []
+  for _ in range(options.producers):
+    producer = multiprocessing.Process(
+        target=ProduceEventObjects, args=(queue_object, options.events))
+    producers.append(producer)
+
+  time_start = time.time()
+  for producer in producers:
+    producer.start()
+
+  consumer_process = multiprocessing.Process(
+      target=_ConsumeAndReport, args=(queue_object, options.result_queue))
+  consumer_process.start()
+
+  for producer in producers:
+    producer.join()
+
+  queue_object.SignalEndOfInput()
+  number_of_event_objects = options.result_queue.get()
+  consumer_process.join()
+  time_end = time.time()
+
+  return number_of_event_objects, time_end - time_start
+
+
+def Main():
+  """Start the tool."""
+  arg_parser = argparse.ArgumentParser(description=(
+      u'Compares the throughput of the storage queue with and without '
+      u'batching.'))
+
+  arg_parser.add_argument(
+      '-e', '--events', dest='events', action='store', type=int,
+      default=100000, help=u'The number of events produced per producer.')
+
+  arg_parser.add_argument(
+      '-p', '--producers', dest='producers', action='store', type=int,
+      default=4, help=u'The number of producer processes.')
+
+  arg_parser.add_argument(
+      '-b', '--batch_size', dest='batch_size', action='store', type=int,
+      default=500, help=u'The maximum number of events in a batch.')
+
+  options = arg_parser.parse_args()
+  options.result_queue = multiprocessing.Queue()
+
+  for label, batch_size in [
+      (u'Unbatched', 1), (u'Batched', options.batch_size)]:
+    number_of_event_objects, elapsed_time = RunBenchmark(options, batch_size)
+    print (
+        u'{0:s} (batch size: {1:d}): {2:d} events in {3:f}s '
+        u'({4:.0f} events/s)').format(
+            label, batch_size, number_of_event_objects, elapsed_time,
+            number_of_event_objects / elapsed_time)
+
+  return True
+
+
+if __name__ == '__main__':
+  if not Main():
+    sys.exit(1)
+  else:
+    sys.exit(0)
@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 The Plaso Project Authors.
+# Please see the AUTHORS file for details on individual authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A simple tool that measures the throughput of the pyparsing text parsers.
+
+The tool matches the lines of the test log files against the line structures
+of the corresponding parsers, both with pyparsing and with the line
+structures compiled into regular expressions, and reports the number of
+lines matched per second.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from plaso.lib import event
+from plaso.parsers import mac_appfirewall
+from plaso.parsers import mac_securityd
+from plaso.parsers import mac_wifi
+from plaso.parsers import popcontest
+from plaso.parsers import skydrivelog
+from plaso.parsers import winfirewall
+from plaso.parsers import xchatlog
+from plaso.parsers import xchatscrollback
+
+
+# The parser classes and the names of their test log files.
+BENCHMARK_PARSERS = [
+    (mac_appfirewall.MacAppFirewallParser, u'appfirewall.log'),
+    (mac_securityd.MacSecuritydLogParser, u'security.log'),
+    (mac_wifi.MacWifiLogParser, u'wifi.log'),
+    (popcontest.PopularityContestParser, u'popcontest1.log'),
+    (skydrivelog.SkyDriveLogParser, u'skydrive.log'),
+    (winfirewall.WinFirewallParser, u'firewall.log'),
+    (xchatlog.XChatLogParser, u'xchat.log'),
+    (xchatscrollback.XChatScrollbackParser, u'xchatscrollback.log')]
+
+
+def ReadLines(parser_object, path):
+  """Reads the lines of a log file the way the parser reads them.
+
+  Args:
+    parser_object: the parser object (instance of
+                   PyparsingSingleLineTextParser).
+    path: the path of the log file.
+
+  Returns:
+    A list of the non-empty lines.
+  """
+  lines = []
+  with open(path, 'rb') as file_object:
+    for line in file_object:
+      if parser_object.encoding:
+        try:
+          line = line.decode(parser_object.encoding)
+        except UnicodeDecodeError:
+          pass
+
+      line = line.strip()
+      if line:
+        lines.append(line)
+
+  return lines
+
+
+def RunBenchmark(parser_class, lines, iterations, compile_line_structures):
+  """Runs the benchmark of a parser.
+
+  Args:
+    parser_class: the parser class (subclass of PyparsingSingleLineTextParser).
+    lines: a list of lines to match.
+    iterations: the number of times the lines are matched.
+    compile_line_structures: boolean value to indicate the line structures
+                             should be compiled.
+
+  Returns:
+    A tuple of the number of matched lines and the elapsed time in seconds.
+  """
+  parser_object = parser_class(event.PreprocessObject(), None)
+  parser_object.COMPILE_LINE_STRUCTURES = compile_line_structures
+
+  # Compile the line structures outside of the measurement.
+  parser_object._GetLineStructures()  # pylint: disable=protected-access
+
+  number_of_matched_lines = 0
+  time_start = time.time()
+  for _ in range(iterations):
+    for line in lines:
+      _, parsed_structure = parser_object._ParseLine(line)  # pylint: disable=protected-access
+      if parsed_structure:
+        number_of_matched_lines += 1
+  time_end = time.time()
+
+  return number_of_matched_lines, time_end - time_start
+
+
+def Main():
+  """Start the tool."""
+  arg_parser = argparse.ArgumentParser(description=(
+      u'Compares the throughput of the pyparsing text parsers with and '
+      u'without compiled line structures.'))
+
+  arg_parser.add_argument(
+      '-i', '--iterations', dest='iterations', action='store', type=int,
+      default=100, help=u'The number of times the log files are matched.')
+
+  arg_parser.add_argument(
+      '-t', '--test_data', dest='test_data', action='store', type=unicode,
+      default=u'test_data', help=u'The path of the test data directory.')
+
+  options = arg_parser.parse_args()
+
+  if not os.path.isdir(options.test_data):
+    print u'No such test data directory: {0:s}.'.format(options.test_data)
+    return False
+
+  for parser_class, filename in BENCHMARK_PARSERS:
+    path = os.path.join(options.test_data, filename)
+    if not os.path.isfile(path):
+      print u'{0:s}: missing test file: {1:s}.'.format(
+          parser_class.NAME, filename)
+      continue
+
+    lines = ReadLines(parser_class(event.PreprocessObject(), None), path)
+    for label, compile_line_structures in [
+        (u'pyparsing', False), (u'compiled', True)]:
+      number_of_matched_lines, elapsed_time = RunBenchmark(
+          parser_class, lines, options.iterations, compile_line_structures)
+      number_of_lines = len(lines) * options.iterations
+      print (
+          u'{0:s} ({1:s}): {2:d} of {3:d} lines matched in {4:f}s '
+          u'({5:.0f} lines/s)').format(
+              parser_class.NAME, label, number_of_matched_lines,
+              number_of_lines, elapsed_time, number_of_lines / elapsed_time)
+
+  return True
+
+
+if __name__ == '__main__':
+  if not Main():
+    sys.exit(1)
+  else:
+    sys.exit(0)